@@ -0,0 +1,366 @@
+import argparse
+import csv
+import html
+import os
+import queue
+import sys
+import threading
+import time
+from datetime import datetime
+from functools import partial
+
+import numpy as np
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from ai import indicators
+from ai.price_predictor import PricePredictor
+from ai.sentiment_analyzer import get_cached_news_sentiment
+from data.data_fetcher import DynamicStockFetcher, get_real_stock_data, get_stock_history
+
+# Headless pre-market run: every symbol flows through fetch -> features ->
+# predict -> sentiment, each stage with its own worker threads and a bounded
+# queue in front of it, so fetching the next symbols overlaps with scoring
+# the previous ones and a slow stage holds back the ones before it instead
+# of piling up bars in memory. Rows are written as they leave the last stage.
+
+STAGES = ('fetch', 'features', 'predict', 'sentiment')
+
+DEFAULT_WORKERS = {'fetch': 8, 'features': 2, 'predict': 2, 'sentiment': 4}
+
+# Items a stage may have waiting per worker before the stage feeding it blocks
+QUEUE_DEPTH = 4
+
+# Rows buffered per Parquet row group
+PARQUET_BATCH = 100
+
+UNIVERSES = {
+    'sp500': lambda fetcher: fetcher.get_sp500_components(),
+    'nasdaq100': lambda fetcher: fetcher.get_nasdaq100_components(),
+    'sectors': lambda fetcher: fetcher.get_sector_leaders(),
+    'trending': lambda fetcher: fetcher.get_dynamic_watchlist('trending')
+}
+
+COLUMNS = [
+    ('symbol', 'string'), ('price', 'float64'), ('change', 'float64'), ('change_pct', 'float64'),
+    ('volume', 'float64'), ('bars', 'int64'), ('return_1m_pct', 'float64'), ('volatility_pct', 'float64'),
+    ('rsi14', 'float64'), ('sma20', 'float64'), ('sma50', 'float64'), ('macd', 'float64'),
+    ('macd_signal', 'float64'), ('bb_position', 'float64'), ('atr14', 'float64'),
+    ('predicted_price', 'float64'), ('predicted_change_pct', 'float64'), ('confidence', 'float64'),
+    ('sentiment', 'string'), ('sentiment_score', 'float64'), ('articles', 'int64'),
+    ('error', 'string')
+]
+
+_DONE = object()
+
+
+# Stage work; each takes and returns the symbol's record
+
+def fetch(record, period):
+    symbol = record['symbol']
+    quote = get_real_stock_data(symbol)
+    if quote:
+        for key in ('price', 'change', 'change_pct', 'volume'):
+            record[key] = quote[key]
+    record['_history'] = get_stock_history(symbol, period=period)
+    if record['_history'] is None or record['_history'].empty:
+        raise ValueError('no price history')
+    return record
+
+
+def features(record):
+    bars = record['_history']
+    symbol = record['symbol']
+    close = bars['Close'].to_numpy()
+
+    def latest(name, column=None, **params):
+        value = indicators.compute(name, bars, symbol, '1d', **params)
+        value = value[column] if column else value
+        return float(value.iat[-1])
+
+    record['bars'] = len(bars)
+    record['return_1m_pct'] = (close[-1] / close[-22] - 1) * 100 if len(close) > 21 else None
+    record['volatility_pct'] = float(np.std(np.diff(np.log(close[-21:])), ddof=1) * np.sqrt(252) * 100) if len(close) > 21 else None
+    record['rsi14'] = latest('rsi', window=14)
+    record['sma20'] = latest('sma', window=20)
+    record['sma50'] = latest('sma', window=50)
+    record['macd'] = latest('macd', 'MACD')
+    record['macd_signal'] = latest('macd', 'Signal')
+    upper, lower = latest('bollinger', 'Upper', window=20), latest('bollinger', 'Lower', window=20)
+    record['bb_position'] = (close[-1] - lower) / (upper - lower) if upper > lower else None
+    record['atr14'] = latest('atr', window=14)
+    if record.get('price') is None:
+        record['price'] = float(close[-1])
+    return record
+
+
+def predict(record):
+    result = PricePredictor().predict_price(record['_history'], symbol=record['symbol'])
+    if not result['success']:
+        raise ValueError(result['error'])
+    record['predicted_price'] = float(result['predicted_price'])
+    record['predicted_change_pct'] = float(result['predicted_change_pct'])
+    record['confidence'] = float(result['confidence'])
+    return record
+
+
+def sentiment(record):
+    result = get_cached_news_sentiment(record['symbol'], limit=10)
+    record['sentiment'] = result['overall_sentiment']
+    record['sentiment_score'] = float(result['sentiment_score'])
+    record['articles'] = result['article_count']
+    return record
+
+
+class Stage:
+    """Worker threads applying one step to records from an input queue"""
+
+    def __init__(self, name, func, workers):
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.inbox = queue.Queue(maxsize=workers * QUEUE_DEPTH)
+        self.outbox = None
+        self.consumers = 1
+        self.items = 0
+        self.errors = 0
+        self.busy = 0.0
+        self.started = None
+        self.finished = None
+        self._running = workers
+        self._lock = threading.Lock()
+
+    def start(self, outbox, consumers=1):
+        self.outbox = outbox
+        self.consumers = consumers
+        for i in range(self.workers):
+            threading.Thread(target=self._work, name=f'batch-{self.name}-{i}', daemon=True).start()
+
+    def _work(self):
+        while True:
+            record = self.inbox.get()
+            if record is _DONE:
+                break
+            start = time.perf_counter()
+            # Records that failed earlier pass straight through to the output
+            if not record.get('error'):
+                try:
+                    record = self.func(record)
+                except Exception as e:
+                    record['error'] = f'{self.name}: {e}'
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.started = self.started or start
+                self.finished = start + elapsed
+                self.items += 1
+                self.errors += bool(record.get('error', '').startswith(self.name + ':'))
+                self.busy += elapsed
+            self.outbox.put(record)
+
+        # The last worker out tells every worker of the next stage to stop
+        with self._lock:
+            self._running -= 1
+            last = self._running == 0
+        if last:
+            for _ in range(self.consumers):
+                self.outbox.put(_DONE)
+
+    def throughput(self):
+        wall = (self.finished - self.started) if self.started else 0.0
+        return {
+            'stage': self.name,
+            'workers': self.workers,
+            'items': self.items,
+            'errors': self.errors,
+            'busy_s': self.busy,
+            'wall_s': wall,
+            'items_per_s': self.items / wall if wall > 0 else 0.0,
+            # Share of the stage's worker time spent working rather than waiting
+            'utilization': self.busy / (wall * self.workers) if wall > 0 else 0.0
+        }
+
+
+# Streaming writers, chosen by the output file's extension
+
+class CsvReport:
+    def __init__(self, path):
+        self.file = open(path, 'w', newline='')
+        self.writer = csv.DictWriter(self.file, [name for name, _ in COLUMNS], extrasaction='ignore')
+        self.writer.writeheader()
+
+    def write(self, row):
+        self.writer.writerow(row)
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetReport:
+    def __init__(self, path):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        self.pa = pa
+        self.schema = pa.schema([(name, getattr(pa, kind)()) for name, kind in COLUMNS])
+        self.writer = pq.ParquetWriter(path, self.schema)
+        self.rows = []
+
+    def write(self, row):
+        self.rows.append(row)
+        if len(self.rows) >= PARQUET_BATCH:
+            self._flush()
+
+    def _flush(self):
+        if self.rows:
+            columns = {name: [row.get(name) for row in self.rows] for name, _ in COLUMNS}
+            self.writer.write_table(self.pa.Table.from_pydict(columns, schema=self.schema))
+            self.rows = []
+
+    def close(self):
+        self._flush()
+        self.writer.close()
+
+
+class HtmlReport:
+    STYLE = ("body{background:#000;color:#ff6600;font-family:'Courier New',monospace}"
+             "table{border-collapse:collapse}th,td{padding:2px 8px;border-bottom:1px solid #333;text-align:right}"
+             "th{color:#fff}.up{color:#00ff00}.down{color:#ff4444}")
+
+    def __init__(self, path):
+        self.file = open(path, 'w')
+        self.file.write(f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>Batch report</title>"
+                        f"<style>{self.STYLE}</style></head><body>"
+                        f"<h2>Batch report — {datetime.now():%Y-%m-%d %H:%M}</h2><table><tr>"
+                        + ''.join(f'<th>{name}</th>' for name, _ in COLUMNS) + '</tr>\n')
+
+    def write(self, row):
+        cells = []
+        for name, kind in COLUMNS:
+            value = row.get(name)
+            if value is None:
+                text = ''
+            elif kind == 'float64':
+                text = f'{value:,.2f}'
+            elif kind == 'int64':
+                text = f'{value:,}'
+            else:
+                text = html.escape(str(value))
+            css = ' class="up"' if name.startswith(('change', 'predicted_change')) and (value or 0) > 0 else \
+                  ' class="down"' if name.startswith(('change', 'predicted_change')) and (value or 0) < 0 else ''
+            cells.append(f'<td{css}>{text}</td>')
+        self.file.write('<tr>' + ''.join(cells) + '</tr>\n')
+        self.file.flush()
+
+    def close(self):
+        self.file.write('</table></body></html>\n')
+        self.file.close()
+
+
+REPORTS = {'.csv': CsvReport, '.parquet': ParquetReport, '.html': HtmlReport}
+
+
+def open_report(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in REPORTS:
+        raise SystemExit(f"Unsupported output {path}: use one of {', '.join(REPORTS)}")
+    return REPORTS[extension](path)
+
+
+# Runner
+
+def resolve_symbols(args):
+    symbols = []
+    if args.symbols:
+        symbols += args.symbols.split(',')
+    if args.symbols_file:
+        with open(args.symbols_file) as f:
+            symbols += [line.split('#')[0] for line in f]
+    if args.universe:
+        symbols += UNIVERSES[args.universe](DynamicStockFetcher())
+    symbols = [s.strip().upper() for s in symbols if s.strip()]
+    return list(dict.fromkeys(symbols))[:args.limit] if args.limit else list(dict.fromkeys(symbols))
+
+
+def report_progress(stages, written, total, start):
+    elapsed = time.perf_counter() - start
+    counts = '  '.join(f'{stage.name} {stage.items}' for stage in stages)
+    print(f"[{elapsed:7.1f}s] {written}/{total} written  |  {counts}", file=sys.stderr)
+
+
+def run(symbols, output, workers, skip, period, progress):
+    funcs = {'fetch': partial(fetch, period=period), 'features': features, 'predict': predict, 'sentiment': sentiment}
+    stages = [Stage(name, funcs[name], workers[name]) for name in STAGES if name not in skip]
+    results = queue.Queue()
+    for stage, following in zip(stages, stages[1:]):
+        stage.start(following.inbox, following.workers)
+    stages[-1].start(results)
+
+    def feed():
+        for symbol in symbols:
+            stages[0].inbox.put({'symbol': symbol})
+        for _ in range(stages[0].workers):
+            stages[0].inbox.put(_DONE)
+
+    start = time.perf_counter()
+    threading.Thread(target=feed, name='batch-feed', daemon=True).start()
+
+    report = open_report(output)
+    written = 0
+    last_progress = start
+    try:
+        while True:
+            try:
+                record = results.get(timeout=progress)
+            except queue.Empty:
+                record = None
+            if record is _DONE:
+                break
+            if record is not None:
+                report.write({k: v for k, v in record.items() if not k.startswith('_')})
+                written += 1
+            if time.perf_counter() - last_progress >= progress:
+                report_progress(stages, written, len(symbols), start)
+                last_progress = time.perf_counter()
+    finally:
+        report.close()
+    return written, time.perf_counter() - start, [stage.throughput() for stage in stages]
+
+
+def print_throughput(stats, written, elapsed):
+    print(f"\n{'stage':<10} {'workers':>7} {'items':>6} {'errors':>6} {'busy s':>8} {'wall s':>8} {'items/s':>8} {'util':>6}")
+    for s in stats:
+        print(f"{s['stage']:<10} {s['workers']:>7} {s['items']:>6} {s['errors']:>6} {s['busy_s']:>8.1f} "
+              f"{s['wall_s']:>8.1f} {s['items_per_s']:>8.2f} {s['utilization']:>6.0%}")
+    print(f"\n{written} rows in {elapsed:.1f}s ({written / elapsed if elapsed else 0:.2f} symbols/s)")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compute quotes, indicators, predictions and news sentiment "
+                                                 "for a symbol list without the UI")
+    source = parser.add_argument_group('symbols (combined, duplicates dropped)')
+    source.add_argument('--symbols', help="comma-separated symbols")
+    source.add_argument('--symbols-file', help="file with one symbol per line; '#' starts a comment")
+    source.add_argument('--universe', choices=list(UNIVERSES), help="a constituent list the app tracks")
+    source.add_argument('--limit', type=int, help="only the first N symbols")
+    parser.add_argument('--output', default='batch_report.csv', help="report file: .csv, .parquet or .html")
+    parser.add_argument('--period', default='6mo', help="daily history each symbol is analysed on (default 6mo)")
+    for name in STAGES:
+        parser.add_argument(f'--{name}-workers', type=int, default=DEFAULT_WORKERS[name],
+                            help=f"threads in the {name} stage (default {DEFAULT_WORKERS[name]})")
+    parser.add_argument('--skip', default='', help="comma-separated stages to leave out: predict, sentiment")
+    parser.add_argument('--progress', type=float, default=5.0, help="seconds between progress lines")
+    args = parser.parse_args()
+
+    skip = {s.strip() for s in args.skip.split(',') if s.strip()}
+    if skip - {'predict', 'sentiment'}:
+        parser.error("only predict and sentiment can be skipped")
+    symbols = resolve_symbols(args)
+    if not symbols:
+        parser.error("no symbols: pass --symbols, --symbols-file or --universe")
+
+    workers = {name: max(1, getattr(args, f'{name}_workers')) for name in STAGES}
+    print(f"Running {len(symbols)} symbols through {', '.join(s for s in STAGES if s not in skip)}", file=sys.stderr)
+    written, elapsed, stats = run(symbols, args.output, workers, skip, args.period, args.progress)
+    print_throughput(stats, written, elapsed)
+    print(f"Wrote {args.output}")
@@ -0,0 +1,318 @@
+import argparse
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from ai import indicators
+from ai.nlp_processor import NLPProcessor
+from ai.price_predictor import PricePredictor
+from ai.sentiment_analyzer import SentimentAnalyzer
+from components.charts import CHART_OVERLAYS, build_chart_figure, calculate_rsi
+from data.data_fetcher import fetch_quote
+from data.quote_table import QuoteTable
+from data.resampling import resample_ohlcv
+
+# Everything runs offline on seeded synthetic data, so runs on the same
+# machine are comparable
+SEED = 42
+
+# A case is flagged when its best sample (the least disturbed by other load
+# on the machine) slows down by more than the threshold and the noise floor
+REGRESSION_THRESHOLD = 0.25
+NOISE_FLOOR_MS = 0.05
+
+# Fast cases are looped until one sample takes at least this long
+MIN_SAMPLE_SECONDS = 0.005
+
+CASES = {}
+
+
+def case(name, sizes):
+    """Register a benchmark: setup(size) returns the callable to time"""
+    def decorator(setup):
+        CASES[name] = (sizes, setup)
+        return setup
+    return decorator
+
+
+# Synthetic market data and news
+
+def synthetic_bars(n, freq='5min'):
+    rng = np.random.default_rng(SEED)
+    index = pd.date_range('2024-01-02 09:30', periods=n, freq=freq, tz='America/New_York')
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    spread = np.abs(rng.normal(0, 0.003, n)) * close
+    return pd.DataFrame({
+        'Open': close + rng.normal(0, 0.001, n) * close,
+        'High': close + spread,
+        'Low': close - spread,
+        'Close': close,
+        'Volume': rng.integers(1_000, 1_000_000, n)
+    }, index=index)
+
+
+def synthetic_symbols(n):
+    letters = np.array(list('ABCDEFGHIJKLMNOPQRSTUVWXYZ'))
+    rng = np.random.default_rng(SEED)
+    return list(dict.fromkeys(''.join(rng.choice(letters, rng.integers(2, 5))) for _ in range(n * 2)))[:n]
+
+
+def synthetic_quotes(n):
+    rng = np.random.default_rng(SEED)
+    quotes = {}
+    for symbol in synthetic_symbols(n):
+        price = float(rng.uniform(5, 500))
+        change = float(rng.normal(0, price * 0.02))
+        quotes[symbol] = {'symbol': symbol, 'price': price, 'change': change,
+                          'change_pct': change / (price - change) * 100, 'volume': float(rng.integers(1e4, 1e8)),
+                          'high': price * 1.01, 'low': price * 0.99}
+    return quotes
+
+
+HEADLINE_WORDS = ['shares', 'surge', 'rally', 'after', 'earnings', 'beat', 'guidance', 'cut', 'analysts',
+                  'downgrade', 'record', 'profit', 'loss', 'weak', 'demand', 'strong', 'growth', 'market',
+                  'investors', 'fall', 'as', 'the', 'company', 'reports', 'quarter', 'outlook']
+
+
+def synthetic_articles(n):
+    rng = np.random.default_rng(SEED)
+    return [{'title': ' '.join(rng.choice(HEADLINE_WORDS, 10)).capitalize(),
+             'description': ' '.join(rng.choice(HEADLINE_WORDS, 30))} for _ in range(n)]
+
+
+def synthetic_universe(n):
+    return {symbol: f"{symbol.title()} Holdings Inc." for symbol in synthetic_symbols(n)}
+
+
+class StubTicker:
+    """yf.Ticker stand-in answering every history request with the same
+    synthetic daily bars, so the quote path runs offline"""
+
+    bars = synthetic_bars(5, freq='B')
+    _history_metadata = {'dataGranularity': '1d'}
+
+    def __init__(self, symbol):
+        self.symbol = symbol
+
+    def history(self, **params):
+        return self.bars
+
+
+# Cases
+
+@case('quotes.assemble', sizes=[10, 100, 1000])
+def bench_quote_assembly(n):
+    """Watchlist table and ticker tape text from raw quote dicts"""
+    quotes = synthetic_quotes(n)
+
+    def run():
+        table = QuoteTable.from_mapping(quotes)
+        table.to_frame()
+        table.format("%s: $%.2f (%+.2f%%)", 'label', 'price', 'change_pct')
+    return run
+
+
+@case('quotes.fetch', sizes=[10, 100, 1000])
+def bench_quote_fetch(n):
+    """fetch_quote for n symbols through the circuit breaker and upstream
+    pool against a stubbed ticker, then the watchlist table"""
+    symbols = synthetic_symbols(n)
+
+    def run():
+        with mock.patch.object(yf, 'Ticker', StubTicker):
+            quotes = [fetch_quote(symbol) for symbol in symbols]
+        QuoteTable.from_mapping({symbol: quote for symbol, quote in zip(symbols, quotes) if quote})
+    return run
+
+
+def bench_indicator(name):
+    """Uncached indicator on n 5-minute bars"""
+    def setup(n):
+        bars = synthetic_bars(n)
+        return lambda: indicators.compute(name, bars)
+    return setup
+
+
+for indicator_name in indicators.INDICATORS:
+    case(f'indicators.{indicator_name}', sizes=[1_000, 10_000, 100_000])(bench_indicator(indicator_name))
+
+
+@case('charts.calculate_rsi', sizes=[1_000, 10_000, 100_000])
+def bench_calculate_rsi(n):
+    close = synthetic_bars(n)['Close']
+    return lambda: calculate_rsi(close)
+
+
+@case('charts.resample', sizes=[1_000, 10_000, 100_000])
+def bench_resample(n):
+    bars = synthetic_bars(n)
+    return lambda: resample_ohlcv(bars, '1h')
+
+
+@case('charts.build_figure', sizes=[1_000, 10_000, 100_000])
+def bench_chart_figure(n):
+    """Downsampled candlesticks plus every overlay, indicators uncached"""
+    bars = synthetic_bars(n)
+    return lambda: build_chart_figure(bars, None, '5m', list(CHART_OVERLAYS))
+
+
+@case('predictor.prepare_features', sizes=[250, 2_500, 25_000])
+def bench_prepare_features(n):
+    bars = synthetic_bars(n, freq='B')
+    predictor = PricePredictor()
+    return lambda: predictor.prepare_features(bars)
+
+
+@case('predictor.train_predict', sizes=[250, 1_000, 2_500])
+def bench_train_predict(n):
+    bars = synthetic_bars(n, freq='B')
+    return lambda: PricePredictor().predict_price(bars, days_ahead=5)
+
+
+@case('sentiment.batch', sizes=[10, 100, 1_000])
+def bench_sentiment(n):
+    articles = synthetic_articles(n)
+    analyzer = SentimentAnalyzer()
+    return lambda: analyzer.analyze_news_batch(articles)
+
+
+@case('nlp.load_universe', sizes=[100, 1_000, 5_000])
+def bench_nlp_load(n):
+    universe = synthetic_universe(n)
+    return lambda: NLPProcessor(universe)
+
+
+@case('nlp.parse_queries', sizes=[100, 1_000, 5_000])
+def bench_nlp_parse(n):
+    """200 distinct queries against a universe of n symbols, parse cache bypassed"""
+    universe = synthetic_universe(n)
+    nlp = NLPProcessor(universe)
+    symbols = list(universe)
+    names = list(universe.values())
+    templates = ['price of {s}', 'news about {n}', 'predict {s} price', 'analyze {n}',
+                 'compare {s} and {t}', 'how is {s} doing today']
+    queries = [templates[i % len(templates)].format(s=symbols[i % len(symbols)], n=names[(i * 7) % len(names)],
+                                                    t=symbols[(i * 13) % len(symbols)])
+               for i in range(200)]
+
+    def run():
+        for query in queries:
+            nlp._parse_uncached(query)
+    return run
+
+
+# Runner
+
+def measure(func, repeat):
+    """Per-call seconds for each of `repeat` samples, after one warmup call"""
+    start = time.perf_counter()
+    func()
+    first = time.perf_counter() - start
+    number = max(1, math.ceil(MIN_SAMPLE_SECONDS / max(first, 1e-9)))
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) / number)
+    return samples, number
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run_suite(pattern, repeat, quick):
+    results = []
+    for name, (sizes, setup) in CASES.items():
+        if pattern and pattern not in name:
+            continue
+        for size in sizes[:1] if quick else sizes:
+            samples, number = measure(setup(size), repeat)
+            samples_ms = [s * 1e3 for s in samples]
+            result = {
+                'case': name,
+                'size': size,
+                'median_ms': statistics.median(samples_ms),
+                'min_ms': min(samples_ms),
+                'max_ms': max(samples_ms),
+                'repeat': repeat,
+                'number': number
+            }
+            results.append(result)
+            print(f"{name:<28} {size:>8,} {result['median_ms']:>11.3f} ms  (min {result['min_ms']:.3f})")
+    return {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'machine': platform.platform(),
+            'seed': SEED
+        },
+        'results': results
+    }
+
+
+def compare(current, baseline, threshold):
+    """Per-case change against a baseline run; returns the regressions"""
+    previous = {(r['case'], r['size']): r['min_ms'] for r in baseline['results']}
+    regressions = []
+    print(f"\nAgainst {baseline['meta'].get('revision') or 'baseline'} ({baseline['meta'].get('timestamp')}):")
+    for result in current['results']:
+        before = previous.get((result['case'], result['size']))
+        if before is None:
+            continue
+        after = result['min_ms']
+        change = after / before - 1 if before else 0.0
+        regressed = change > threshold and after - before > NOISE_FLOOR_MS
+        result['baseline_ms'] = before
+        result['regression'] = regressed
+        if regressed:
+            regressions.append(result)
+        flag = 'REGRESSION' if regressed else 'faster' if change < -threshold else ''
+        print(f"{result['case']:<28} {result['size']:>8,} {before:>10.3f} -> {after:>10.3f} ms {change:>+7.1%}  {flag}")
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Time the terminal's hot paths offline on synthetic data")
+    parser.add_argument('--output', default='benchmark_results.json', help="where to write this run's JSON results")
+    parser.add_argument('--baseline', help="earlier results JSON to compare against")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help="relative slowdown flagged as a regression (default 0.25)")
+    parser.add_argument('--repeat', type=int, default=7, help="samples per case and size")
+    parser.add_argument('--filter', default='', help="only run cases whose name contains this")
+    parser.add_argument('--quick', action='store_true', help="smallest size of each case only")
+    args = parser.parse_args()
+
+    current = run_suite(args.filter, args.repeat, args.quick)
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(current, json.load(f), args.threshold)
+    with open(args.output, 'w') as f:
+        json.dump(current, f, indent=2)
+    print(f"\nWrote {len(current['results'])} results to {args.output}")
+    if regressions:
+        print(f"{len(regressions)} regression(s) over {args.threshold:.0%}")
+        sys.exit(1)
@@ -0,0 +1,351 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+import zlib
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# What one simulated analyst does, in order: (action, widget key or symbol).
+# Buttons inside a fragment rerun only that fragment, as in the browser;
+# 'refresh' is a full rerun with no input.
+SESSION_SCRIPT = [
+    ('open', None),
+    ('button', 'mag7_msft'),
+    ('button', 'chart_1y'),
+    ('lookup', 'JPM'),
+    ('button', 'chart_5d'),
+    ('button', 'mag7_nvda'),
+    ('button', 'chart_1m'),
+    ('lookup', 'XOM'),
+    ('refresh', None),
+    ('button', 'chart_max'),
+    ('button', 'mag7_aapl'),
+    ('refresh', None)
+]
+
+# Stand-in constituent lists, so no session waits on Wikipedia
+STAND_IN_SP500 = ['AAPL', 'MSFT', 'NVDA', 'AMZN', 'META', 'GOOGL', 'TSLA', 'JPM', 'XOM', 'UNH', 'JNJ', 'V', 'PG',
+                  'HD', 'MA', 'CVX', 'ABBV', 'KO', 'PEP', 'COST', 'WMT', 'BAC', 'MRK', 'AVGO', 'ORCL']
+STAND_IN_NASDAQ100 = ['AAPL', 'MSFT', 'NVDA', 'AMZN', 'META', 'GOOGL', 'TSLA', 'AVGO', 'COST', 'NFLX', 'AMD',
+                      'ADBE', 'PEP', 'CSCO', 'INTC', 'QCOM', 'TXN', 'AMGN', 'SBUX', 'PYPL']
+
+# Regular-session bars per day and sessions per period, for stand-in history
+BARS_PER_SESSION = {'1m': 390, '2m': 195, '5m': 78, '15m': 26, '30m': 13, '1h': 7, '1d': 1}
+PERIOD_SESSIONS = {'1d': 1, '5d': 5, '1mo': 21, '3mo': 63, '6mo': 126, '1y': 252, '2y': 504, '5y': 1260,
+                   '60d': 42, '730d': 504, 'max': 5000}
+
+
+# Stand-in data provider (runs inside the server process)
+
+class StandInTicker:
+    """Local replacement for yfinance.Ticker: deterministic synthetic bars
+    and info per symbol after a fixed simulated network latency."""
+
+    latency = 0.05
+
+    def __init__(self, symbol):
+        self.symbol = symbol
+        self._history_metadata = {'symbol': symbol}
+
+    def history(self, period='1mo', interval='1d', **kwargs):
+        time.sleep(self.latency)
+        per_session = BARS_PER_SESSION.get(interval, 1)
+        sessions = pd.bdate_range(end=pd.Timestamp.now().normalize(), periods=PERIOD_SESSIONS.get(period, 21))
+        if per_session == 1:
+            index = sessions.tz_localize('America/New_York')
+        else:
+            step = pd.Timedelta(minutes=390 // per_session)
+            offsets = pd.Timedelta(hours=9, minutes=30) + step * np.arange(per_session)
+            index = pd.DatetimeIndex((sessions.values[:, None] + offsets.values[None, :]).ravel())
+            index = index.tz_localize('America/New_York')
+
+        rng = np.random.default_rng(zlib.crc32(self.symbol.encode()))
+        close = rng.uniform(20, 400) * np.exp(np.cumsum(rng.normal(0, 0.01 / np.sqrt(per_session), len(index))))
+        spread = np.abs(rng.normal(0, 0.004, len(index))) * close
+        return pd.DataFrame({
+            'Open': close + rng.normal(0, 0.002, len(index)) * close,
+            'High': close + spread,
+            'Low': close - spread,
+            'Close': close,
+            'Volume': rng.integers(10_000, 5_000_000, len(index)),
+            'Dividends': 0.0,
+            'Stock Splits': 0.0
+        }, index=index)
+
+    @property
+    def info(self):
+        time.sleep(self.latency)
+        rng = np.random.default_rng(zlib.crc32(self.symbol.encode()))
+        shares = int(rng.integers(10 ** 8, 10 ** 10))
+        return {'longName': f"{self.symbol} Corporation", 'sharesOutstanding': shares,
+                'marketCap': shares * 100, 'volume': int(rng.integers(10 ** 6, 10 ** 8))}
+
+
+def serve(port, latency):
+    """Run the app on a Streamlit server whose upstream calls all go to the stand-in"""
+    os.chdir(APP_DIR)
+    sys.path.append(os.path.join(APP_DIR, 'src'))
+    import yfinance as yf
+    from streamlit.web import bootstrap
+    from data.data_fetcher import DynamicStockFetcher
+
+    StandInTicker.latency = latency
+    yf.Ticker = StandInTicker
+    DynamicStockFetcher.get_sp500_components.seed(STAND_IN_SP500, None)
+    DynamicStockFetcher.get_nasdaq100_components.seed(STAND_IN_NASDAQ100, None)
+    DynamicStockFetcher.get_symbol_universe.seed(
+        {symbol: f"{symbol} Corporation" for symbol in STAND_IN_SP500 + STAND_IN_NASDAQ100}, None)
+
+    flag_options = {'server_port': port, 'server_headless': True, 'server_fileWatcherType': 'none',
+                    'browser_gatherUsageStats': False, 'global_developmentMode': False}
+    bootstrap.load_config_options(flag_options)
+    bootstrap.run(os.path.join(APP_DIR, 'main.py'), False, [], flag_options)
+
+
+# Simulated sessions (run in the harness process)
+
+class Session:
+    """One browser tab, speaking Streamlit's websocket protocol"""
+
+    def __init__(self, ws, timeout):
+        self.ws = ws
+        self.timeout = timeout
+        self.widgets = {}  # widget key -> (widget id, fragment id)
+        self.text = {}     # widget key -> current text input value
+
+    async def rerun(self, trigger=None, text=None):
+        """Send a rerun and wait for it to finish; returns the app exceptions shown"""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        if text:
+            self.text.update(text)
+        message = BackMsg()
+        client_state = message.rerun_script
+        client_state.SetInParent()
+        for key, value in self.text.items():
+            if key in self.widgets:
+                state = client_state.widget_states.widgets.add()
+                state.id = self.widgets[key][0]
+                state.string_value = value
+        if trigger:
+            widget_id, fragment_id = self.widgets[trigger]
+            state = client_state.widget_states.widgets.add()
+            state.id = widget_id
+            state.trigger_value = True
+            # Text changes rerun the whole app, like the browser does once focus leaves the input
+            if fragment_id and not text:
+                client_state.fragment_id = fragment_id
+        await self.ws.write_message(message.SerializeToString(), binary=True)
+
+        errors = []
+        deadline = time.monotonic() + self.timeout
+        while True:
+            data = await asyncio.wait_for(self.ws.read_message(), max(deadline - time.monotonic(), 0))
+            if data is None:
+                raise ConnectionError("server closed the session")
+            msg = ForwardMsg()
+            msg.ParseFromString(data)
+            kind = msg.WhichOneof('type')
+            if kind == 'delta' and msg.delta.WhichOneof('type') == 'new_element':
+                element = msg.delta.new_element
+                element_type = element.WhichOneof('type')
+                if element_type == 'exception':
+                    errors.append(element.exception.message)
+                elif element_type and hasattr(getattr(element, element_type), 'id'):
+                    widget_id = getattr(element, element_type).id
+                    # Keyed widget ids end with "-<key>"
+                    self.widgets[widget_id.rpartition('-')[2]] = (widget_id, msg.delta.fragment_id)
+            elif kind == 'script_finished' and msg.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                return errors
+
+
+async def run_session(number, url, think, timeout):
+    """Play SESSION_SCRIPT in one session; returns one record per step"""
+    from tornado.websocket import websocket_connect
+
+    rng = random.Random(number)
+    ws = await websocket_connect(url, subprotocols=['streamlit'], max_message_size=256 * 2 ** 20)
+    session = Session(ws, timeout)
+    steps = []
+    try:
+        for action, target in SESSION_SCRIPT:
+            if action != 'open':
+                await asyncio.sleep(rng.uniform(0, 2 * think))
+            started = time.perf_counter()
+            try:
+                if action == 'button':
+                    errors = await session.rerun(trigger=target)
+                elif action == 'lookup':
+                    errors = await session.rerun(text={'stock_search': target})
+                else:
+                    errors = await session.rerun()
+                error = errors[0] if errors else None
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+            steps.append({'session': number, 'action': action, 'target': target,
+                          'latency_ms': (time.perf_counter() - started) * 1e3, 'error': error})
+    finally:
+        ws.close()
+    return steps
+
+
+async def run_sessions(sessions, url, think, ramp, timeout):
+    async def start(number):
+        await asyncio.sleep(ramp * number / max(sessions, 1))
+        return await run_session(number, url, think, timeout)
+    return await asyncio.gather(*(start(number) for number in range(sessions)))
+
+
+# Server process measurements (Linux /proc)
+
+def process_cpu_seconds(pid):
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            fields = f.read().rpartition(')')[2].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def process_memory_mb(pid):
+    """(resident, peak resident) MB"""
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            status = dict(line.split(':', 1) for line in f if ':' in line)
+        return int(status['VmRSS'].split()[0]) / 1024, int(status['VmHWM'].split()[0]) / 1024
+    except (OSError, KeyError, ValueError):
+        return None, None
+
+
+def scrape_metrics(port):
+    """{metric name: {labels: value}} from the app's Prometheus endpoint"""
+    metrics = {}
+    with urllib.request.urlopen(f'http://127.0.0.1:{port}/metrics', timeout=5) as response:
+        for line in response.read().decode().splitlines():
+            if not line or line.startswith('#'):
+                continue
+            series, _, value = line.rpartition(' ')
+            name, _, labels = series.partition('{')
+            metrics.setdefault(name, {})[labels.rstrip('}')] = float(value)
+    return metrics
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_healthy(port, process, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"server exited with code {process.returncode}")
+        try:
+            with urllib.request.urlopen(f'http://127.0.0.1:{port}/_stcore/health', timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server not healthy after {timeout}s")
+
+
+def run_level(sessions, args):
+    """Start a cold server, drive `sessions` concurrent sessions, measure it"""
+    port, metrics_port = free_port(), free_port()
+    log_path = os.path.join(tempfile.gettempdir(), f'luther_loadtest_{sessions}.log')
+    # Each level starts cold: its own history files, no checkpoint, mock news
+    env = dict(os.environ, LUTHER_HISTORY_DIR=tempfile.mkdtemp(prefix='luther_loadtest_'), LUTHER_CHECKPOINT='',
+               LUTHER_METRICS_PORT=str(metrics_port))
+    env.pop('NEWS_API_KEY', None)
+    command = [sys.executable, os.path.abspath(__file__), '--serve', str(port), '--latency', str(args.latency)]
+    with open(log_path, 'w') as log:
+        server = subprocess.Popen(command, env=env, stdout=log, stderr=subprocess.STDOUT)
+    try:
+        wait_healthy(port, server)
+        cpu_started = process_cpu_seconds(server.pid)
+        started = time.perf_counter()
+        results = asyncio.run(run_sessions(sessions, f'ws://127.0.0.1:{port}/_stcore/stream',
+                                           args.think, args.ramp, args.timeout))
+        wall = time.perf_counter() - started
+        cpu_finished = process_cpu_seconds(server.pid)
+        rss, peak_rss = process_memory_mb(server.pid)
+        metrics = scrape_metrics(metrics_port)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    steps = [step for session in results for step in session]
+    latencies = np.array([step['latency_ms'] for step in steps])
+    upstream = metrics.get('luther_upstream_requests_total', {})
+    by_action = Counter()
+    for step in steps:
+        by_action[step['action']] += step['latency_ms']
+    return {
+        'sessions': sessions,
+        'steps': len(steps),
+        'errors': sum(1 for step in steps if step['error']),
+        'first_error': next((step['error'] for step in steps if step['error']), None),
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p90_ms': float(np.percentile(latencies, 90)),
+        'p99_ms': float(np.percentile(latencies, 99)),
+        'max_ms': float(latencies.max()),
+        'mean_ms_by_action': {action: total / sum(1 for s in steps if s['action'] == action)
+                              for action, total in by_action.items()},
+        'reruns_per_s': len(steps) / wall,
+        'upstream_calls': sum(upstream.values()),
+        'upstream_per_session': sum(upstream.values()) / sessions,
+        'upstream_by_outcome': upstream,
+        'cpu_percent': (cpu_finished - cpu_started) / wall * 100 if cpu_started is not None else None,
+        'rss_mb': rss,
+        'peak_rss_mb': peak_rss,
+        'wall_s': wall,
+        'server_log': log_path,
+        'steps_detail': steps
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Drive simulated analyst sessions against a local app server "
+                                                 "backed by a stand-in data provider")
+    parser.add_argument('--sessions', default='1,2,4,8', help="comma-separated concurrent session counts")
+    parser.add_argument('--think', type=float, default=1.0, help="mean seconds between a session's interactions")
+    parser.add_argument('--ramp', type=float, default=2.0, help="seconds over which sessions connect")
+    parser.add_argument('--latency', type=float, default=0.05, help="simulated upstream latency in seconds")
+    parser.add_argument('--timeout', type=float, default=120, help="seconds one rerun may take")
+    parser.add_argument('--output', default='loadtest_results.json', help="where to write the results JSON")
+    parser.add_argument('--serve', type=int, metavar='PORT', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.latency)
+        sys.exit(0)
+
+    print(f"{'sessions':>8} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'errors':>6} "
+          f"{'upstream/session':>16} {'cpu %':>6} {'rss MB':>7} {'peak MB':>8}")
+    levels = []
+    for sessions in [int(n) for n in args.sessions.split(',')]:
+        level = run_level(sessions, args)
+        levels.append(level)
+        cpu = f"{level['cpu_percent']:>6.0f}" if level['cpu_percent'] is not None else f"{'n/a':>6}"
+        rss = f"{level['rss_mb']:>7.0f} {level['peak_rss_mb']:>8.0f}" if level['rss_mb'] else f"{'n/a':>7} {'n/a':>8}"
+        print(f"{sessions:>8} {level['p50_ms']:>8.0f} {level['p90_ms']:>8.0f} {level['p99_ms']:>8.0f} "
+              f"{level['errors']:>6} {level['upstream_per_session']:>16.1f} {cpu} {rss}")
+        if level['first_error']:
+            print(f"         first error: {level['first_error']} (server log: {level['server_log']})")
+    with open(args.output, 'w') as f:
+        json.dump({'script': SESSION_SCRIPT, 'think_s': args.think, 'latency_s': args.latency, 'levels': levels},
+                  f, indent=2)
+    print(f"Wrote {args.output}")
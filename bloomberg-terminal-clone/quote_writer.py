@@ -0,0 +1,116 @@
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+# Add src to path
+sys.path.append('src')
+
+from data import market_calendar, quote_snapshot, resilience
+from data.data_fetcher import DynamicStockFetcher, QUOTE_TTL, fetch_quote
+
+# Seconds between checks for newly requested symbols and heartbeats
+POLL_INTERVAL = 1.0
+
+# Requested symbols upstream answers as unknown this many refreshes in a row
+# are dropped, and ignored when requested again for REJECTED_TTL seconds
+MAX_REJECTIONS = 3
+REJECTED_TTL = 86400
+
+
+def seed_symbols():
+    """Indices and popular names the app shows on every page load"""
+    fetcher = DynamicStockFetcher()
+    return list(fetcher.fallback_indices.values()) + fetcher.fallback_popular
+
+
+def refresh_interval():
+    """Seconds until the next full refresh, following the market session"""
+    status = market_calendar.market_status()
+    if status.phase == 'open':
+        return QUOTE_TTL
+    if status.phase == 'closed':
+        return max(status.next_change.timestamp() - time.time(), POLL_INTERVAL)
+    return QUOTE_TTL * market_calendar.EXTENDED_HOURS_TTL_FACTOR
+
+
+class WantedSymbols:
+    """Tails the file app processes append requested symbols to"""
+
+    def __init__(self, path):
+        self.path = path
+        self.offset = 0
+
+    def read_new(self):
+        try:
+            with open(self.path) as f:
+                f.seek(self.offset)
+                data = f.read()
+        except FileNotFoundError:
+            return []
+        # Leave a partially written last line for the next poll
+        complete = data[:data.rfind('\n') + 1]
+        self.offset += len(complete)
+        return [line.strip().upper() for line in complete.splitlines() if line.strip()]
+
+
+def run(path, workers):
+    writer = quote_snapshot.QuoteSnapshotWriter(path)
+    # Requests left over from a previous writer are replayed
+    wanted = WantedSymbols(quote_snapshot.wanted_path(path))
+    seeds = seed_symbols()
+    symbols = list(dict.fromkeys(seeds + wanted.read_new()))
+    rejections = Counter()
+    rejected = resilience.NegativeCache(REJECTED_TTL)
+
+    def update(batch):
+        batch = list(batch)
+        for symbol, quote in zip(batch, pool.map(fetch_quote, batch)):
+            if quote:
+                writer.upsert(quote)
+                rejections.pop(symbol, None)
+            elif symbol in resilience.INVALID_SYMBOLS and symbol not in seeds:
+                # Unknown to upstream, not a failed request
+                rejections[symbol] += 1
+            writer.heartbeat()
+
+        for symbol in [s for s, count in rejections.items() if count >= MAX_REJECTIONS]:
+            del rejections[symbol]
+            rejected.add(symbol)
+            symbols.remove(symbol)
+            print(f"Dropped {symbol}: unknown to upstream {MAX_REJECTIONS} times in a row")
+
+    print(f"Quote writer {os.getpid()} serving {path}")
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='luther-quote-writer') as pool:
+        next_refresh = 0.0
+        try:
+            while True:
+                if time.time() >= next_refresh:
+                    update(symbols)
+                    next_refresh = time.time() + refresh_interval()
+
+                new = [s for s in wanted.read_new() if s not in symbols and s not in rejected]
+                if new:
+                    new = list(dict.fromkeys(new))[:quote_snapshot.CAPACITY - len(symbols)]
+                    symbols.extend(new)
+                    update(new)
+
+                writer.heartbeat()
+                time.sleep(POLL_INTERVAL)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            writer.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Maintain the shared quote snapshot for all app processes")
+    parser.add_argument('--path', default=quote_snapshot.SNAPSHOT_PATH,
+                        help="snapshot file (default: $LUTHER_QUOTE_SNAPSHOT)")
+    parser.add_argument('--workers', type=int, default=8, help="concurrent upstream fetches")
+    args = parser.parse_args()
+    if not args.path:
+        parser.error("set --path or LUTHER_QUOTE_SNAPSHOT")
+    run(args.path, args.workers)
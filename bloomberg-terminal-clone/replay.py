@@ -0,0 +1,210 @@
+import argparse
+import json
+import math
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import date, timedelta
+
+import pandas as pd
+
+# Add src to path
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(ROOT, 'src'))
+
+from ai.alerts import AlertEngine, FIELDS, build_snapshot
+from ai.correlation import CORRELATION_WINDOWS
+from ai.price_predictor import PricePredictor
+from components.charts import CHART_OVERLAYS, build_chart_figure
+from components.correlation import sector_correlations
+from components.fragments import REFRESH_INTERVALS
+from data import replay
+from data.data_fetcher import DynamicStockFetcher, get_stock_history, get_watchlist_data
+from data.resampling import get_period_history, period_interval
+
+# The AI panel only runs when asked; one prediction per this many replayed
+# seconds stands in for an analyst working through the day
+AI_EVERY = 300
+
+# The correlation panel's default window
+CORRELATION_WINDOW = CORRELATION_WINDOWS['3M']
+
+
+def live_seconds(panel):
+    """A panel's refresh interval during the regular session, in seconds"""
+    return float(REFRESH_INTERVALS[panel]['open'].rstrip('s'))
+
+
+def panel_symbols():
+    """Symbols the panels fetch on their own: the ticker tape's trending
+    list and the sector leaders behind the correlations"""
+    fetcher = DynamicStockFetcher()
+    return fetcher.get_dynamic_watchlist('trending') + fetcher.get_sector_leaders()
+
+
+def panel_work(symbols, chart_symbol):
+    """Data and compute behind each auto-refreshing panel, through the same
+    calls the panels make, without rendering: name -> (refresh interval in
+    replayed seconds, work)"""
+    alerts = AlertEngine()
+    alerts.set_rules(pd.DataFrame({
+        'symbol': [s for s in symbols for _ in range(2)],
+        'kind': ['move_abs_pct', 'rsi_above'] * len(symbols),
+        'threshold': [1.0, 70.0] * len(symbols)
+    }))
+
+    def quotes():
+        get_watchlist_data('trending')
+
+    def chart():
+        bars = get_period_history(chart_symbol, '1d')
+        if bars is not None:
+            build_chart_figure(bars, chart_symbol, period_interval('1d'), list(CHART_OVERLAYS))
+
+    def check_alerts():
+        alerts.evaluate(build_snapshot(alerts.symbols, set(FIELDS)))
+
+    def correlation():
+        sector_correlations(CORRELATION_WINDOW)
+
+    def predict():
+        history = get_stock_history(chart_symbol)
+        if history is not None:
+            PricePredictor().predict_price(history, symbol=chart_symbol)
+
+    return {
+        'quotes': (live_seconds('ticker_tape'), quotes),
+        'charts': (live_seconds('charts'), chart),
+        'alerts': (live_seconds('alerts'), check_alerts),
+        'correlation': (live_seconds('correlation'), correlation),
+        'ai_analytics': (AI_EVERY, predict)
+    }
+
+
+def work_per_second(costs, intervals):
+    """Seconds of pipeline work per replayed second, with every panel
+    refreshing at its live cadence in replay time"""
+    return sum(cost / intervals[name] for name, cost in costs.items())
+
+
+def measure(day, symbols, start_time, step, chart_symbol):
+    """Step the replay clock through the session as fast as the pipeline
+    runs, timing each panel on its replay-time schedule"""
+    preload = list(dict.fromkeys(symbols + panel_symbols()))
+    engine = replay.start(day, preload, start_time=start_time)
+    print(f"Loading {len(preload)} symbols' 1-minute bars for {day}...")
+    engine.ready.wait()
+    engine.clock.pause()
+    if not engine.loaded:
+        raise SystemExit(f"No 1-minute bars for {day}; upstream only keeps about 30 days of them")
+
+    panels = panel_work(symbols, chart_symbol)
+    samples = {name: [] for name in panels}
+    last_run = {}
+    now = engine.clock.now()
+    end = engine.close
+    replayed = (end - now).total_seconds()
+    while now <= end:
+        engine.clock.seek(now)
+        elapsed = (now - engine.open).total_seconds()
+        for name, (interval, work) in panels.items():
+            if elapsed - last_run.get(name, -math.inf) >= interval:
+                started = time.perf_counter()
+                work()
+                samples[name].append(time.perf_counter() - started)
+                last_run[name] = elapsed
+        now += timedelta(seconds=step)
+
+    intervals = {name: interval for name, (interval, _) in panels.items()}
+    # Mean cost per refresh: what the pipeline sustains over the session
+    costs = {name: statistics.fmean(times) for name, times in samples.items() if times}
+    busy = sum(sum(times) for times in samples.values())
+    work = work_per_second(costs, intervals)
+    return {
+        'date': day.isoformat(),
+        'symbols': preload,
+        'loaded': engine.loaded,
+        'replayed_s': replayed,
+        'busy_s': busy,
+        'panels': [{
+            'panel': name,
+            'interval_s': intervals[name],
+            'runs': len(times),
+            'mean_ms': costs[name] * 1e3,
+            'p99_ms': sorted(times)[min(len(times) - 1, int(len(times) * 0.99))] * 1e3
+        } for name, times in samples.items() if times],
+        'load': {f'{speed}x': speed * work for speed in replay.SPEEDS},
+        # Beyond this the replay outruns the pipeline and panels fall behind the clock
+        'max_speed': math.floor(1 / work) if work else None,
+        # Beyond this the app's refresh floor stretches the shortest panel interval
+        'refresh_floor_speed': min(intervals.values()) / replay.MIN_REFRESH_SECONDS
+    }
+
+
+def print_report(result):
+    print(f"\nReplayed {result['replayed_s'] / 3600:.1f}h of {result['date']} "
+          f"({result['loaded']}/{len(result['symbols'])} symbols) in {result['busy_s']:.1f}s of pipeline work")
+    print(f"{'panel':<14} {'every':>7} {'runs':>5} {'mean ms':>9} {'p99 ms':>9}")
+    for panel in result['panels']:
+        print(f"{panel['panel']:<14} {panel['interval_s']:>6g}s {panel['runs']:>5} "
+              f"{panel['mean_ms']:>9.1f} {panel['p99_ms']:>9.1f}")
+    print("\nPipeline load per session at live refresh cadence (1.0 = fully busy):")
+    print('  '.join(f"{speed} {load:.2f}" for speed, load in result['load'].items()))
+    speed = result['max_speed']
+    if speed is None:
+        print("No panel ran")
+    elif speed < replay.MIN_SPEED:
+        print("The pipeline cannot keep up even at 1x")
+    else:
+        print(f"Max sustainable replay speed: {speed:,}x"
+              + (f" (the replay clock tops out at {replay.MAX_SPEED}x)" if speed > replay.MAX_SPEED else ''))
+    print(f"Above {result['refresh_floor_speed']:g}x the app refreshes panels at most every "
+          f"{replay.MIN_REFRESH_SECONDS:g}s of wall time, so they update less often in replay time")
+
+
+def record(day, symbols):
+    engine = replay.start(day, symbols)
+    engine.ready.wait()
+    print(f"Stored 1-minute bars for {engine.loaded}/{len(symbols)} symbols on {day} in {replay.REPLAY_DIR}")
+
+
+def serve(day, symbols, speed, start_time, port):
+    env = dict(os.environ,
+               LUTHER_REPLAY_DATE=day.isoformat(),
+               LUTHER_REPLAY_SYMBOLS=','.join(symbols),
+               LUTHER_REPLAY_SPEED=str(speed),
+               LUTHER_REPLAY_START=start_time)
+    command = [sys.executable, '-m', 'streamlit', 'run', 'main.py', '--server.port', str(port)]
+    return subprocess.call(command, env=env, cwd=ROOT)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Replay a past trading day through the terminal from stored 1-minute bars")
+    parser.add_argument('--date', required=True, type=date.fromisoformat, help="trading day to replay (YYYY-MM-DD)")
+    parser.add_argument('--symbols', required=True, help="comma-separated symbols to load up front")
+    parser.add_argument('--speed', type=float, default=replay.REPLAY_SPEED,
+                        help=f"replay seconds per wall second, {replay.MIN_SPEED}-{replay.MAX_SPEED} (default 60)")
+    parser.add_argument('--start', default=replay.REPLAY_START, help="exchange time the replay starts at (default 09:30)")
+    parser.add_argument('--port', type=int, default=8501, help="port to serve the app on")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--record', action='store_true', help="only store the day's bars for later replays")
+    mode.add_argument('--measure', action='store_true',
+                      help="run the pipeline headless through the day and report the max sustainable speed")
+    parser.add_argument('--step', type=float, default=15, help="replayed seconds per measurement step (default 15)")
+    parser.add_argument('--chart-symbol', help="symbol charted and predicted while measuring (default: the first)")
+    parser.add_argument('--output', help="write the measurement as JSON")
+    args = parser.parse_args()
+
+    symbols = list(dict.fromkeys(s.strip().upper() for s in args.symbols.split(',') if s.strip()))
+    if args.record:
+        record(args.date, symbols)
+    elif args.measure:
+        result = measure(args.date, symbols, args.start, args.step, args.chart_symbol or symbols[0])
+        print_report(result)
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(result, f, indent=2)
+    else:
+        sys.exit(serve(args.date, symbols, args.speed, args.start, args.port))
@@ -0,0 +1,238 @@
+# src/Utils/memory_cache.py
+import functools
+import inspect
+import os
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from Utils import metrics, profiler
+
+# One ceiling shared by every bounded cache in the process
+MEMORY_LIMIT = int(float(os.getenv('LUTHER_CACHE_MB', '512')) * 2 ** 20)
+# Share of the budget entries that were hit at least once may hold
+PROTECTED_SHARE = 0.8
+
+CACHE_BYTES = metrics.REGISTRY.gauge('luther_cache_bytes', 'Resident bytes per bounded cache')
+CACHE_ENTRIES = metrics.REGISTRY.gauge('luther_cache_entries', 'Entries per bounded cache')
+CACHE_EVICTIONS = metrics.REGISTRY.counter(
+    'luther_cache_evictions_total', 'Entries evicted to stay under the cache memory limit')
+
+
+def sizeof(value) -> int:
+    """Approximate resident bytes of a cached value"""
+    if hasattr(value, 'nbytes') and not isinstance(value, (pd.DataFrame, pd.Series)):
+        return int(value.nbytes) + sys.getsizeof(value)
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(sizeof(k) + sizeof(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return sys.getsizeof(value) + sum(sizeof(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class _Entry:
+    __slots__ = ('value', 'nbytes', 'version', 'expires')
+
+    def __init__(self, value, nbytes: int, version, expires: float):
+        self.value = value
+        self.nbytes = nbytes
+        self.version = version
+        self.expires = expires
+
+
+class MemoryBudget:
+    """Byte-accounted segmented LRU shared by all bounded caches.
+
+    New entries start in the probation segment; a hit promotes them to the
+    protected segment (capped at PROTECTED_SHARE of the limit). Evictions
+    take the least recently used probation entries first, so a burst of
+    one-off lookups or prefetches cannot push out data that is in use.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._probation = OrderedDict()
+        self._protected = OrderedDict()
+        self._protected_bytes = 0
+        self.bytes = Counter()
+        self.entries = Counter()
+        self.stats = Counter()
+        self._lock = threading.Lock()
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(self.bytes.values())
+
+    def get(self, key, version, count_miss: bool = True):
+        """(hit, value); expired entries and other versions are dropped"""
+        with self._lock:
+            segment = self._protected if key in self._protected else self._probation
+            entry = segment.get(key)
+            if entry is None or entry.version != version or entry.expires <= time.time():
+                if entry is not None:
+                    self._remove(key)
+                if count_miss:
+                    self.stats[(key[0], 'misses')] += 1
+                return False, None
+
+            self.stats[(key[0], 'hits')] += 1
+            if segment is self._probation:
+                del self._probation[key]
+                self._protected[key] = entry
+                self._protected_bytes += entry.nbytes
+                self._demote()
+            else:
+                self._protected.move_to_end(key)
+            return True, entry.value
+
+    def put(self, key, value, version, ttl: float):
+        nbytes = sizeof(value)
+        with self._lock:
+            self._remove(key)
+            if nbytes > self.limit:
+                return
+            self._probation[key] = _Entry(value, nbytes, version, time.time() + ttl)
+            self._account(key[0], nbytes, 1)
+            self._evict()
+
+    def _account(self, cache: str, nbytes: int, entries: int):
+        self.bytes[cache] += nbytes
+        self.entries[cache] += entries
+        CACHE_BYTES.set(self.bytes[cache], cache=cache)
+        CACHE_ENTRIES.set(self.entries[cache], cache=cache)
+
+    def _remove(self, key) -> Optional[_Entry]:
+        entry = self._probation.pop(key, None)
+        if entry is None:
+            entry = self._protected.pop(key, None)
+            if entry is not None:
+                self._protected_bytes -= entry.nbytes
+        if entry is not None:
+            self._account(key[0], -entry.nbytes, -1)
+        return entry
+
+    def _demote(self):
+        while self._protected_bytes > self.limit * PROTECTED_SHARE:
+            key, entry = self._protected.popitem(last=False)
+            self._protected_bytes -= entry.nbytes
+            self._probation[key] = entry
+
+    def _evict(self):
+        while self.total_bytes > self.limit and (self._probation or self._protected):
+            segment = self._probation if self._probation else self._protected
+            key = next(iter(segment))
+            self._remove(key)
+            self.stats[(key[0], 'evictions')] += 1
+            CACHE_EVICTIONS.inc(cache=key[0])
+
+    def clear(self, cache: Optional[str] = None):
+        with self._lock:
+            for key in [k for k in list(self._probation) + list(self._protected) if cache in (None, k[0])]:
+                self._remove(key)
+
+    def items(self, cache: str) -> List[Tuple[Dict, object]]:
+        """(arguments, stored value) of a cache's live entries, most recently used first"""
+        now = time.time()
+        with self._lock:
+            entries = list(reversed(self._protected.items())) + list(reversed(self._probation.items()))
+        return [(dict(key[1:]), entry.value) for key, entry in entries if key[0] == cache and entry.expires > now]
+
+    def usage(self) -> List[Dict]:
+        """Resident size and counters per cache, largest first"""
+        with self._lock:
+            names = set(self.entries) | {name for name, _ in self.stats}
+            rows = [{
+                'cache': name,
+                'entries': self.entries[name],
+                'resident_mb': self.bytes[name] / 2 ** 20,
+                'hits': self.stats[(name, 'hits')],
+                'misses': self.stats[(name, 'misses')],
+                'evictions': self.stats[(name, 'evictions')]
+            } for name in names]
+        return sorted(rows, key=lambda row: row['resident_mb'], reverse=True)
+
+
+BUDGET = MemoryBudget(MEMORY_LIMIT)
+
+
+def bounded_cache(name: str, ttl: float, version_arg: Optional[str] = None,
+                  pack: Optional[Callable] = None, unpack: Optional[Callable] = None):
+    """Memoize a function in the shared byte budget.
+
+    A drop-in for st.cache_data on data functions: exceptions are not
+    cached, arguments starting with an underscore are not hashed, and
+    concurrent callers of the same key wait for one computation.
+    `version_arg` (e.g. refresh_epoch) is left out of the key: a call with
+    a new version replaces the entry instead of adding one. `pack` /
+    `unpack` convert values to and from their stored form; without them
+    callers share the stored object and must not modify it.
+
+    The wrapper also has seed(value, *args) to store a value computed
+    elsewhere (e.g. restored from disk), optionally for a shorter seed_ttl,
+    and refresh(*args) to recompute an entry even if it is cached.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+        key_locks = {}
+        locks_guard = threading.Lock()
+
+        def key_of(args, kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = {arg: value for arg, value in bound.arguments.items() if not arg.startswith('_')}
+            version = arguments.pop(version_arg, None) if version_arg else None
+            return (name,) + tuple(arguments.items()), version
+
+        def compute(key, version, args, kwargs):
+            value = func(*args, **kwargs)
+            stored = pack(value) if pack else value
+            BUDGET.put(key, stored, version, ttl)
+            return stored
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key, version = key_of(args, kwargs)
+            hit, stored = BUDGET.get(key, version)
+            if not hit:
+                with locks_guard:
+                    lock = key_locks.setdefault(key, threading.Lock())
+                with lock:
+                    hit, stored = BUDGET.get(key, version, count_miss=False)
+                    if not hit:
+                        profiler.cache_miss()
+                        stored = compute(key, version, args, kwargs)
+                with locks_guard:
+                    key_locks.pop(key, None)
+            return unpack(stored) if unpack else stored
+
+        def seed(value, *args, seed_ttl: Optional[float] = None, **kwargs):
+            key, version = key_of(args, kwargs)
+            BUDGET.put(key, pack(value) if pack else value, version, min(seed_ttl or ttl, ttl))
+
+        def refresh(*args, **kwargs):
+            key, version = key_of(args, kwargs)
+            stored = compute(key, version, args, kwargs)
+            return unpack(stored) if unpack else stored
+
+        wrapper.clear = lambda: BUDGET.clear(name)
+        wrapper.seed = seed
+        wrapper.refresh = refresh
+        wrapper.cache_name = name
+        return wrapper
+    return decorator
+
+
+def clear_all():
+    BUDGET.clear()
+
+
+def usage() -> List[Dict]:
+    return BUDGET.usage()
@@ -0,0 +1,241 @@
+# src/Utils/metrics.py
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+from Utils import profiler
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# A session counts as active if it reran within this many seconds
+ACTIVE_SESSION_WINDOW = 300
+
+# Cached data functions reported under a short cache name
+CACHE_NAMES = {
+    'data.get_real_stock_data': 'quotes',
+    'data.get_company_info': 'company',
+    'data.get_market_indices': 'indices',
+    'data.get_watchlist_data': 'watchlist',
+    'data.get_stock_history': 'history',
+    'data.get_base_history': 'history',
+    'data.get_close_matrix': 'history',
+    'data.get_cached_stock_news': 'news',
+    'ai.get_news_sentiment': 'sentiment'
+}
+
+
+def _label_key(labels: Dict[str, str]) -> Tuple:
+    return tuple(sorted(labels.items()))
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(key: Tuple, extra: Optional[Dict[str, str]] = None) -> str:
+    items = list(key) + sorted((extra or {}).items())
+    if not items:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in items) + '}'
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self.kind = 'counter'
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, key, None, value) for key, value in self._values.items()]
+
+
+class Gauge(Counter):
+    def __init__(self, name: str, help_text: str):
+        super().__init__(name, help_text)
+        self.kind = 'gauge'
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[_label_key(labels)] = value
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.kind = 'histogram'
+        self.buckets = tuple(buckets)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            counts, total, count = self._values.get(key, ([0] * len(self.buckets), 0.0, 0))
+            # Buckets are cumulative: every bound >= value is incremented
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._values[key] = (counts, total + value, count + 1)
+
+    def samples(self):
+        samples = []
+        with self._lock:
+            for key, (counts, total, count) in self._values.items():
+                for bound, bucket_count in zip(self.buckets, counts):
+                    samples.append((f'{self.name}_bucket', key, {'le': repr(bound)}, bucket_count))
+                samples.append((f'{self.name}_bucket', key, {'le': '+Inf'}, count))
+                samples.append((f'{self.name}_sum', key, None, total))
+                samples.append((f'{self.name}_count', key, None, count))
+        return samples
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        return self.register(Counter(name, help_text))
+
+    def gauge(self, name: str, help_text: str) -> Gauge:
+        return self.register(Gauge(name, help_text))
+
+    def histogram(self, name: str, help_text: str, buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help_text, buckets))
+
+    def render(self) -> str:
+        """Prometheus text exposition format"""
+        _refresh_gauges()
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            lines.append(f'# HELP {metric.name} {metric.help_text}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for name, key, extra, value in metric.samples():
+                lines.append(f'{name}{_format_labels(key, extra)} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+UPSTREAM_LATENCY = REGISTRY.histogram(
+    'luther_upstream_request_seconds', 'Latency of upstream data provider calls')
+UPSTREAM_REQUESTS = REGISTRY.counter(
+    'luther_upstream_requests_total', 'Upstream data provider calls by outcome')
+CACHE_REQUESTS = REGISTRY.counter(
+    'luther_cache_requests_total', 'Cached data lookups by cache and result')
+RERUN_DURATION = REGISTRY.histogram(
+    'luther_rerun_seconds', 'Duration of full app and fragment reruns')
+ACTIVE_SESSIONS = REGISTRY.gauge(
+    'luther_active_sessions', f'Sessions that reran in the last {ACTIVE_SESSION_WINDOW}s')
+
+_session_last_seen = {}
+_session_lock = threading.Lock()
+
+
+def _on_profiler_event(event: str, record):
+    if event == 'span':
+        if record.upstream:
+            # Span names are "<provider>.<call>", e.g. yfinance.history
+            provider, _, call = record.name.partition('.')
+            UPSTREAM_LATENCY.observe(record.duration, provider=provider, call=call)
+            UPSTREAM_REQUESTS.inc(provider=provider, outcome='error' if record.error else 'ok')
+        elif 'cache_hit' in record.tags and record.name in CACHE_NAMES:
+            CACHE_REQUESTS.inc(cache=CACHE_NAMES[record.name],
+                               result='hit' if record.tags['cache_hit'] else 'miss')
+    elif event == 'rerun':
+        kind = 'fragment' if record.label.startswith('fragment:') else 'app'
+        RERUN_DURATION.observe(record.duration, kind=kind)
+        with _session_lock:
+            _session_last_seen[record.session_id] = time.time()
+
+
+def _refresh_gauges():
+    cutoff = time.time() - ACTIVE_SESSION_WINDOW
+    with _session_lock:
+        for session_id in [s for s, seen in _session_last_seen.items() if seen < cutoff]:
+            del _session_last_seen[session_id]
+        ACTIVE_SESSIONS.set(len(_session_last_seen))
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = REGISTRY.render().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def write_metrics_file(path: str):
+    """Atomically write the current metrics to a file"""
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w') as f:
+        f.write(REGISTRY.render())
+    os.replace(tmp_path, path)
+
+
+def _file_writer_loop(path: str, interval: float):
+    while True:
+        try:
+            write_metrics_file(path)
+        except OSError as e:
+            print(f"Error writing metrics file {path}: {e}")
+        time.sleep(interval)
+
+
+_started = False
+_start_lock = threading.Lock()
+
+
+def start_exporters():
+    """Start collection and the configured exporters once per process.
+
+    LUTHER_METRICS_PORT serves /metrics over HTTP; LUTHER_METRICS_FILE is
+    rewritten every LUTHER_METRICS_INTERVAL seconds (default 15).
+    """
+    global _started
+    with _start_lock:
+        if _started:
+            return
+        _started = True
+
+    profiler.add_listener(_on_profiler_event)
+
+    port = os.getenv('LUTHER_METRICS_PORT')
+    if port:
+        try:
+            server = ThreadingHTTPServer(('0.0.0.0', int(port)), _MetricsHandler)
+            threading.Thread(target=server.serve_forever, name='luther-metrics-http', daemon=True).start()
+        except OSError as e:
+            # Another server process already owns the port
+            print(f"Metrics endpoint not started on port {port}: {e}")
+
+    path = os.getenv('LUTHER_METRICS_FILE')
+    if path:
+        interval = float(os.getenv('LUTHER_METRICS_INTERVAL', '15'))
+        threading.Thread(target=_file_writer_loop, args=(path, interval),
+                         name='luther-metrics-file', daemon=True).start()
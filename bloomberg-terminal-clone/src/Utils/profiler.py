@@ -0,0 +1,231 @@
+# src/Utils/profiler.py
+import functools
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+# Completed reruns kept for the diagnostics panel, across all sessions
+MAX_RECENT_RERUNS = 50
+
+_local = threading.local()
+_lock = threading.Lock()
+_recent_reruns = deque(maxlen=MAX_RECENT_RERUNS)
+_active_reruns: Dict[str, 'Rerun'] = {}
+_listeners: List[Callable] = []
+
+
+class Span:
+    """One timed section of a rerun"""
+
+    def __init__(self, name: str, parent: Optional['Span'], upstream: bool, tags: Dict):
+        self.name = name
+        self.parent = parent
+        self.upstream = upstream
+        self.tags = tags
+        self.started = time.perf_counter()
+        self.duration = None
+        self.upstream_calls = 0
+        self.error = False
+
+    def finish(self):
+        self.duration = time.perf_counter() - self.started
+        if self.upstream:
+            # Every enclosing span learns that it went to the network
+            node = self
+            while node is not None:
+                node.upstream_calls += 1
+                node = node.parent
+
+
+class Rerun:
+    """All spans recorded during one script or fragment run of a session"""
+
+    def __init__(self, session_id: str, label: str):
+        self.session_id = session_id
+        self.label = label
+        self.started_at = time.time()
+        self.started = time.perf_counter()
+        self.duration = None
+        self.status = 'running'
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def add(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+
+    @property
+    def upstream_calls(self) -> int:
+        return sum(1 for span in self.spans if span.upstream)
+
+    def finish(self, status: str = 'done'):
+        if self.duration is None:
+            self.duration = time.perf_counter() - self.started
+            self.status = status
+
+
+def begin_rerun(session_id: str, label: str = 'app') -> Rerun:
+    """Start recording a rerun for a session in the current thread"""
+    rerun = Rerun(session_id, label)
+    with _lock:
+        previous = _active_reruns.get(session_id)
+        if previous is not None and previous.duration is None:
+            # A st.rerun() or exception cut the previous run short
+            _finish(previous, 'interrupted')
+        _active_reruns[session_id] = rerun
+    _local.rerun = rerun
+    _local.stack = []
+    return rerun
+
+
+def end_rerun(status: str = 'done'):
+    """Finish the rerun recorded by the current thread"""
+    rerun = current_rerun()
+    if rerun is not None:
+        with _lock:
+            _finish(rerun, status)
+            if _active_reruns.get(rerun.session_id) is rerun:
+                del _active_reruns[rerun.session_id]
+    _local.rerun = None
+
+
+def _finish(rerun: Rerun, status: str):
+    rerun.finish(status)
+    _recent_reruns.append(rerun)
+    _notify('rerun', rerun)
+
+
+def add_listener(listener: Callable):
+    """Call listener(event, record) for every finished span and rerun.
+
+    Spans are reported even outside a rerun (e.g. background threads)
+    once at least one listener is registered.
+    """
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+
+def _notify(event: str, record):
+    for listener in list(_listeners):
+        try:
+            listener(event, record)
+        except Exception:
+            pass
+
+
+def current_rerun() -> Optional[Rerun]:
+    """Rerun being recorded by this thread, if it is still running"""
+    rerun = getattr(_local, 'rerun', None)
+    return rerun if rerun is not None and rerun.duration is None else None
+
+
+@contextmanager
+def span(name: str, upstream: bool = False, **tags):
+    """Time a block; upstream spans count as network calls"""
+    rerun = current_rerun()
+    if rerun is None and not _listeners:
+        yield None
+        return
+
+    if not hasattr(_local, 'stack'):
+        _local.stack = []
+    stack = _local.stack
+    record = Span(name, stack[-1] if stack else None, upstream, tags)
+    stack.append(record)
+    try:
+        yield record
+    except BaseException:
+        record.error = True
+        raise
+    finally:
+        stack.pop()
+        record.finish()
+        if rerun is not None:
+            rerun.add(record)
+        _notify('span', record)
+
+
+def timed(name: str, upstream: bool = False, cached: bool = False):
+    """Decorator form of span().
+
+    For cached functions the span is tagged cache_hit=True unless the
+    cache layer reports a miss with cache_miss() while it runs.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name, upstream=upstream) as record:
+                if record is not None and cached:
+                    record.tags['cache_hit'] = True
+                return func(*args, **kwargs)
+
+        # Keep st.cache_data's per-function clear() reachable
+        if hasattr(func, 'clear'):
+            wrapper.clear = func.clear
+        return wrapper
+    return decorator
+
+
+def cache_miss():
+    """Tag the innermost cached span as a miss; called by the cache layer
+    when it computes a value instead of returning a stored one"""
+    stack = getattr(_local, 'stack', None)
+    node = stack[-1] if stack else None
+    while node is not None and 'cache_hit' not in node.tags:
+        node = node.parent
+    if node is not None:
+        node.tags['cache_hit'] = False
+
+
+def bind(func):
+    """Carry the caller's rerun into a worker thread"""
+    rerun = current_rerun()
+    parent = _local.stack[-1] if rerun is not None and _local.stack else None
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        _local.rerun = rerun
+        _local.stack = [parent] if parent is not None else []
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _local.rerun = None
+            _local.stack = []
+    return wrapper
+
+
+def recent_reruns(session_id: Optional[str] = None) -> List[Rerun]:
+    """Completed and in-progress reruns, newest first"""
+    with _lock:
+        reruns = list(_recent_reruns) + [r for r in _active_reruns.values() if r.duration is None]
+    if session_id is not None:
+        reruns = [r for r in reruns if r.session_id == session_id]
+    return sorted(reruns, key=lambda r: r.started, reverse=True)
+
+
+def summarize(reruns: List[Rerun]) -> List[Dict]:
+    """Per-span latency percentiles, upstream calls and cache hit counts"""
+    durations, upstream, hits, lookups = {}, {}, {}, {}
+    for rerun in reruns:
+        for record in list(rerun.spans):
+            durations.setdefault(record.name, []).append(record.duration * 1000)
+            upstream[record.name] = upstream.get(record.name, 0) + record.upstream_calls
+            if 'cache_hit' in record.tags:
+                lookups[record.name] = lookups.get(record.name, 0) + 1
+                hits[record.name] = hits.get(record.name, 0) + int(record.tags['cache_hit'])
+
+    rows = []
+    for name, values in durations.items():
+        rows.append({
+            'span': name,
+            'calls': len(values),
+            'p50_ms': float(np.percentile(values, 50)),
+            'p95_ms': float(np.percentile(values, 95)),
+            'upstream_calls': upstream[name],
+            'cache_hit_pct': 100 * hits[name] / lookups[name] if name in lookups else None
+        })
+    return sorted(rows, key=lambda row: row['p95_ms'], reverse=True)
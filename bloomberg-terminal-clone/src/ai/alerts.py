@@ -0,0 +1,159 @@
+# src/ai/alerts.py
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from ai import indicators
+from data.data_fetcher import get_real_stock_data
+from data import market_calendar
+from data.resampling import get_base_history
+from Utils.profiler import timed
+
+# Snapshot fields rules can test, one row each in the snapshot matrix
+FIELDS = ('price', 'change_pct', 'abs_change_pct', 'rsi', 'volume_ratio')
+
+# Rule kind -> (field, direction); +1 fires at or above the threshold, -1 at or below
+RULE_KINDS = {
+    'price_above': ('price', 1),
+    'price_below': ('price', -1),
+    'move_up_pct': ('change_pct', 1),
+    'move_down_pct': ('change_pct', -1),
+    'move_abs_pct': ('abs_change_pct', 1),
+    'rsi_above': ('rsi', 1),
+    'rsi_below': ('rsi', -1),
+    'volume_spike': ('volume_ratio', 1)
+}
+
+RULE_LABELS = {
+    'price_above': 'Price crosses above',
+    'price_below': 'Price crosses below',
+    'move_up_pct': 'Day change % ≥',
+    'move_down_pct': 'Day change % ≤',
+    'move_abs_pct': 'Abs day change % ≥',
+    'rsi_above': 'RSI(14) ≥',
+    'rsi_below': 'RSI(14) ≤',
+    'volume_spike': 'Volume ≥ x avg (20d)'
+}
+
+DEFAULT_COOLDOWN = 300  # seconds before the same rule may fire again
+RSI_WINDOW = 14
+VOLUME_AVERAGE_DAYS = 20
+MAX_LOG_ENTRIES = 200
+
+
+class AlertEngine:
+    """Alert rules compiled to parallel arrays and evaluated in one pass.
+
+    Rules are edge-triggered: a rule fires when its condition turns true
+    (the first snapshot only arms it) and must become false again before it
+    can re-fire, and never within its cooldown of the last firing.
+    """
+
+    def __init__(self):
+        self.rules = pd.DataFrame(columns=['symbol', 'kind', 'threshold', 'cooldown'])
+        self.symbols: List[str] = []
+        self._state = {}
+        self.log = deque(maxlen=MAX_LOG_ENTRIES)
+        self._compile()
+
+    def set_rules(self, rules: pd.DataFrame):
+        """Replace the rule set, keeping trigger state for unchanged rules"""
+        rules = rules.dropna(subset=['symbol', 'kind', 'threshold']).copy()
+        rules['symbol'] = rules['symbol'].astype(str).str.strip().str.upper()
+        rules = rules[(rules['symbol'] != '') & rules['kind'].isin(list(RULE_KINDS))]
+        rules['threshold'] = rules['threshold'].astype(float)
+        if 'cooldown' not in rules:
+            rules['cooldown'] = DEFAULT_COOLDOWN
+        rules['cooldown'] = rules['cooldown'].fillna(DEFAULT_COOLDOWN).astype(float)
+        rules = rules.reset_index(drop=True)[['symbol', 'kind', 'threshold', 'cooldown']]
+        if rules.equals(self.rules):
+            return
+
+        # Carry armed/last-fired state over by rule identity
+        self._state = {key: state for key, state in zip(self._keys(), zip(self._was_true, self._last_fired))}
+        self.rules = rules
+        self._compile()
+
+    def _keys(self):
+        return list(zip(self.rules['symbol'], self.rules['kind'], self.rules['threshold']))
+
+    def _compile(self):
+        kinds = self.rules['kind'].tolist()
+        self.symbols = sorted(set(self.rules['symbol']))
+        position = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self._symbol_idx = np.array([position[s] for s in self.rules['symbol']], dtype=np.intp)
+        self._field_idx = np.array([FIELDS.index(RULE_KINDS[k][0]) for k in kinds], dtype=np.intp)
+        self._direction = np.array([RULE_KINDS[k][1] for k in kinds], dtype=np.int8)
+        self._threshold = self.rules['threshold'].to_numpy(dtype=np.float64)
+        self._cooldown = self.rules['cooldown'].to_numpy(dtype=np.float64)
+        self._rule_symbols = self.rules['symbol'].tolist()
+        self._rule_text = [f"{RULE_LABELS[kind]} {threshold:g}"
+                           for kind, threshold in zip(kinds, self._threshold.tolist())]
+
+        # -1: not yet observed, 0: condition false, 1: condition true
+        state = [self._state.get(key, (-1, -np.inf)) for key in self._keys()]
+        self._was_true = np.array([s[0] for s in state], dtype=np.int8)
+        self._last_fired = np.array([s[1] for s in state], dtype=np.float64)
+
+    def needed_fields(self) -> set:
+        return {FIELDS[i] for i in np.unique(self._field_idx)}
+
+    @timed('ai.alerts_evaluate')
+    def evaluate(self, snapshot: np.ndarray, now: Optional[float] = None) -> List[Dict]:
+        """Check every rule against a (len(FIELDS) x len(self.symbols)) snapshot.
+
+        Missing values (NaN) leave a rule's state untouched. Returns the
+        alerts that fired, which are also appended to the log.
+        """
+        if len(self._threshold) == 0:
+            return []
+        # Cooldowns run on replay time while a past session is replayed
+        now = market_calendar.now().timestamp() if now is None else now
+
+        values = snapshot[self._field_idx, self._symbol_idx]
+        known = ~np.isnan(values)
+        # Multiplying by the direction turns "<= threshold" into ">="
+        is_true = known & (values * self._direction >= self._threshold * self._direction)
+
+        rising = is_true & (self._was_true == 0)
+        fired = rising & (now - self._last_fired >= self._cooldown)
+
+        self._was_true = np.where(known, is_true, self._was_true).astype(np.int8)
+        self._last_fired[fired] = now
+
+        stamp = datetime.fromtimestamp(now, market_calendar.EXCHANGE_TZ).strftime('%H:%M:%S')
+        alerts = [{
+            'time': stamp,
+            'symbol': self._rule_symbols[i],
+            'rule': self._rule_text[i],
+            'value': float(values[i])
+        } for i in np.flatnonzero(fired)]
+        self.log.extendleft(alerts)
+        return alerts
+
+
+def build_snapshot(symbols: Sequence[str], fields: set) -> np.ndarray:
+    """Latest quote and indicator values as a (len(FIELDS) x len(symbols)) matrix"""
+    snapshot = np.full((len(FIELDS), len(symbols)), np.nan)
+    for j, symbol in enumerate(symbols):
+        quote = get_real_stock_data(symbol)
+        if quote:
+            snapshot[0, j] = quote['price']
+            snapshot[1, j] = quote['change_pct']
+            snapshot[2, j] = abs(quote['change_pct'])
+
+        if fields & {'rsi', 'volume_ratio'}:
+            daily = get_base_history(symbol, 'daily')
+            if daily is None or len(daily) <= VOLUME_AVERAGE_DAYS:
+                continue
+            if 'rsi' in fields:
+                snapshot[3, j] = indicators.compute('rsi', daily, symbol, '1d', window=RSI_WINDOW).iloc[-1]
+            if 'volume_ratio' in fields:
+                # Today's (possibly partial) bar against the previous sessions' average
+                average = daily['Volume'].iloc[-VOLUME_AVERAGE_DAYS - 1:-1].mean()
+                if average > 0:
+                    snapshot[4, j] = daily['Volume'].iloc[-1] / average
+    return snapshot
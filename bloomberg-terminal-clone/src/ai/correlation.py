@@ -0,0 +1,71 @@
+# src/ai/correlation.py
+import threading
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from ai.rolling_stats import RollingReturns
+from Utils.profiler import timed
+
+# Display label -> daily returns in the rolling window
+CORRELATION_WINDOWS = {'1M': 21, '3M': 63, '6M': 126, '1Y': 252}
+MIN_OBSERVATIONS = 10
+
+
+class CorrelationEngine:
+    """Rolling return correlations for a fixed, sector-tagged set of symbols.
+
+    Completed daily bars are pushed into running sums and cross-products
+    once; refreshes only add the forming bar (at the latest quote prices)
+    as a provisional row, so a live update is O(n^2) rather than a full
+    df.corr() over the window.
+    """
+
+    def __init__(self, symbols: Sequence[str], sectors: Sequence[str], window: int):
+        self.symbols = list(symbols)
+        self.returns = RollingReturns(self.symbols, window)
+
+        # Symbol -> sector one-hot membership for the sector aggregation
+        self.sectors = list(dict.fromkeys(sectors))
+        self._membership = (np.asarray(sectors, dtype=object)[:, None] == np.asarray(self.sectors, dtype=object)).astype(np.float64)
+        self._lock = threading.Lock()
+
+    def update(self, closes: pd.DataFrame) -> int:
+        with self._lock:
+            return self.returns.update(closes)
+
+    @property
+    def observations(self) -> int:
+        return self.returns.moments.count
+
+    @timed('ai.correlation')
+    def matrix(self, live_prices: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        """Symbol correlation matrix including the forming bar.
+
+        live_prices (aligned with self.symbols, NaN where unknown) override
+        the forming bar's close.
+        """
+        with self._lock:
+            if self.observations < MIN_OBSERVATIONS:
+                return None
+            return self.returns.moments.corr(self.returns.live(live_prices))
+
+    def sector_matrix(self, corr: np.ndarray) -> np.ndarray:
+        """Average pairwise correlation between (and, on the diagonal, within) sectors"""
+        m = self._membership
+        sizes = m.sum(axis=0)
+        # Block sums of the matrix; the diagonal blocks lose their self-correlations
+        totals = m.T @ corr @ m - np.diag(sizes)
+        pairs = np.outer(sizes, sizes) - np.diag(sizes)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            averages = totals / pairs
+        # A one-stock sector has no pairs of its own
+        return np.where(pairs > 0, averages, 1.0)
+
+
+@st.cache_resource(max_entries=20)
+def get_correlation_engine(symbols: tuple, sectors: tuple, window: int) -> CorrelationEngine:
+    """Engine shared by every session viewing the same symbols and window"""
+    return CorrelationEngine(symbols, sectors, window)
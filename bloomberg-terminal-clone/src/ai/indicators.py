@@ -0,0 +1,105 @@
+# src/ai/indicators.py
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from data import ohlcv
+from Utils.memory_cache import BUDGET, bounded_cache
+
+# Memoized results are shared by charts, the predictor and the query planner,
+# held in the shared cache byte budget; entries for bars that stopped
+# changing simply age out
+CACHE_TTL = 86400
+
+
+def sma(df: pd.DataFrame, window: int = 20) -> pd.Series:
+    """Simple moving average of the close"""
+    return df['Close'].rolling(window=window).mean()
+
+
+def ema(df: pd.DataFrame, span: int = 20) -> pd.Series:
+    """Exponential moving average of the close"""
+    return df['Close'].ewm(span=span, adjust=False).mean()
+
+
+def rsi(df: pd.DataFrame, window: int = 14) -> pd.Series:
+    """Relative strength index using simple rolling averages of gains and losses"""
+    delta = df['Close'].diff()
+    gain = delta.clip(lower=0).rolling(window=window).mean()
+    loss = (-delta.clip(upper=0)).rolling(window=window).mean()
+    return 100 - (100 / (1 + gain / loss))
+
+
+def macd(df: pd.DataFrame, fast: int = 12, slow: int = 26, signal: int = 9) -> pd.DataFrame:
+    """MACD line, signal line and histogram"""
+    close = df['Close']
+    line = close.ewm(span=fast, adjust=False).mean() - close.ewm(span=slow, adjust=False).mean()
+    signal_line = line.ewm(span=signal, adjust=False).mean()
+    return pd.DataFrame({'MACD': line, 'Signal': signal_line, 'Histogram': line - signal_line})
+
+
+def bollinger(df: pd.DataFrame, window: int = 20, num_std: float = 2.0) -> pd.DataFrame:
+    """Bollinger bands around the simple moving average"""
+    rolling = df['Close'].rolling(window=window)
+    middle = rolling.mean()
+    width = rolling.std() * num_std
+    return pd.DataFrame({'Middle': middle, 'Upper': middle + width, 'Lower': middle - width})
+
+
+def atr(df: pd.DataFrame, window: int = 14) -> pd.Series:
+    """Average true range"""
+    prev_close = df['Close'].shift(1)
+    true_range = np.maximum(df['High'] - df['Low'],
+                            np.maximum((df['High'] - prev_close).abs(), (df['Low'] - prev_close).abs()))
+    return true_range.rolling(window=window).mean()
+
+
+def vwap(df: pd.DataFrame) -> pd.Series:
+    """Volume-weighted average price, reset each session for intraday bars"""
+    typical = (df['High'] + df['Low'] + df['Close']) / 3
+    weighted = typical * df['Volume']
+    sessions = df.index.normalize() if isinstance(df.index, pd.DatetimeIndex) else None
+    if sessions is not None and sessions.has_duplicates:
+        return weighted.groupby(sessions).cumsum() / df['Volume'].groupby(sessions).cumsum()
+    return weighted.cumsum() / df['Volume'].cumsum()
+
+
+INDICATORS = {
+    'sma': sma,
+    'ema': ema,
+    'rsi': rsi,
+    'macd': macd,
+    'bollinger': bollinger,
+    'atr': atr,
+    'vwap': vwap
+}
+
+
+def compute(name: str, df: pd.DataFrame, symbol: Optional[str] = None, interval: Optional[str] = None, **params):
+    """Compute an indicator, memoized per (symbol, interval, bars, params).
+
+    Results are shared between callers and must be treated as read-only.
+    Without a symbol the result is computed but not cached.
+    """
+    if symbol is None or df.empty:
+        return INDICATORS[name](df, **params)
+
+    # First/last bar and length pin down which bars were used; the last bar's
+    # values catch a bar that is still forming and changes in place
+    last_bar = np.array([df[column].iat[-1] for column in ohlcv.OHLCV_COLUMNS if column in df.columns],
+                        dtype=np.float64).tobytes()
+    return _compute_cached(name, symbol, interval, df.index[0], df.index[-1], len(df), last_bar,
+                           tuple(sorted(params.items())), df)
+
+
+@bounded_cache('indicators', ttl=CACHE_TTL)
+def _compute_cached(name, symbol, interval, first, last, length, last_bar, params, _df):
+    return INDICATORS[name](_df, **dict(params))
+
+
+def cache_info() -> dict:
+    """Hit/miss counts and current size of the indicator cache"""
+    usage = next((row for row in BUDGET.usage() if row['cache'] == _compute_cached.cache_name), None)
+    return {'hits': usage['hits'] if usage else 0, 'misses': usage['misses'] if usage else 0,
+            'size': usage['entries'] if usage else 0}
@@ -1,10 +1,188 @@
 # src/ai/nlp_processor.py
 import re
-from typing import Dict, List, Tuple
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from Utils.profiler import timed
+
+# Built-in universe used until a larger one is loaded with load_universe()
+DEFAULT_UNIVERSE = {
+    'AAPL': 'Apple Inc.', 'MSFT': 'Microsoft Corporation', 'GOOGL': 'Alphabet Inc.',
+    'AMZN': 'Amazon.com Inc.', 'TSLA': 'Tesla Inc.', 'META': 'Meta Platforms Inc.',
+    'NVDA': 'NVIDIA Corporation', 'NFLX': 'Netflix Inc.', 'BABA': 'Alibaba Group Holding Ltd',
+    'UBER': 'Uber Technologies Inc.', 'AMD': 'Advanced Micro Devices Inc.', 'SPY': 'SPDR S&P 500 ETF',
+    'VTI': 'Vanguard Total Stock Market ETF', 'JNJ': 'Johnson & Johnson', 'UNH': 'UnitedHealth Group',
+    'PFE': 'Pfizer Inc.', 'ABBV': 'AbbVie Inc.', 'MRK': 'Merck & Co.', 'JPM': 'JPMorgan Chase & Co.',
+    'BAC': 'Bank of America Corp', 'WFC': 'Wells Fargo & Co', 'GS': 'Goldman Sachs Group',
+    'MS': 'Morgan Stanley', 'XOM': 'Exxon Mobil Corporation', 'CVX': 'Chevron Corporation',
+    'COP': 'ConocoPhillips', 'EOG': 'EOG Resources', 'SLB': 'Schlumberger',
+    'HD': 'Home Depot Inc.', 'MCD': "McDonald's Corporation", 'NKE': 'Nike Inc.',
+    'BA': 'Boeing Company', 'CAT': 'Caterpillar Inc.', 'GE': 'General Electric',
+    'LMT': 'Lockheed Martin', 'UPS': 'United Parcel Service', 'NEE': 'NextEra Energy',
+    'DUK': 'Duke Energy', 'SO': 'Southern Company', 'D': 'Dominion Energy',
+    'AEP': 'American Electric Power', 'LIN': 'Linde plc', 'APD': 'Air Products and Chemicals',
+    'SHW': 'Sherwin-Williams', 'FCX': 'Freeport-McMoRan', 'NEM': 'Newmont Corporation',
+    'AMT': 'American Tower', 'PLD': 'Prologis', 'CCI': 'Crown Castle', 'EQIX': 'Equinix',
+    'SPG': 'Simon Property Group', 'VZ': 'Verizon Communications', 'T': 'AT&T Inc.',
+    'TMUS': 'T-Mobile US', 'CHTR': 'Charter Communications', 'CMCSA': 'Comcast Corporation',
+    'WMT': 'Walmart Inc.'
+}
+
+# Common names people type that differ from the registered company name
+EXTRA_ALIASES = {
+    'google': 'GOOGL', 'facebook': 'META', 'amazon': 'AMZN', 'nvidia': 'NVDA',
+    'exxon': 'XOM', 'jp morgan': 'JPM', 'mcdonalds': 'MCD'
+}
+
+# Corporate suffixes stripped from company names to derive a short alias
+NAME_SUFFIXES = {
+    'inc', 'incorporated', 'corp', 'corporation', 'co', 'company', 'ltd', 'limited',
+    'plc', 'group', 'holding', 'holdings', 'platforms', 'technologies', 'the', 'class', 'us',
+    'a', 'b', 'c'
+}
+
+# Tickers that are also everyday words only match when typed in caps or as a $cashtag
+COMMON_WORDS = {
+    'a', 'all', 'am', 'an', 'and', 'are', 'at', 'be', 'big', 'by', 'can', 'car', 'd', 'do',
+    'for', 'go', 'has', 'have', 'he', 'hd', 'i', 'in', 'is', 'it', 'key', 'low', 'ma', 'me',
+    'ms', 'new', 'now', 'of', 'on', 'one', 'or', 'out', 'see', 'so', 't', 'the', 'to', 'two',
+    'up', 'us', 'was', 'we', 'well', 'win', 'you'
+}
+
+# A company name cut down to a single word is only an alias when the word is
+# distinctive: long enough and not a word queries use for something else
+MIN_ALIAS_LENGTH = 3
+INTENT_WORDS = {
+    'price', 'cost', 'value', 'news', 'predict', 'forecast', 'future', 'analyze', 'analysis',
+    'compare', 'market', 'overview', 'summary', 'trending', 'popular', 'portfolio', 'target',
+    'stock', 'stocks', 'share', 'shares', 'chart', 'earnings', 'dividend', 'buy', 'sell'
+}
+GENERIC_NAME_WORDS = {
+    'american', 'best', 'block', 'capital', 'first', 'general', 'global', 'health', 'international',
+    'match', 'national', 'news', 'public', 'southern', 'state', 'target', 'today', 'united'
+}
+
+TOKEN_PATTERN = re.compile(r"\$?[A-Za-z0-9]+(?:[.&\-][A-Za-z0-9]+)*(?:'s)?")
+
+_END = '$end'
+
+
+class SymbolRecognizer:
+    """Token-boundary automaton over tickers and company names.
+
+    Aliases are stored in a trie keyed by whole tokens, so matching a query
+    costs one walk per token regardless of universe size and can never hit
+    a substring inside a longer word ("meta" in "metadata").
+    """
+
+    def __init__(self, universe: Optional[Dict[str, str]] = None):
+        self._trie = {}
+        self.symbol_names = {}
+        self.alias_count = 0
+        self.max_alias_tokens = 1
+        if universe:
+            self.add_universe(universe)
+
+    def add_universe(self, universe: Dict[str, str]):
+        """Register symbols (and their company names) with the automaton"""
+        for symbol, name in universe.items():
+            symbol = symbol.upper().strip()
+            if not symbol:
+                continue
+            self.symbol_names[symbol] = name or symbol
+            self._add_alias((symbol.lower(),), symbol, ticker=True)
+            for alias in self._name_aliases(name):
+                self._add_alias(alias, symbol)
+
+    def add_alias(self, alias: str, symbol: str):
+        """Register a free-form alias such as a brand name"""
+        tokens = self._tokenize(alias)
+        if tokens:
+            self._add_alias(tuple(token for token, _ in tokens), symbol.upper())
+
+    def find(self, query: str) -> List[str]:
+        """Return symbols mentioned in the query, in order of first mention"""
+        tokens = self._tokenize(query)
+        found = []
+        i = 0
+        while i < len(tokens):
+            node = self._trie
+            match, match_end = None, i
+            for j in range(i, min(len(tokens), i + self.max_alias_tokens)):
+                node = node.get(tokens[j][0])
+                if node is None:
+                    break
+                entry = node.get(_END)
+                if entry and self._accepts(entry, tokens[i][1], single=(j == i)):
+                    match, match_end = entry[0], j
+            if match:
+                if match not in found:
+                    found.append(match)
+                i = match_end + 1
+            else:
+                i += 1
+        return found
+
+    def _accepts(self, entry: Tuple[str, bool], raw_token: str, single: bool) -> bool:
+        symbol, ambiguous = entry
+        if not (single and ambiguous):
+            return True
+        # Ambiguous tickers need an explicit signal that a ticker was meant
+        return raw_token.startswith('$') or raw_token.isupper()
+
+    def _add_alias(self, tokens: Tuple[str, ...], symbol: str, ticker: bool = False):
+        if not tokens:
+            return
+        node = self._trie
+        for token in tokens:
+            node = node.setdefault(token, {})
+        ambiguous = ticker and (len(tokens[0]) < 2 or tokens[0] in COMMON_WORDS)
+        if _END not in node or ticker:
+            node[_END] = (symbol, ambiguous)
+            self.alias_count += 1
+        self.max_alias_tokens = max(self.max_alias_tokens, len(tokens))
+
+    def _name_aliases(self, name: str) -> List[Tuple[str, ...]]:
+        tokens = tuple(token for token, _ in self._tokenize(name or ''))
+        if not tokens:
+            return []
+        aliases = [tokens]
+        short = list(tokens)
+        while len(short) > 1 and short[-1] in NAME_SUFFIXES:
+            # Keep the last suffix when the word left would be too generic ("news corp")
+            if len(short) == 2 and not self._distinctive(short[0]):
+                break
+            short.pop()
+        if short[0] == 'the' and len(short) > 1:
+            short.pop(0)
+        short = tuple(short)
+        if short != tokens and (len(short) > 1 or self._distinctive(short[0])):
+            aliases.append(short)
+        return aliases
+
+    @staticmethod
+    def _distinctive(word: str) -> bool:
+        """Whether a single word can stand for a company on its own"""
+        return (len(word) >= MIN_ALIAS_LENGTH
+                and word not in COMMON_WORDS and word not in INTENT_WORDS and word not in GENERIC_NAME_WORDS)
+
+    @staticmethod
+    def _tokenize(text: str) -> List[Tuple[str, str]]:
+        """Split text into (normalized, raw) tokens"""
+        tokens = []
+        for match in TOKEN_PATTERN.finditer(text):
+            raw = match.group(0)
+            if raw.endswith("'s"):
+                raw = raw[:-2]
+            normalized = raw.lstrip('$').lower().replace('.com', '')
+            if normalized:
+                tokens.append((normalized, raw))
+        return tokens
+
 
 class NLPProcessor:
-    def __init__(self):
-        self.stock_symbols = ['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'TSLA', 'META', 'NVDA', 'NFLX', 'BABA', 'UBER']
+    def __init__(self, universe: Optional[Dict[str, str]] = None, cache_size: int = 1024):
+        self.stock_symbols = []
         self.query_patterns = {
             'price': r'(?:price|cost|value)\s+(?:of\s+)?(\w+)',
             'news': r'news\s+(?:for\s+|about\s+)?(\w+)',
@@ -12,34 +190,48 @@ class NLPProcessor:
             'analysis': r'(?:analyze|analysis)\s+(\w+)',
             'compare': r'compare\s+(\w+)\s+(?:and|with|to)\s+(\w+)'
         }
-    
+        self.intent_regexes = self._compile_intents(self.query_patterns)
+        self.recognizer = SymbolRecognizer()
+        self.cache_size = cache_size
+        self.load_universe(universe or DEFAULT_UNIVERSE)
+        for alias, symbol in EXTRA_ALIASES.items():
+            self.recognizer.add_alias(alias, symbol)
+
+    def load_universe(self, universe: Dict[str, str]):
+        """Add symbols (mapped to company names) to the recognizer"""
+        self.recognizer.add_universe(universe)
+        self.stock_symbols = list(self.recognizer.symbol_names)
+        # Cached parses may now be missing symbols, so start a fresh cache
+        self._parse_cached = lru_cache(maxsize=self.cache_size)(self._parse_uncached)
+
+    @timed('ai.parse_query')
     def parse_query(self, query: str) -> Dict:
         """Parse natural language query and extract intent and entities"""
-        query = query.lower().strip()
-        
+        result = self._parse_cached(query.strip())
+        # Hand out copies so callers cannot mutate cached entries
+        return {**result, 'entities': list(result['entities']), 'symbols': list(result['symbols'])}
+
+    def _parse_uncached(self, raw_query: str) -> Dict:
+        query = raw_query.lower()
+
         result = {
             'intent': 'unknown',
             'entities': [],
             'symbols': [],
             'original_query': query
         }
-        
-        # Extract stock symbols
-        symbols_found = []
-        for symbol in self.stock_symbols:
-            if symbol.lower() in query:
-                symbols_found.append(symbol)
-        
-        result['symbols'] = symbols_found
-        
-        # Determine intent
-        for intent, pattern in self.query_patterns.items():
-            match = re.search(pattern, query)
+
+        # Extract stock symbols (case matters for tickers that are also words)
+        result['symbols'] = self.recognizer.find(raw_query)
+
+        # Determine intent; earlier patterns take priority wherever they match
+        for intent, regex in self.intent_regexes.items():
+            match = regex.search(query)
             if match:
                 result['intent'] = intent
-                result['entities'] = list(match.groups())
+                result['entities'] = [value for value in match.groups() if value is not None]
                 break
-        
+
         # Additional intent detection
         if 'market' in query and ('overview' in query or 'summary' in query):
             result['intent'] = 'market_overview'
@@ -47,9 +239,18 @@ class NLPProcessor:
             result['intent'] = 'trending'
         elif 'portfolio' in query:
             result['intent'] = 'portfolio'
-        
+
         return result
-    
+
+    def cache_info(self):
+        """Hit/miss statistics of the parsed-query cache"""
+        return self._parse_cached.cache_info()
+
+    @staticmethod
+    def _compile_intents(patterns: Dict[str, str]) -> Dict[str, re.Pattern]:
+        """Compile the per-intent patterns once, keeping their priority order"""
+        return {intent: re.compile(pattern) for intent, pattern in patterns.items()}
+
     def generate_response_template(self, intent: str, entities: List[str]) -> str:
         """Generate response template based on intent"""
         templates = {
@@ -60,5 +261,5 @@ class NLPProcessor:
             'trending': "Here are the trending stocks:",
             'unknown': "I can help you with stock prices, news, predictions, and market analysis."
         }
-        
-        return templates.get(intent, templates['unknown'])
\ No newline at end of file
+
+        return templates.get(intent, templates['unknown'])
@@ -0,0 +1,146 @@
+# src/ai/portfolio_risk.py
+import threading
+from statistics import NormalDist
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from ai.rolling_stats import RollingReturns
+from Utils.profiler import timed
+
+TRADING_DAYS = 252
+WINDOW = 252  # daily log returns in the covariance window
+MIN_OBSERVATIONS = 30
+BENCHMARK = 'SPY'
+CONFIDENCE = 0.95
+
+# Monte Carlo: multi-day horizon, Student-t scenarios for fatter tails
+MC_PATHS = 5000
+MC_HORIZON_DAYS = 10
+MC_DOF = 5
+MC_SEED = 7
+
+RISK_LEVELS = ((0.15, 'LOW'), (0.25, 'MODERATE'), (float('inf'), 'HIGH'))
+DIVERSIFICATION_LEVELS = ((1.1, 'POOR'), (1.3, 'FAIR'), (float('inf'), 'GOOD'))
+
+
+def _level(value: float, levels) -> str:
+    return next(label for bound, label in levels if value < bound)
+
+
+class PortfolioRiskEngine:
+    """Rolling return moments for a fixed set of symbols plus the benchmark.
+
+    Fed with aligned daily closes through RollingReturns, so the covariance
+    is updated incrementally as new bars arrive and the forming bar only
+    sets the prices used for valuation. Weights are applied at report time,
+    so editing share counts never touches the moments.
+    """
+
+    def __init__(self, symbols: Sequence[str], window: int = WINDOW):
+        self.symbols = list(symbols)
+        self.columns = self.symbols + ([BENCHMARK] if BENCHMARK not in self.symbols else [])
+        self.returns = RollingReturns(self.columns, window)
+        self.moments = self.returns.moments
+        self._lock = threading.Lock()
+
+    def update(self, closes: pd.DataFrame) -> int:
+        """Push returns for completed bars after the last seen one; returns bars added"""
+        with self._lock:
+            return self.returns.update(closes)
+
+    @property
+    def ready(self) -> bool:
+        return self.moments.count >= MIN_OBSERVATIONS
+
+    @timed('ai.portfolio_risk')
+    def report(self, shares: np.ndarray) -> Optional[Dict]:
+        """Risk metrics for share counts aligned with self.symbols"""
+        with self._lock:
+            if not self.ready:
+                return None
+            n = len(self.symbols)
+            bench = self.columns.index(BENCHMARK)
+            cov_all = self.moments.cov()
+            mean = self.moments.mean()[:n]
+            history = self.moments.rows()[:, :n]
+            prices = self.returns.prices[:n]
+
+        values = np.asarray(shares, dtype=np.float64) * prices
+        total = values.sum()
+        if total <= 0:
+            return None
+        w = values / total
+        cov = cov_all[:n, :n]
+
+        # Volatility and risk contributions
+        cov_w = cov @ w
+        port_var = float(w @ cov_w)
+        port_vol = np.sqrt(port_var)
+        asset_vol = np.sqrt(np.diag(cov))
+        contributions = w * cov_w / port_var
+        diversification_ratio = float(w @ asset_vol / port_vol)
+
+        # Beta of every holding and of the portfolio against the benchmark
+        betas = cov_all[:n, bench] / cov_all[bench, bench]
+
+        # One-day VaR / CVaR: parametric (normal) and historical
+        dist = NormalDist()
+        z = dist.inv_cdf(CONFIDENCE)
+        port_mean = float(mean @ w)
+        param_var = z * port_vol - port_mean
+        param_cvar = dist.pdf(z) / (1 - CONFIDENCE) * port_vol - port_mean
+        port_history = history @ w
+        hist_var, hist_cvar = _tail_loss(np.expm1(port_history))
+
+        mc_var, mc_cvar = self._monte_carlo(w, mean, cov)
+
+        annual_vol = float(port_vol * np.sqrt(TRADING_DAYS))
+        return {
+            'value': total,
+            'positions': n,
+            'volatility': annual_vol,
+            'risk_level': _level(annual_vol, RISK_LEVELS),
+            'beta': float(w @ betas),
+            'expected_return': float(np.expm1(port_mean * TRADING_DAYS)),
+            'var_param': param_var * total,
+            'cvar_param': param_cvar * total,
+            'var_hist': hist_var * total,
+            'cvar_hist': hist_cvar * total,
+            'var_mc': mc_var * total,
+            'cvar_mc': mc_cvar * total,
+            'diversification_ratio': diversification_ratio,
+            'diversification': _level(diversification_ratio, DIVERSIFICATION_LEVELS),
+            'effective_positions': float(1 / (w @ w)),
+            'risk_contributions': dict(zip(self.symbols, contributions)),
+            'betas': dict(zip(self.symbols, betas)),
+            'observations': len(history)
+        }
+
+    @staticmethod
+    def _monte_carlo(w: np.ndarray, mean: np.ndarray, cov: np.ndarray):
+        """Horizon VaR/CVaR from correlated Student-t log-return scenarios"""
+        rng = np.random.default_rng(MC_SEED)
+        # Eigen factor instead of Cholesky: with more holdings than observations
+        # (or duplicated series) the sample covariance is only semi-definite
+        eigenvalues, eigenvectors = np.linalg.eigh(cov)
+        factor = eigenvectors * np.sqrt(np.clip(eigenvalues, 0, None))
+        normals = rng.standard_normal((MC_PATHS, len(w))) @ factor.T
+        # Scale each path so scenarios keep the sample variance but get t tails
+        scale = np.sqrt((MC_DOF - 2) / rng.chisquare(MC_DOF, MC_PATHS))
+        log_returns = MC_HORIZON_DAYS * mean + np.sqrt(MC_HORIZON_DAYS) * normals * scale[:, None]
+        return _tail_loss(np.expm1(log_returns) @ w)
+
+
+def _tail_loss(returns: np.ndarray):
+    """(VaR, CVaR) as positive loss fractions at CONFIDENCE"""
+    cutoff = np.quantile(returns, 1 - CONFIDENCE)
+    return float(-cutoff), float(-returns[returns <= cutoff].mean())
+
+
+@st.cache_resource(max_entries=50)
+def get_risk_engine(symbols: tuple) -> PortfolioRiskEngine:
+    """Engine shared by every session holding the same set of symbols"""
+    return PortfolioRiskEngine(symbols)
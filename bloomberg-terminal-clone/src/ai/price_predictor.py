@@ -6,6 +6,10 @@ from sklearn.ensemble import RandomForestRegressor
 from sklearn.preprocessing import StandardScaler
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_squared_error, r2_score
+from typing import Dict, Optional
+
+from ai import indicators
+from Utils.profiler import timed
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -16,62 +20,72 @@ class PricePredictor:
         self.feature_columns = []
         self.is_trained = False
     
-    def prepare_features(self, stock_data: pd.DataFrame) -> pd.DataFrame:
-        """Prepare features for machine learning"""
+    def prepare_features(self, stock_data: pd.DataFrame, symbol: Optional[str] = None, interval: str = '1d') -> pd.DataFrame:
+        """Prepare features for machine learning
+
+        Moving averages, Bollinger bands and RSI come from the shared
+        indicator cache, so passing a symbol lets charts and the predictor
+        reuse each other's results for the same bars. Features are built in
+        a new frame that only reads the bars, so history mapped read-only
+        from the shared store is used without copying it.
+        """
         if stock_data.empty:
             return pd.DataFrame()
         
-        df = stock_data.copy()
+        close = stock_data['Close']
+        df = pd.DataFrame(index=stock_data.index)
+        
+        def indicator(name, **params):
+            return indicators.compute(name, stock_data, symbol, interval, **params)
         
         # Technical indicators
-        df['Returns'] = df['Close'].pct_change()
-        df['Volume_MA'] = df['Volume'].rolling(window=10).mean()
-        df['Price_MA_5'] = df['Close'].rolling(window=5).mean()
-        df['Price_MA_10'] = df['Close'].rolling(window=10).mean()
-        df['Price_MA_20'] = df['Close'].rolling(window=20).mean()
+        df['Returns'] = close.pct_change()
+        df['Volume_MA'] = stock_data['Volume'].rolling(window=10).mean()
+        df['Price_MA_5'] = indicator('sma', window=5)
+        df['Price_MA_10'] = indicator('sma', window=10)
+        df['Price_MA_20'] = indicator('sma', window=20)
         
         # Volatility
         df['Volatility'] = df['Returns'].rolling(window=10).std()
         
         # Price position indicators
-        df['High_Low_Ratio'] = df['High'] / df['Low']
-        df['Close_Open_Ratio'] = df['Close'] / df['Open']
+        df['High_Low_Ratio'] = stock_data['High'] / stock_data['Low']
+        df['Close_Open_Ratio'] = close / stock_data['Open']
         
         # Momentum indicators
-        df['Momentum_3'] = df['Close'] / df['Close'].shift(3)
-        df['Momentum_5'] = df['Close'] / df['Close'].shift(5)
+        df['Momentum_3'] = close / close.shift(3)
+        df['Momentum_5'] = close / close.shift(5)
         
-        # RSI (if available)
-        if 'RSI' in df.columns:
-            df['RSI_normalized'] = df['RSI'] / 100
+        # RSI
+        df['RSI_normalized'] = indicator('rsi', window=14) / 100
         
         # Bollinger Bands
-        df['BB_upper'] = df['Price_MA_20'] + (df['Close'].rolling(window=20).std() * 2)
-        df['BB_lower'] = df['Price_MA_20'] - (df['Close'].rolling(window=20).std() * 2)
-        df['BB_position'] = (df['Close'] - df['BB_lower']) / (df['BB_upper'] - df['BB_lower'])
+        bands = indicator('bollinger', window=20, num_std=2.0)
+        df['BB_upper'] = bands['Upper']
+        df['BB_lower'] = bands['Lower']
+        df['BB_position'] = (close - df['BB_lower']) / (df['BB_upper'] - df['BB_lower'])
         
         # Feature columns (exclude target and non-predictive columns)
         feature_cols = [
             'Volume_MA', 'Price_MA_5', 'Price_MA_10', 'Price_MA_20',
             'Volatility', 'High_Low_Ratio', 'Close_Open_Ratio',
-            'Momentum_3', 'Momentum_5', 'BB_position'
+            'Momentum_3', 'Momentum_5', 'BB_position', 'RSI_normalized'
         ]
         
-        if 'RSI_normalized' in df.columns:
-            feature_cols.append('RSI_normalized')
-        
         # Remove rows with NaN values
         df = df.dropna()
         
         return df[feature_cols]
     
-    def train_model(self, stock_data: pd.DataFrame, target_days: int = 1) -> Dict:
+    @timed('ai.train_model')
+    def train_model(self, stock_data: pd.DataFrame, target_days: int = 1,
+                    symbol: Optional[str] = None, interval: str = '1d') -> Dict:
         """Train the prediction model"""
         if stock_data.empty:
             return {'success': False, 'error': 'No data provided'}
         
         # Prepare features
-        features_df = self.prepare_features(stock_data)
+        features_df = self.prepare_features(stock_data, symbol, interval)
         
         if features_df.empty:
             return {'success': False, 'error': 'Could not prepare features'}
@@ -120,15 +134,17 @@ class PricePredictor:
             'test_samples': len(X_test)
         }
     
-    def predict_price(self, stock_data: pd.DataFrame, days_ahead: int = 1) -> Dict:
+    @timed('ai.predict_price')
+    def predict_price(self, stock_data: pd.DataFrame, days_ahead: int = 1,
+                      symbol: Optional[str] = None, interval: str = '1d') -> Dict:
         """Predict future price"""
         if not self.is_trained:
-            train_result = self.train_model(stock_data)
+            train_result = self.train_model(stock_data, symbol=symbol, interval=interval)
             if not train_result['success']:
                 return {'success': False, 'error': 'Could not train model'}
         
         # Prepare features for the latest data point
-        features_df = self.prepare_features(stock_data)
+        features_df = self.prepare_features(stock_data, symbol, interval)
         
         if features_df.empty:
             return {'success': False, 'error': 'Could not prepare features for prediction'}
@@ -0,0 +1,213 @@
+# src/ai/query_planner.py
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout, as_completed
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from ai import indicators
+from ai.nlp_processor import NLPProcessor
+from ai.price_predictor import PricePredictor
+from ai.sentiment_analyzer import get_cached_news_sentiment
+from data.data_fetcher import get_real_stock_data, get_stock_history, get_market_indices, get_watchlist_data
+from data.news_fetcher import get_cached_stock_news
+from Utils.profiler import bind, timed
+
+# Shared pool so concurrent chat queries cannot oversubscribe the upstream APIs
+EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix='luther-planner')
+
+# Data each intent needs per symbol; 'prediction' is chained onto 'history'
+INTENT_REQUIREMENTS = {
+    'price': ('quote',),
+    'news': ('news',),
+    'prediction': ('quote', 'history', 'prediction'),
+    'analysis': ('quote', 'history', 'news'),
+    'compare': ('quote', 'history'),
+    'unknown': ('quote',)
+}
+
+# Intents answered from a single market-wide fetch
+MARKET_REQUIREMENTS = {
+    'market_overview': 'indices',
+    'trending': 'trending'
+}
+
+MAX_SYMBOLS = 10
+
+
+class FetchRequest(NamedTuple):
+    kind: str
+    symbol: Optional[str] = None
+
+
+class QueryPlan:
+    """Deduplicated set of fetches needed to answer one parsed query"""
+
+    def __init__(self, parsed: Dict, symbols: List[str]):
+        self.parsed = parsed
+        self.intent = parsed['intent']
+        self.symbols = symbols
+        self.requests: List[FetchRequest] = []
+
+    def require(self, kind: str, symbol: Optional[str] = None):
+        request = FetchRequest(kind, symbol)
+        if request not in self.requests:
+            self.requests.append(request)
+
+    def __repr__(self):
+        return f"QueryPlan(intent={self.intent!r}, requests={self.requests!r})"
+
+
+class QueryPlanner:
+    def __init__(self, nlp: Optional[NLPProcessor] = None, timeout: float = 20.0):
+        self.nlp = nlp or NLPProcessor()
+        self.timeout = timeout
+        self.fetchers: Dict[str, Callable[[Optional[str]], Any]] = {
+            'quote': get_real_stock_data,
+            'history': get_stock_history,
+            'news': self._fetch_news,
+            'indices': lambda _: get_market_indices(),
+            'trending': lambda _: get_watchlist_data('trending')
+        }
+
+    def plan(self, parsed: Dict) -> QueryPlan:
+        """Compile a parsed query into the fetches needed to answer it"""
+        symbols = list(parsed['symbols'])
+        if not symbols:
+            # Fall back to entities naming a known symbol the recognizer passed
+            # over, such as a lowercase ticker that is also a word ("price of hd")
+            known = self.nlp.recognizer.symbol_names
+            symbols = list(dict.fromkeys(e.upper() for e in parsed['entities'] if e.upper() in known))
+        plan = QueryPlan(parsed, symbols[:MAX_SYMBOLS])
+
+        if plan.intent in MARKET_REQUIREMENTS:
+            plan.require(MARKET_REQUIREMENTS[plan.intent])
+            return plan
+
+        kinds = INTENT_REQUIREMENTS.get(plan.intent, INTENT_REQUIREMENTS['unknown'])
+        for symbol in plan.symbols:
+            for kind in kinds:
+                plan.require(kind, symbol)
+        return plan
+
+    @timed('ai.plan_execute')
+    def execute(self, plan: QueryPlan) -> Dict[FetchRequest, Any]:
+        """Run every fetch in the plan in one concurrent round"""
+        futures = {}
+        # Submit data fetches first so chained predictions never wait on queued work
+        for request in plan.requests:
+            if request.kind != 'prediction':
+                futures[request] = EXECUTOR.submit(bind(self.fetchers[request.kind]), request.symbol)
+        for request in plan.requests:
+            if request.kind == 'prediction':
+                history = futures[FetchRequest('history', request.symbol)]
+                futures[request] = EXECUTOR.submit(bind(self._predict), request.symbol, history, self.timeout)
+
+        # Collect in completion order under one deadline for the whole round;
+        # anything failed or still running by then is answered as missing
+        requests = {future: request for request, future in futures.items()}
+        results = dict.fromkeys(futures)
+        try:
+            for future in as_completed(requests, timeout=self.timeout):
+                try:
+                    results[requests[future]] = future.result()
+                except Exception:
+                    pass
+        except FutureTimeout:
+            for future in requests:
+                future.cancel()
+        return results
+
+    def answer(self, query: str) -> str:
+        """Parse, plan, execute and render a query as HTML"""
+        parsed = self.nlp.parse_query(query)
+        plan = self.plan(parsed)
+        if not plan.requests:
+            return self.nlp.generate_response_template('unknown', [])
+        return self.render(plan, self.execute(plan))
+
+    def render(self, plan: QueryPlan, results: Dict[FetchRequest, Any]) -> str:
+        """Render executed plan results as HTML for the quick-chat box"""
+        if plan.intent == 'market_overview':
+            rows = [self._quote_line(name, data) for name, data in (results[FetchRequest('indices')] or {}).items()]
+            return self.nlp.generate_response_template('market_overview', []) + '<br>' + '<br>'.join(rows)
+        if plan.intent == 'trending':
+            rows = [self._quote_line(symbol, data) for symbol, data in (results[FetchRequest('trending')] or {}).items()]
+            return self.nlp.generate_response_template('trending', []) + '<br>' + '<br>'.join(rows)
+
+        lines = []
+        for symbol in plan.symbols:
+            quote = results.get(FetchRequest('quote', symbol))
+            history = results.get(FetchRequest('history', symbol))
+            news = results.get(FetchRequest('news', symbol))
+            prediction = results.get(FetchRequest('prediction', symbol))
+
+            if FetchRequest('quote', symbol) in results:
+                if quote:
+                    lines.append(self._quote_line(symbol, quote))
+                else:
+                    lines.append(f"{symbol}: <span style=\"color: #ff4444;\">no data</span>")
+            if history is not None:
+                lines.append(self._trend_line(symbol, history))
+            if news:
+                lines.append(self._news_lines(symbol, news))
+            if prediction:
+                direction = 'rise' if prediction['predicted_change'] >= 0 else 'fall'
+                template = self.nlp.generate_response_template('prediction', [])
+                lines.append(template.format(
+                    symbol=symbol,
+                    direction=f"{direction} to ${prediction['predicted_price']:.2f} "
+                              f"({prediction['predicted_change_pct']:+.2f}%, confidence {prediction['confidence']:.0%})"
+                ))
+            elif FetchRequest('prediction', symbol) in results:
+                lines.append(f"{symbol}: not enough history for a prediction")
+
+        if plan.intent == 'compare' and len(plan.symbols) >= 2:
+            lines.append(self._compare_line(plan.symbols, results))
+        return '<br>'.join(lines)
+
+    def _fetch_news(self, symbol: str) -> Dict:
+        return {
+            'articles': get_cached_stock_news(symbol, limit=5),
+            'sentiment': get_cached_news_sentiment(symbol, limit=5)
+        }
+
+    @staticmethod
+    def _predict(symbol: str, history_future, timeout: float) -> Optional[Dict]:
+        history = history_future.result(timeout=timeout)
+        if history is None:
+            return None
+        result = PricePredictor().predict_price(history, symbol=symbol)
+        return result if result['success'] else None
+
+    @staticmethod
+    def _quote_line(label: str, data: Dict) -> str:
+        color = "#00ff88" if data['change'] >= 0 else "#ff4444"
+        sign = "+" if data['change'] >= 0 else ""
+        return (f"<strong>{label}</strong>: ${data['price']:.2f} "
+                f"<span style=\"color: {color};\">{sign}{data['change']:.2f} ({sign}{data['change_pct']:.2f}%)</span>")
+
+    @staticmethod
+    def _trend_line(symbol: str, history) -> str:
+        close = history['Close']
+        sma_20 = indicators.compute('sma', history, symbol, '1d', window=20).iloc[-1]
+        rsi = indicators.compute('rsi', history, symbol, '1d', window=14).iloc[-1]
+        trend = 'above' if close.iloc[-1] >= sma_20 else 'below'
+        return (f"Trading {trend} SMA20 (${sma_20:.2f}), RSI {rsi:.1f}, "
+                f"{len(close)}-bar return {(close.iloc[-1] / close.iloc[0] - 1):+.1%}")
+
+    @staticmethod
+    def _news_lines(symbol: str, news: Dict) -> str:
+        sentiment = news['sentiment']
+        headlines = ''.join(f"<br>• {article['title']}" for article in news['articles'][:3])
+        return f"News for {symbol}: {sentiment['overall_sentiment'].upper()} ({sentiment['article_count']} articles){headlines}"
+
+    @staticmethod
+    def _compare_line(symbols: List[str], results: Dict[FetchRequest, Any]) -> str:
+        returns = {}
+        for symbol in symbols:
+            history = results.get(FetchRequest('history', symbol))
+            if history is not None:
+                returns[symbol] = history['Close'].iloc[-1] / history['Close'].iloc[0] - 1
+        if len(returns) < 2:
+            return "Not enough history to compare"
+        leader = max(returns, key=returns.get)
+        return f"Stronger performer: <strong>{leader}</strong> (" + ', '.join(
+            f"{symbol} {ret:+.1%}" for symbol, ret in returns.items()) + ")"
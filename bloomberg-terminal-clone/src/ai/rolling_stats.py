@@ -0,0 +1,143 @@
+# src/ai/rolling_stats.py
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+
+class RollingMoments:
+    """Mean, covariance and correlation of the last `window` rows of a
+    multivariate series, updated incrementally.
+
+    Keeps running sums and cross-products: pushing k new rows (and dropping
+    the k oldest) costs O(k * n^2) instead of recomputing the covariance over
+    the whole window. The sums are rebuilt from the buffer every `window`
+    pushed rows so floating-point drift cannot accumulate.
+    """
+
+    def __init__(self, n_vars: int, window: int):
+        self.n_vars = n_vars
+        self.window = window
+        self._buffer = np.zeros((window, n_vars))
+        self._start = 0
+        self.count = 0
+        self._sum = np.zeros(n_vars)
+        self._cross = np.zeros((n_vars, n_vars))
+        self._since_resync = 0
+
+    def push(self, rows: np.ndarray):
+        """Add rows (k x n_vars), evicting the oldest beyond the window"""
+        rows = np.atleast_2d(np.asarray(rows, dtype=np.float64))[-self.window:]
+        k = len(rows)
+        if k == 0:
+            return
+
+        evicted = max(self.count + k - self.window, 0)
+        if evicted:
+            old = self._take(0, evicted)
+            self._sum -= old.sum(axis=0)
+            self._cross -= old.T @ old
+            self._start = (self._start + evicted) % self.window
+            self.count -= evicted
+
+        end = (self._start + self.count) % self.window
+        positions = (end + np.arange(k)) % self.window
+        self._buffer[positions] = rows
+        self._sum += rows.sum(axis=0)
+        self._cross += rows.T @ rows
+        self.count += k
+
+        self._since_resync += k
+        if self._since_resync >= self.window:
+            self._resync()
+
+    def _take(self, offset: int, k: int) -> np.ndarray:
+        positions = (self._start + offset + np.arange(k)) % self.window
+        return self._buffer[positions]
+
+    def _resync(self):
+        rows = self.rows()
+        self._sum = rows.sum(axis=0)
+        self._cross = rows.T @ rows
+        self._since_resync = 0
+
+    def rows(self) -> np.ndarray:
+        """Rows currently in the window, oldest first"""
+        return self._take(0, self.count)
+
+    def mean(self) -> np.ndarray:
+        return self._sum / self.count
+
+    def _with(self, extra):
+        """Sums as if `extra` had been pushed, without touching the window"""
+        if extra is None:
+            return self._sum, self._cross, self.count
+        extra = np.asarray(extra, dtype=np.float64)
+        total, cross, count = self._sum + extra, self._cross + np.outer(extra, extra), self.count + 1
+        if self.count == self.window:
+            oldest = self._buffer[self._start]
+            total, cross, count = total - oldest, cross - np.outer(oldest, oldest), count - 1
+        return total, cross, count
+
+    def cov(self, extra=None) -> np.ndarray:
+        """Sample covariance (ddof=1).
+
+        `extra` is a provisional row (e.g. a still-forming bar) included as
+        if pushed; useful for live previews that must not commit the row.
+        """
+        total, cross, count = self._with(extra)
+        return (cross - np.outer(total, total) / count) / (count - 1)
+
+    def corr(self, extra=None) -> np.ndarray:
+        cov = self.cov(extra)
+        std = np.sqrt(np.clip(np.diag(cov), 0, None))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            corr = cov / np.outer(std, std)
+        np.fill_diagonal(corr, 1.0)
+        return np.clip(corr, -1.0, 1.0)
+
+
+class RollingReturns:
+    """Daily log returns of fixed columns kept in a RollingMoments window.
+
+    Fed with aligned closes; only bars newer than the last one seen are
+    pushed. The newest bar may still be forming, so it only sets `prices`
+    and enters the moments once a later bar exists; live() gives its
+    provisional return for previews.
+    """
+
+    def __init__(self, columns: Sequence[str], window: int):
+        self.columns = list(columns)
+        self.moments = RollingMoments(len(self.columns), window)
+        self.last_bar = None
+        self.last_close = None
+        self.prices = None
+
+    def update(self, closes: pd.DataFrame) -> int:
+        """Push returns for completed bars after the last seen one; returns bars added"""
+        closes = closes.reindex(columns=self.columns).dropna()
+        if closes.empty:
+            return 0
+        self.prices = closes.iloc[-1].to_numpy(dtype=np.float64)
+
+        completed = closes.iloc[:-1]
+        if self.last_bar is not None:
+            completed = completed[completed.index > self.last_bar]
+        if completed.empty:
+            return 0
+
+        prices = completed.to_numpy(dtype=np.float64)
+        if self.last_close is not None:
+            prices = np.vstack([self.last_close, prices])
+        returns = np.diff(np.log(prices), axis=0)
+        self.moments.push(returns)
+        self.last_bar = completed.index[-1]
+        self.last_close = prices[-1]
+        return len(returns)
+
+    def live(self, prices=None):
+        """Return of the forming bar, optionally at newer prices (NaN keeps the bar close)"""
+        if self.last_close is None or self.prices is None:
+            return None
+        current = self.prices if prices is None else np.where(np.isnan(prices), self.prices, prices)
+        return np.log(current / self.last_close)
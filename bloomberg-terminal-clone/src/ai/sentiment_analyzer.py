@@ -3,6 +3,10 @@ import pandas as pd
 import numpy as np
 from typing import List, Dict, Tuple
 import re
+import streamlit as st
+
+from data.news_fetcher import get_cached_stock_news
+from Utils.profiler import cache_miss, timed
 
 try:
     from textblob import TextBlob
@@ -53,6 +57,7 @@ class SentimentAnalyzer:
             'confidence': abs(polarity)
         }
     
+    @timed('ai.sentiment_batch')
     def analyze_news_batch(self, news_articles: List[Dict]) -> Dict:
         """Analyze sentiment for multiple news articles"""
         if not news_articles:
@@ -119,4 +124,12 @@ class SentimentAnalyzer:
         adjusted_polarity = base_polarity + (adjustment * 0.5)
         
         # Keep within bounds
-        return max(-1, min(1, adjusted_polarity))
\ No newline at end of file
+        return max(-1, min(1, adjusted_polarity))
+
+
+@timed('ai.get_news_sentiment', cached=True)
+@st.cache_data(ttl=900)
+def get_cached_news_sentiment(symbol: str, limit: int = 10) -> Dict:
+    """Sentiment of a symbol's recent news, shared across sessions"""
+    cache_miss()
+    return SentimentAnalyzer().analyze_news_batch(get_cached_stock_news(symbol, limit))
@@ -1,5 +1,19 @@
 import streamlit as st
 
+from ai.query_planner import QueryPlanner
+from components.portfolio import render_portfolio_analytics
+from data.data_fetcher import DynamicStockFetcher
+
+@st.cache_resource
+def get_query_planner():
+    """Planner shared by all sessions, with the full symbol universe loaded"""
+    planner = QueryPlanner()
+    try:
+        planner.nlp.load_universe(DynamicStockFetcher().get_symbol_universe())
+    except Exception as e:
+        print(f"Symbol universe unavailable, recognizing the built-in symbols only: {e}")
+    return planner
+
 def render_ai_analytics():
     """Render AI analytics quadrant"""
     st.markdown("""
@@ -11,12 +25,11 @@ def render_ai_analytics():
             TSLA: <span style="color: #00ff00;">BULLISH (Target: $280)</span><br>
             NVDA: <span style="color: #00ff00;">STRONG BUY (Target: $520)</span>
         </div>
-        <div class="metric-card">
-            <strong>Portfolio Analytics:</strong><br>
-            Risk Level: <span style="color: #ffff00;">MODERATE</span><br>
-            Diversification: <span style="color: #00ff00;">GOOD</span><br>
-            Expected Return: <span style="color: #00ff00;">+12.5% (12mo)</span>
-        </div>
+    """, unsafe_allow_html=True)
+
+    render_portfolio_analytics()
+
+    st.markdown("""
         <div class="metric-card">
             <strong>Market Insights:</strong><br>
             • Tech sector showing strength<br>
@@ -24,11 +37,29 @@ def render_ai_analytics():
             • Support levels holding<br>
             • Momentum indicators bullish
         </div>
-        <div class="metric-card">
-            <strong>Quick Chat:</strong><br>
-            <input type="text" placeholder="Ask Luther.AI anything..." 
-                   style="width: 100%; background: #333; color: white; 
-                          border: 1px solid #555; padding: 5px; border-radius: 3px;">
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
\ No newline at end of file
+    """, unsafe_allow_html=True)
+
+    render_quick_chat()
+
+    st.markdown('</div>', unsafe_allow_html=True)
+
+def render_quick_chat():
+    """Answer natural language questions with one batched round of fetches"""
+    st.markdown('<div class="metric-card"><strong>Quick Chat:</strong></div>', unsafe_allow_html=True)
+    query = st.text_input(
+        "Quick Chat",
+        placeholder="Ask Luther.AI anything...",
+        key="ai_chat_query",
+        label_visibility="collapsed"
+    ).strip()
+
+    if not query:
+        return
+
+    # Only re-run the plan when the question changes, not on every rerun
+    if st.session_state.get('ai_chat_last_query') != query:
+        with st.spinner("Luther.AI is thinking..."):
+            st.session_state.ai_chat_answer = get_query_planner().answer(query)
+        st.session_state.ai_chat_last_query = query
+
+    st.markdown(f'<div class="metric-card">{st.session_state.ai_chat_answer}</div>', unsafe_allow_html=True)
@@ -0,0 +1,54 @@
+import pandas as pd
+import streamlit as st
+
+from ai.alerts import AlertEngine, DEFAULT_COOLDOWN, RULE_LABELS, build_snapshot
+
+# The editor shows rule labels; the engine works with rule kinds
+LABEL_KINDS = {label: kind for kind, label in RULE_LABELS.items()}
+
+DEFAULT_RULES = pd.DataFrame({
+    'symbol': ['SPY', 'NVDA'],
+    'rule': [RULE_LABELS['move_abs_pct'], RULE_LABELS['rsi_above']],
+    'threshold': [1.5, 70.0],
+    'cooldown': [DEFAULT_COOLDOWN, DEFAULT_COOLDOWN]
+})
+
+def get_alert_engine():
+    """Per-session engine; keeps rule trigger state and the alert log across reruns"""
+    if 'alert_engine' not in st.session_state:
+        st.session_state.alert_engine = AlertEngine()
+        st.session_state.alert_rules = DEFAULT_RULES.copy()
+    return st.session_state.alert_engine
+
+def render_alerts():
+    """Rule editor, evaluated against the latest quotes on every refresh"""
+    engine = get_alert_engine()
+
+    st.markdown('<div class="quadrant-title">🔔 Alerts</div>', unsafe_allow_html=True)
+    rules_col, log_col = st.columns(2)
+
+    with rules_col:
+        edited = st.data_editor(
+            st.session_state.alert_rules,
+            key="alert_rules_editor",
+            num_rows="dynamic",
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                'symbol': st.column_config.TextColumn("Symbol", required=True),
+                'rule': st.column_config.SelectboxColumn("Rule", options=list(LABEL_KINDS), required=True),
+                'threshold': st.column_config.NumberColumn("Threshold", required=True),
+                'cooldown': st.column_config.NumberColumn("Cooldown (s)", min_value=0, step=60)
+            }
+        )
+
+    engine.set_rules(edited.assign(kind=edited['rule'].map(LABEL_KINDS)))
+    fired = engine.evaluate(build_snapshot(engine.symbols, engine.needed_fields()))
+    for alert in fired:
+        st.toast(f"🔔 {alert['symbol']}: {alert['rule']} (now {alert['value']:.2f})")
+
+    with log_col:
+        if engine.log:
+            st.dataframe(pd.DataFrame(list(engine.log)), hide_index=True, use_container_width=True, height=200)
+        else:
+            st.info("No alerts fired yet")
@@ -1,8 +1,24 @@
 import streamlit as st
-import yfinance as yf
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
+from ai import indicators
+from Utils.profiler import span, timed
+from data.prefetch import record_click, warm_likely_next
+from data.resampling import get_period_history, period_interval
+from data.downsampling import ohlc_downsample, lttb_series, max_points_for_width
+
+# Display labels for the periods defined in data.resampling.PERIOD_VIEWS
+CHART_PERIODS = {"1D": "1d", "5D": "5d", "1M": "1mo", "3M": "3mo", "1Y": "1y", "5Y": "5y", "MAX": "max"}
+
+# Overlay name -> (indicator, params, column or None for a series, line color)
+CHART_OVERLAYS = {
+    "SMA20": [("sma", {"window": 20}, None, "#ff6600")],
+    "EMA50": [("ema", {"span": 50}, None, "#00bfff")],
+    "Bollinger": [("bollinger", {}, "Upper", "#888888"), ("bollinger", {}, "Lower", "#888888")],
+    "VWAP": [("vwap", {}, None, "#ffff00")]
+}
+
 def render_interactive_charts():
     """Render interactive charts that respond to stock search"""
     # Get the symbol from search or default to AAPL
@@ -11,87 +27,43 @@ def render_interactive_charts():
     st.markdown(f'<div class="quadrant"><div class="quadrant-title">Live Charts - {chart_symbol}</div>', unsafe_allow_html=True)
     
     # Chart period selector - make buttons smaller and in one row
-    col1, col2, col3, col4 = st.columns(4)
-    with col1:
-        if st.button("1D", key="chart_1d", use_container_width=True):
-            st.session_state.chart_period = "1d"
-    with col2:
-        if st.button("5D", key="chart_5d", use_container_width=True):
-            st.session_state.chart_period = "5d"
-    with col3:
-        if st.button("1M", key="chart_1m", use_container_width=True):
-            st.session_state.chart_period = "1mo"
-    with col4:
-        if st.button("3M", key="chart_3m", use_container_width=True):
-            st.session_state.chart_period = "3mo"
+    for col, (label, period) in zip(st.columns(len(CHART_PERIODS)), CHART_PERIODS.items()):
+        with col:
+            if st.button(label, key=f"chart_{label.lower()}", use_container_width=True):
+                st.session_state.chart_period = period
+                record_click('period', period)
     
     chart_period = st.session_state.get('chart_period', '5d')
+    overlays = st.multiselect(
+        "Overlays",
+        list(CHART_OVERLAYS),
+        default=["SMA20"],
+        key="chart_overlays",
+        label_visibility="collapsed"
+    )
     
     try:
-        ticker = yf.Ticker(chart_symbol)
-        
-        # Get interval based on period
-        if chart_period == "1d":
-            interval = "5m"  # 5-minute intervals for 1 day
-        elif chart_period == "5d":
-            interval = "15m"  # 15-minute intervals for 5 days
-        elif chart_period == "1mo":
-            interval = "1h"   # 1-hour intervals for 1 month
-        else:
-            interval = "1d"   # Daily intervals for longer periods
-            
-        chart_data = ticker.history(period=chart_period, interval=interval)
+        # Derived locally from one fine-grained download per symbol
+        full_data = get_period_history(chart_symbol, chart_period)
         
-        if not chart_data.empty:
-            # Create single chart (just price) for better fit
-            fig = go.Figure()
+        if full_data is not None:
+            # Indicators use every bar; only the plotted series are reduced
+            interval = period_interval(chart_period)
             
-            # Candlestick chart
-            fig.add_trace(
-                go.Candlestick(
-                    x=chart_data.index,
-                    open=chart_data['Open'],
-                    high=chart_data['High'],
-                    low=chart_data['Low'],
-                    close=chart_data['Close'],
-                    increasing_line_color='#00ff88',
-                    decreasing_line_color='#ff4444',
-                    name='Price'
-                )
-            )
-            
-            fig.update_layout(
-                plot_bgcolor='#0F0F0F',
-                paper_bgcolor='#1a1a1a',
-                font_color='white',
-                height=280,  # Reduced height to fit better
-                margin=dict(l=20, r=20, t=20, b=20),
-                showlegend=False,
-                xaxis_rangeslider_visible=False,
-                xaxis=dict(
-                    gridcolor='#333', 
-                    showgrid=True,
-                    title=""
-                ),
-                yaxis=dict(
-                    gridcolor='#333', 
-                    showgrid=True, 
-                    title='Price ($)',
-                    side='right'  # Move y-axis to right side
-                )
-            )
+            fig = build_chart_figure(full_data, chart_symbol, interval, overlays)
             
-            st.plotly_chart(fig, use_container_width=True)
+            with span('charts.plotly_chart'):
+                st.plotly_chart(fig, use_container_width=True)
             
             # Technical indicators in a compact format
-            if len(chart_data) >= 20:
+            if len(full_data) >= 20:
                 try:
-                    sma_20 = chart_data['Close'].rolling(window=20).mean().iloc[-1]
-                    rsi = calculate_rsi(chart_data['Close']).iloc[-1]
+                    sma_20 = indicators.compute("sma", full_data, chart_symbol, interval, window=20).iloc[-1]
+                    rsi = indicators.compute("rsi", full_data, chart_symbol, interval, window=14).iloc[-1]
                     
                     # Get current price and change
-                    current_price = chart_data['Close'].iloc[-1]
-                    prev_price = chart_data['Close'].iloc[-2] if len(chart_data) > 1 else current_price
+                    current_price = full_data['Close'].iloc[-1]
+                    prev_price = full_data['Close'].iloc[-2] if len(full_data) > 1 else current_price
                     change = current_price - prev_price
                     change_pct = (change / prev_price) * 100
                     change_color = "#00ff88" if change >= 0 else "#ff4444"
@@ -131,12 +103,70 @@ def render_interactive_charts():
         st.error(f"Chart error: {str(e)}")
     
     st.markdown('</div>', unsafe_allow_html=True)
+    
+    # Period clicks rerun only this fragment; warm what is likely next from here too
+    warm_likely_next()
+
+@timed('charts.build_figure')
+def build_chart_figure(full_data, chart_symbol, interval, overlays):
+    """Build the candlestick figure with downsampled bars and overlays"""
+    chart_data = ohlc_downsample(full_data, max_points_for_width())
+    
+    # Create single chart (just price) for better fit
+    fig = go.Figure()
+    
+    # Candlestick chart
+    fig.add_trace(
+        go.Candlestick(
+            x=chart_data.index,
+            open=chart_data['Open'],
+            high=chart_data['High'],
+            low=chart_data['Low'],
+            close=chart_data['Close'],
+            increasing_line_color='#00ff88',
+            decreasing_line_color='#ff4444',
+            name='Price'
+        )
+    )
+    
+    # Indicator overlays
+    for overlay in overlays:
+        for name, params, column, color in CHART_OVERLAYS[overlay]:
+            values = indicators.compute(name, full_data, chart_symbol, interval, **params)
+            line = lttb_series(values[column] if column else values, max_points_for_width())
+            fig.add_trace(
+                go.Scatter(
+                    x=line.index,
+                    y=line.values,
+                    mode='lines',
+                    line=dict(color=color, width=1),
+                    name=overlay
+                )
+            )
+    
+    fig.update_layout(
+        plot_bgcolor='#0F0F0F',
+        paper_bgcolor='#1a1a1a',
+        font_color='white',
+        height=280,  # Reduced height to fit better
+        margin=dict(l=20, r=20, t=20, b=20),
+        showlegend=False,
+        xaxis_rangeslider_visible=False,
+        xaxis=dict(
+            gridcolor='#333', 
+            showgrid=True,
+            title=""
+        ),
+        yaxis=dict(
+            gridcolor='#333', 
+            showgrid=True, 
+            title='Price ($)',
+            side='right'  # Move y-axis to right side
+        )
+    )
+    
+    return fig
 
 def calculate_rsi(prices, window=14):
     """Calculate RSI technical indicator"""
-    delta = prices.diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=window).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=window).mean()
-    rs = gain / loss
-    rsi = 100 - (100 / (1 + rs))
-    return rsi
\ No newline at end of file
+    return indicators.rsi(prices.to_frame('Close'), window=window)
@@ -0,0 +1,86 @@
+import numpy as np
+import plotly.graph_objects as go
+import streamlit as st
+
+from ai.correlation import CORRELATION_WINDOWS, get_correlation_engine
+from data.data_fetcher import SECTOR_LEADERS, DynamicStockFetcher, get_watchlist_data
+from data.resampling import get_close_matrix
+from Utils.profiler import span
+
+CORRELATION_VIEWS = ["Sectors", "Stocks"]
+
+def sector_of():
+    """Symbol -> first sector listing it"""
+    sectors = {}
+    for sector, leaders in SECTOR_LEADERS.items():
+        for symbol in leaders:
+            sectors.setdefault(symbol, sector)
+    return sectors
+
+def build_heatmap(matrix, labels, height):
+    fig = go.Figure(go.Heatmap(
+        z=matrix, x=labels, y=labels,
+        zmin=-1, zmax=1, colorscale='RdBu', reversescale=True,
+        hovertemplate='%{y} / %{x}: %{z:.2f}<extra></extra>'
+    ))
+    fig.update_layout(
+        template='plotly_dark',
+        height=height,
+        margin=dict(l=0, r=0, t=10, b=0),
+        paper_bgcolor='#000000',
+        plot_bgcolor='#000000',
+        yaxis=dict(autorange='reversed')
+    )
+    return fig
+
+def sector_correlations(window):
+    """(engine, symbols, matrix) for the sector leaders over `window` daily
+    returns plus today's move at the latest quotes; None without history.
+    The matrix is None until the engine has enough observations."""
+    leaders = DynamicStockFetcher().get_sector_leaders()
+    closes = get_close_matrix(leaders, bars=window + 2)
+    if closes is None:
+        return None
+
+    # Engines are keyed by the symbols that actually have history
+    sectors = sector_of()
+    symbols = tuple(symbol for symbol in leaders if symbol in closes.columns)
+    engine = get_correlation_engine(symbols, tuple(sectors[symbol] for symbol in symbols), window)
+    engine.update(closes)
+
+    # Latest quotes stand in for the forming bar's close
+    quotes = get_watchlist_data('sectors', limit=len(leaders))
+    price_of = dict(zip(quotes.symbols.tolist(), quotes.columns['price'].tolist()))
+    live_prices = np.array([price_of.get(symbol, np.nan) for symbol in symbols])
+    return engine, symbols, engine.matrix(live_prices)
+
+def render_correlation_heatmap():
+    """Rolling return correlations of the sector leaders, live during the session"""
+    st.markdown('<div class="quadrant-title">🧭 Sector Correlations</div>', unsafe_allow_html=True)
+
+    view_col, window_col = st.columns(2)
+    with view_col:
+        view = st.radio("View", CORRELATION_VIEWS, key="correlation_view", horizontal=True, label_visibility="collapsed")
+    with window_col:
+        window_label = st.radio("Window", list(CORRELATION_WINDOWS), index=1, key="correlation_window",
+                                horizontal=True, label_visibility="collapsed")
+    window = CORRELATION_WINDOWS[window_label]
+
+    result = sector_correlations(window)
+    if result is None:
+        st.warning("⚠️ Price history unavailable for correlations")
+        return
+    engine, symbols, corr = result
+    if corr is None:
+        st.warning("⚠️ Not enough price history for correlations")
+        return
+
+    if view == "Sectors":
+        matrix, labels, height = engine.sector_matrix(corr), engine.sectors, 420
+    else:
+        matrix, labels, height = corr, list(symbols), 700
+
+    with span('correlation.plotly_chart'):
+        st.plotly_chart(build_heatmap(np.round(matrix, 2), labels, height), use_container_width=True)
+    st.caption(f"{engine.observations} daily returns + today's move at latest quotes; "
+               "sector cells average pairwise stock correlations")
@@ -0,0 +1,69 @@
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+from components.fragments import current_session_id
+from data import checkpoint, history_store, prefetch, replay, resilience
+from Utils import memory_cache, profiler
+
+def diagnostics_enabled():
+    """Panel is opt-in via the footer toggle or ?diagnostics=1"""
+    return st.session_state.get('show_diagnostics') or st.query_params.get('diagnostics') == '1'
+
+def render_diagnostics_panel():
+    """Per-quadrant and per-call latency for this session's recent reruns"""
+    reruns = profiler.recent_reruns(current_session_id())
+    if not reruns:
+        st.info("No reruns recorded yet")
+        return
+
+    st.markdown('<div class="quadrant-title">Diagnostics</div>', unsafe_allow_html=True)
+
+    # Latest run first, including fragment-only reruns
+    st.dataframe(pd.DataFrame([{
+        'run': rerun.label,
+        'status': rerun.status,
+        'started': pd.Timestamp(rerun.started_at, unit='s').strftime('%H:%M:%S'),
+        'duration_ms': rerun.duration * 1000 if rerun.duration is not None else None,
+        'upstream_calls': rerun.upstream_calls,
+        'spans': len(rerun.spans)
+    } for rerun in reruns]), use_container_width=True, hide_index=True)
+
+    # Process-wide: shared by every session on this server
+    st.caption(f"Upstream circuits ({len(resilience.INVALID_SYMBOLS)} symbols negatively cached)")
+    st.dataframe(pd.DataFrame(resilience.status()).round(1), use_container_width=True, hide_index=True)
+    st.caption(f"Bounded caches ({memory_cache.BUDGET.total_bytes / 2 ** 20:.1f} of "
+               f"{memory_cache.BUDGET.limit / 2 ** 20:.0f} MB)")
+    st.dataframe(pd.DataFrame(memory_cache.usage()).round(2), use_container_width=True, hide_index=True)
+    stats = prefetch.PREFETCHER.stats
+    st.caption(f"Prefetch: {stats['submitted']} warm tasks submitted, {stats['dropped']} dropped over budget, "
+               f"{stats['errors']} failed")
+    store = history_store.STORE
+    st.caption(f"History files: {store.stats['written']} written, {store.stats['mapped']} mapped in {store.root}"
+               if store else "History files: disabled")
+    saved_at = checkpoint.status()['saved_at']
+    st.caption(f"Checkpoint: {checkpoint.CHECKPOINT_PATH or 'disabled'}, last written "
+               f"{datetime.fromtimestamp(saved_at).strftime('%H:%M:%S') if saved_at else 'never'}")
+
+    engine = replay.ENGINE
+    st.caption(f"Replay: {engine.day} at {engine.clock.speed:g}x, {engine.loaded} symbols loaded"
+               if engine else "Replay: off (live data)")
+
+    current, recent = st.columns(2)
+    with current:
+        st.caption(f"Current run ({reruns[0].label})")
+        _render_summary(profiler.summarize(reruns[:1]))
+    with recent:
+        st.caption(f"Last {len(reruns)} runs")
+        _render_summary(profiler.summarize(reruns))
+
+def _render_summary(rows):
+    if not rows:
+        st.caption("No spans")
+        return
+    df = pd.DataFrame(rows)
+    quadrants = df['span'].str.startswith('quadrant.')
+    # Quadrants first, then individual calls by p95
+    st.dataframe(pd.concat([df[quadrants], df[~quadrants]]).round(1),
+                 use_container_width=True, hide_index=True)
@@ -0,0 +1,67 @@
+import functools
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from data import market_calendar, replay
+from Utils import profiler
+
+# Auto-refresh interval per fragment in the regular session, pre-market /
+# after-hours and while closed; None means it only reruns on its own widgets
+REFRESH_INTERVALS = {
+    'header': {'open': None, 'extended': None, 'closed': None},
+    'ticker_tape': {'open': '30s', 'extended': '300s', 'closed': None},
+    'market_overview': {'open': '30s', 'extended': '300s', 'closed': None},
+    'news_feed': {'open': '300s', 'extended': '300s', 'closed': '1800s'},
+    'charts': {'open': '60s', 'extended': '300s', 'closed': None},
+    'ai_analytics': {'open': None, 'extended': None, 'closed': None},
+    'alerts': {'open': '30s', 'extended': '300s', 'closed': None},
+    'correlation': {'open': '60s', 'extended': '300s', 'closed': None}
+}
+
+# How often every session checks whether the market phase has changed
+SESSION_CHECK_INTERVAL = '60s'
+
+def current_session_id():
+    """Streamlit session id, or 'local' outside a running app"""
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx else 'local'
+
+def refresh_interval(name, phase=None):
+    """Fragment refresh interval for the current (or given) market phase,
+    shortened by the replay speed while a past session is replayed"""
+    phase = phase or market_calendar.market_phase()
+    schedule = 'extended' if phase in ('pre', 'post') else phase
+    return replay.scale_interval(REFRESH_INTERVALS[name][schedule])
+
+def watch_market_session():
+    """Rerun the whole app when the market phase changes.
+
+    Fragment refresh intervals are fixed when the app script runs, so a
+    full rerun is what switches them over at the open and close.
+    """
+    phase = market_calendar.market_phase()
+    if st.session_state.setdefault('market_phase', phase) != phase:
+        st.session_state.market_phase = phase
+        st.rerun()
+
+def run_fragment(name, render, *args, **kwargs):
+    """Render a section as an isolated fragment.
+
+    Widget interactions inside the fragment rerun only that section, so
+    e.g. a chart period click no longer re-executes the other quadrants.
+    Fragment-only reruns are recorded by the profiler as their own rerun.
+    """
+    @functools.wraps(render)
+    def profiled(*args, **kwargs):
+        owns_rerun = profiler.current_rerun() is None
+        if owns_rerun:
+            profiler.begin_rerun(current_session_id(), f'fragment:{name}')
+        try:
+            with profiler.span(f'quadrant.{name}'):
+                return render(*args, **kwargs)
+        finally:
+            if owns_rerun:
+                profiler.end_rerun()
+
+    return st.fragment(profiled, run_every=refresh_interval(name))(*args, **kwargs)
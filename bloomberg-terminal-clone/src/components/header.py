@@ -1,13 +1,23 @@
 import streamlit as st
 from datetime import datetime
-import yfinance as yf
+
+from data import checkpoint, market_calendar, replay
+from data.data_fetcher import get_symbol_lookup, get_watchlist_data
+from data.prefetch import record_click
+from data.quote_table import QuoteTable
+from Utils.profiler import span
+
+# Quick access buttons; their lookup cards are kept warm by the prefetcher
+MAG7_SYMBOLS = ('MSFT', 'AAPL', 'GOOGL', 'AMZN', 'NVDA', 'META', 'TSLA')
 
 def render_interactive_header():
     """Render the main terminal header with working Mag 7 quick access buttons"""
+    previous_chart_symbol = st.session_state.get('chart_symbol')
     current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    market_hour = datetime.now().hour
-    market_status = "MARKET OPEN" if 9 <= market_hour <= 16 else "MARKET CLOSED"
-    status_color = "#00ff00" if "OPEN" in market_status else "#ff6600"
+    status = market_calendar.market_status()
+    market_status = status.label
+    status_color = {"open": "#00ff00", "closed": "#ff6600"}.get(status.phase, "#ffcc00")
+    next_change = f"{market_calendar.PHASE_LABELS[status.next_phase].title()} {status.next_change.strftime('%a %H:%M')} ET"
 
     # Header
     st.markdown(f"""
@@ -17,10 +27,17 @@ def render_interactive_header():
             {market_status}
         </span>
         <div style="font-size: 14px; margin-top: 8px; opacity: 0.8;">
-            Last Updated: {current_time}
+            Last Updated: {current_time} | {next_change}
         </div>
     </div>
     """, unsafe_allow_html=True)
+
+    restored = checkpoint.status()
+    if restored['refreshing']:
+        saved_at = datetime.fromtimestamp(restored['restored_at']).strftime('%H:%M')
+        st.caption(f"⏳ Showing data saved at {saved_at} — refreshing in the background")
+    if replay.ENGINE is not None:
+        render_replay_controls(replay.ENGINE)
     
     # Stock search section
     st.markdown("""
@@ -93,6 +110,9 @@ def render_interactive_header():
                 st.session_state.chart_symbol = "TSLA"
                 selected_symbol = "TSLA"
         
+        if selected_symbol:
+            record_click('symbol', selected_symbol)
+        
         # Get the default value for text input
         default_value = st.session_state.get("selected_stock", "")
         
@@ -109,77 +129,115 @@ def render_interactive_header():
         if symbol_input and symbol_input != default_value:
             st.session_state.chart_symbol = symbol_input
             st.session_state.selected_stock = symbol_input
+            record_click('symbol', symbol_input)
     
     # Use the symbol from input or button selection
     symbol_to_display = selected_symbol or symbol_input
     
     # Display stock info if symbol entered
     if symbol_to_display and len(symbol_to_display) > 0:
-        try:
-            ticker = yf.Ticker(symbol_to_display)
-            info = ticker.info
-            hist = ticker.history(period="1d", interval="1m")
+        lookup = get_symbol_lookup(symbol_to_display)
+        
+        if lookup:
+            current_price = lookup['price']
+            change = lookup['change']
+            change_pct = lookup['change_pct']
             
-            if not hist.empty and info:
-                current_price = hist['Close'].iloc[-1]
-                prev_close = info.get('previousClose', current_price)
-                change = current_price - prev_close
-                change_pct = (change / prev_close) * 100
-                
-                change_color = "#00ff88" if change >= 0 else "#ff4444"
-                change_sign = "+" if change >= 0 else ""
-                
-                company_name = info.get('longName', symbol_to_display)
-                market_cap = info.get('marketCap', 0)
-                volume = hist['Volume'].sum() if not hist['Volume'].empty else 0
-                
-                # Format market cap
-                if market_cap > 1e12:
-                    market_cap_str = f"${market_cap/1e12:.2f}T"
-                elif market_cap > 1e9:
-                    market_cap_str = f"${market_cap/1e9:.2f}B"
-                elif market_cap > 1e6:
-                    market_cap_str = f"${market_cap/1e6:.2f}M"
-                else:
-                    market_cap_str = f"${market_cap:,.0f}"
-                
-                st.markdown(f"""
-                <div style="background: linear-gradient(135deg, #2a2a2a 0%, #3a3a3a 100%);
-                            border: 2px solid {change_color}; border-radius: 10px; padding: 20px;
-                            margin: 15px 0; text-align: center;">
-                    <h2 style="color: #00ff88; margin: 0;">{symbol_to_display}</h2>
-                    <h4 style="color: #FFFFFF; margin: 5px 0;">{company_name}</h4>
-                    <h1 style="color: #FFFFFF; margin: 10px 0;">${current_price:.2f}</h1>
-                    <h3 style="color: {change_color}; margin: 5px 0;">
-                        {change_sign}{change:.2f} ({change_sign}{change_pct:.2f}%)
-                    </h3>
-                    <div style="color: #CCCCCC; margin-top: 15px;">
-                        Market Cap: {market_cap_str} | Volume: {volume:,.0f}
-                    </div>
+            change_color = "#00ff88" if change >= 0 else "#ff4444"
+            change_sign = "+" if change >= 0 else ""
+            
+            company_name = lookup['name']
+            market_cap = lookup['market_cap']
+            volume = lookup['volume']
+            
+            # Format market cap
+            if market_cap > 1e12:
+                market_cap_str = f"${market_cap/1e12:.2f}T"
+            elif market_cap > 1e9:
+                market_cap_str = f"${market_cap/1e9:.2f}B"
+            elif market_cap > 1e6:
+                market_cap_str = f"${market_cap/1e6:.2f}M"
+            else:
+                market_cap_str = f"${market_cap:,.0f}"
+            
+            st.markdown(f"""
+            <div style="background: linear-gradient(135deg, #2a2a2a 0%, #3a3a3a 100%);
+                        border: 2px solid {change_color}; border-radius: 10px; padding: 20px;
+                        margin: 15px 0; text-align: center;">
+                <h2 style="color: #00ff88; margin: 0;">{symbol_to_display}</h2>
+                <h4 style="color: #FFFFFF; margin: 5px 0;">{company_name}</h4>
+                <h1 style="color: #FFFFFF; margin: 10px 0;">${current_price:.2f}</h1>
+                <h3 style="color: {change_color}; margin: 5px 0;">
+                    {change_sign}{change:.2f} ({change_sign}{change_pct:.2f}%)
+                </h3>
+                <div style="color: #CCCCCC; margin-top: 15px;">
+                    Market Cap: {market_cap_str} | Volume: {volume:,.0f}
                 </div>
-                """, unsafe_allow_html=True)
-                
-                # Store the symbol for charts
-                st.session_state.chart_symbol = symbol_to_display
-                
-        except Exception as e:
+            </div>
+            """, unsafe_allow_html=True)
+            
+            # Store the symbol for charts
+            st.session_state.chart_symbol = symbol_to_display
+        else:
             st.error(f"❌ Could not find data for '{symbol_to_display}'. Please check the symbol and try again.")
     
+    # The header runs as its own fragment; other quadrants only see a new
+    # chart symbol after a full app rerun
+    if st.session_state.get('chart_symbol') != previous_chart_symbol:
+        st.rerun()
+    
     return symbol_to_display
 
+def render_replay_controls(engine):
+    """Replay clock, speed and pause; shared by every session of this server"""
+    clock = engine.clock
+    if not engine.ready.is_set():
+        state = "loading bars"
+    elif clock.finished:
+        state = "session over"
+    else:
+        state = "paused" if clock.paused else f"{clock.speed:g}x"
+    st.caption(f"⏪ REPLAY {engine.day:%a %Y-%m-%d} {clock.now():%H:%M:%S} ET · {state}")
+
+    speed_col, pause_col = st.columns([3, 1])
+    with speed_col:
+        speed = st.select_slider("Replay speed", options=replay.SPEEDS, key="replay_speed",
+                                 value=min(replay.SPEEDS, key=lambda s: abs(s - clock.speed)),
+                                 format_func=lambda s: f"{s}x", label_visibility="collapsed")
+    with pause_col:
+        if st.button("Resume" if clock.paused else "Pause", key="replay_pause", use_container_width=True):
+            if clock.paused:
+                clock.resume()
+            else:
+                clock.pause()
+            st.rerun()
+
+    # Only moving the slider sets the speed; another session may have changed it since
+    if speed != st.session_state.setdefault('replay_speed_shown', speed):
+        st.session_state.replay_speed_shown = speed
+        clock.set_speed(speed)
+        # Fragment refresh intervals are fixed when the app script runs
+        st.rerun()
+
 def render_ticker_tape(watchlist_data):
     """Render scrolling ticker tape with stock prices"""
     if not watchlist_data:
         return
-        
-    ticker_items = []
-    for symbol, data in watchlist_data.items():
-        change_sign = "+" if data['change'] >= 0 else ""
-        ticker_items.append(f"{symbol}: ${data['price']:.2f} ({change_sign}{data['change_pct']:.2f}%)")
 
-    ticker_text = " • ".join(ticker_items)
-    st.markdown(f"""
-    <div class="ticker-tape">
-        LUTHER TERMINAL LIVE • {ticker_text} • THAT BOY LUTH TRADING • 
-    </div>
-    """, unsafe_allow_html=True)
\ No newline at end of file
+    table = QuoteTable.from_mapping(watchlist_data)
+    mode = f"REPLAY {market_calendar.now():%H:%M} ET" if replay.ENGINE is not None else "LIVE"
+    ticker_text = " • ".join(table.format("%s: $%.2f (%+.2f%%)", 'label', 'price', 'change_pct'))
+    with span('header.ticker_markdown'):
+        st.markdown(f"""
+        <div class="ticker-tape">
+            LUTHER TERMINAL {mode} • {ticker_text} • THAT BOY LUTH TRADING • 
+        </div>
+        """, unsafe_allow_html=True)
+
+def render_live_ticker_tape():
+    """Load the trending watchlist and render it as the ticker tape"""
+    try:
+        watchlist_data = get_watchlist_data('trending')
+    except Exception:
+        watchlist_data = {}
+    render_ticker_tape(watchlist_data)
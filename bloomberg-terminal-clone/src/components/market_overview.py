@@ -1,81 +1,154 @@
+import zlib
+
+import numpy as np
 import streamlit as st
-import sys
-import yfinance as yf
-sys.path.append('src')
 
-def render_market_overview(market_data, watchlist_data):
+from data import checkpoint
+from data.data_fetcher import DynamicStockFetcher, get_real_stock_data, get_market_indices, get_watchlist_data
+from data.prefetch import record_click
+from data.quote_table import QuoteTable
+from Utils.profiler import span
+
+# Table mode shows whole index constituent lists in one widget
+TABLE_WATCHLIST_SIZE = 500
+WATCHLIST_SOURCES = {
+    'Trending': 'trending',
+    'S&P 500': 'sp500',
+    'NASDAQ 100': 'nasdaq',
+    'Sector Leaders': 'sectors'
+}
+
+WATCHLIST_COLUMNS = {
+    'trend': st.column_config.TextColumn("", width="small"),
+    'symbol': st.column_config.TextColumn("Symbol"),
+    'price': st.column_config.NumberColumn("Price", format="$%.2f"),
+    'change': st.column_config.NumberColumn("Chg", format="%+.2f"),
+    'change_pct': st.column_config.NumberColumn("Chg %", format="%+.2f%%"),
+    'volume': st.column_config.NumberColumn("Volume", format="%d")
+}
+
+def load_market_data():
+    """Load indices and the trending watchlist, falling back to the last known index quotes"""
+    try:
+        market_data = get_market_indices()
+        watchlist_data = get_watchlist_data('trending')
+
+        st.success(f"✅ Loaded {len(market_data)} indices and {len(watchlist_data)} trending stocks")
+
+    except Exception as e:
+        st.error(f"❌ Data loading error: {e}")
+        # Last fetched or checkpointed quotes rather than made-up numbers
+        market_data = checkpoint.last_quotes(DynamicStockFetcher().get_dynamic_indices())
+        watchlist_data = {}
+    return QuoteTable.from_mapping(market_data), QuoteTable.from_mapping(watchlist_data)
+
+def select_chart_symbol(symbol):
+    """Point the chart at a symbol and rerun every quadrant"""
+    record_click('symbol', symbol)
+    st.session_state.chart_symbol = symbol
+    st.session_state.selected_stock = symbol
+    st.rerun()
+
+def render_watchlist_table(source):
+    """Sortable watchlist grid; selecting a row charts that symbol"""
+    watchlist_data = get_watchlist_data(source, TABLE_WATCHLIST_SIZE)
+    if not watchlist_data:
+        st.warning("⚠️ Watchlist not loaded")
+        return
+
+    frame = watchlist_data.to_frame()
+    # Colors are computed per column; per-cell Styler output is too slow to ship for hundreds of rows
+    frame['trend'] = np.where(frame['change'].to_numpy() >= 0, '🟢', '🔴')
+
+    # Selections are row positions and outlive the refresh; symbols whose quotes
+    # failed drop out of the table, so a changed row set gets a fresh widget
+    # rather than a selection pointing at another symbol
+    rows_key = zlib.crc32(','.join(frame['symbol']).encode())
+
+    with span('market_overview.watchlist_table', rows=len(frame)):
+        event = st.dataframe(frame,
+                             key=f"watchlist_table_{rows_key:08x}",
+                             height=300,
+                             hide_index=True,
+                             use_container_width=True,
+                             column_order=list(WATCHLIST_COLUMNS),
+                             column_config=WATCHLIST_COLUMNS,
+                             on_select="rerun",
+                             selection_mode="single-row")
+
+    # The selection persists across reruns, so only act when it changes
+    rows = event.selection.rows
+    selected = frame['symbol'].iat[rows[0]] if rows else None
+    if selected != st.session_state.get('watchlist_table_symbol'):
+        st.session_state.watchlist_table_symbol = selected
+        if selected:
+            select_chart_symbol(selected)
+
+def render_market_overview():
     """Render market overview quadrant with real data"""
     st.markdown('<div class="quadrant"><div class="quadrant-title">Market Overview</div>', unsafe_allow_html=True)
-    
+
+    with st.spinner("Loading market data..."):
+        market_data, watchlist_data = load_market_data()
+
     # VTI Total Market section
-    try:
-        vti_ticker = yf.Ticker('VTI')
-        vti_info = vti_ticker.info
-        vti_hist = vti_ticker.history(period="1d", interval="1m")
-        
-        if not vti_hist.empty:
-            current_price = vti_hist['Close'].iloc[-1]
-            prev_close = vti_info.get('previousClose', current_price)
-            change = current_price - prev_close
-            change_pct = (change / prev_close) * 100
-            
-            change_color = "#00ff88" if change >= 0 else "#ff4444"
-            change_sign = "+" if change >= 0 else ""
-            
-            # Make VTI clickable
-            if st.button(f"🏛️ VTI (Total Market) - ${current_price:.2f} {change_sign}{change:.2f} ({change_sign}{change_pct:.2f}%)", 
-                        key="vti_button", 
-                        help="Click to view VTI chart",
-                        use_container_width=True):
-                st.session_state.chart_symbol = 'VTI'
-                st.session_state.selected_stock = 'VTI'
-                st.rerun()
-                
-    except Exception as e:
-        st.error(f"VTI Error: {e}")
-    
+    vti = get_real_stock_data('VTI')
+    if vti:
+        change = vti['change']
+        change_pct = vti['change_pct']
+        change_sign = "+" if change >= 0 else ""
+
+        # Make VTI clickable
+        if st.button(f"🏛️ VTI (Total Market) - ${vti['price']:.2f} {change_sign}{change:.2f} ({change_sign}{change_pct:.2f}%)",
+                    key="vti_button",
+                    help="Click to view VTI chart",
+                    use_container_width=True):
+            select_chart_symbol('VTI')
+    else:
+        st.warning("VTI data unavailable")
+
     # Major indices
     if market_data:
         st.markdown('<div style="margin-top: 15px;"><strong style="color: #ff6600; font-size: 14px;">MAJOR INDICES:</strong></div>', unsafe_allow_html=True)
-        
-        for name, data in market_data.items():
-            if 'VTI' in name:
-                continue
-                
-            change_color = "#00ff88" if data['change'] >= 0 else "#ff4444"
-            change_sign = "+" if data['change'] >= 0 else ""
-            symbol = data['symbol']
-            
+
+        indices = market_data.without('VTI')
+        labels = indices.format("%s: $%.2f %+.2f (%+.2f%%)", 'label', 'price', 'change', 'change_pct')
+
+        for name, symbol, label in zip(indices.labels, indices.symbols, labels):
             # Make each index clickable
-            if st.button(f"{name}: ${data['price']:.2f} {change_sign}{data['change']:.2f} ({change_sign}{data['change_pct']:.2f}%)", 
-                        key=f"index_{symbol}_{name.replace(' ', '_')}", 
+            if st.button(label,
+                        key=f"index_{symbol}_{name.replace(' ', '_').replace('&', 'and')}",
                         help=f"Click to view {name} chart",
                         use_container_width=True):
-                st.session_state.chart_symbol = symbol
-                st.session_state.selected_stock = symbol
-                st.rerun()
+                select_chart_symbol(symbol)
     else:
         st.warning("⚠️ Market indices not loaded")
-    
+
     # Dynamic watchlist
-    if watchlist_data:
+    view_col, source_col = st.columns(2)
+    with view_col:
+        view = st.radio("Watchlist view", ["Buttons", "Table"], key="watchlist_view",
+                        horizontal=True, label_visibility="collapsed")
+    if view == "Table":
+        with source_col:
+            source = st.selectbox("Watchlist", list(WATCHLIST_SOURCES), key="watchlist_source",
+                                  label_visibility="collapsed")
+        render_watchlist_table(WATCHLIST_SOURCES[source])
+    elif watchlist_data:
         st.markdown('<div class="quadrant-title" style="margin-top: 20px; color: #ff6600;">🔥 TRENDING STOCKS</div>', unsafe_allow_html=True)
-        
+
         # Show as clickable buttons in 2 columns
+        trending = watchlist_data.head(8)  # Limit to 8 for space
+        labels = trending.format("%s: $%.2f %+.2f%%", 'label', 'price', 'change_pct')
         cols = st.columns(2)
-        for i, (symbol, data) in enumerate(list(watchlist_data.items())[:8]):  # Limit to 8 for space
+        for i, (symbol, label) in enumerate(zip(trending.labels, labels)):
             with cols[i % 2]:
-                change_color = "#00ff88" if data['change'] >= 0 else "#ff4444"
-                change_sign = "+" if data['change'] >= 0 else ""
-                
-                if st.button(f"{symbol}: ${data['price']:.2f} {change_sign}{data['change_pct']:.2f}%", 
-                            key=f"watch_{symbol}_{i}", 
+                if st.button(label,
+                            key=f"watch_{symbol}_{i}",
                             help=f"Click to view {symbol} chart",
                             use_container_width=True):
-                    st.session_state.chart_symbol = symbol
-                    st.session_state.selected_stock = symbol
-                    st.rerun()
+                    select_chart_symbol(symbol)
     else:
         st.warning("⚠️ Watchlist not loaded")
-    
-    st.markdown('</div>', unsafe_allow_html=True)
\ No newline at end of file
+
+    st.markdown('</div>', unsafe_allow_html=True)
@@ -0,0 +1,87 @@
+import pandas as pd
+import streamlit as st
+
+from ai.portfolio_risk import BENCHMARK, CONFIDENCE, MC_HORIZON_DAYS, WINDOW, get_risk_engine
+from data.resampling import get_close_matrix
+
+DEFAULT_HOLDINGS = pd.DataFrame({
+    'symbol': ['AAPL', 'MSFT', 'NVDA', 'JPM', 'XOM'],
+    'shares': [10, 8, 5, 12, 15]
+})
+
+LEVEL_COLORS = {
+    'LOW': '#00ff00', 'MODERATE': '#ffff00', 'HIGH': '#ff4444',
+    'GOOD': '#00ff00', 'FAIR': '#ffff00', 'POOR': '#ff4444'
+}
+
+def clean_holdings(edited):
+    """Shares per upper-cased symbol, dropping blank rows and merging duplicates"""
+    holdings = edited.dropna(subset=['symbol', 'shares'])
+    holdings = holdings.assign(symbol=holdings['symbol'].astype(str).str.strip().str.upper())
+    holdings = holdings[(holdings['symbol'] != '') & (holdings['shares'] > 0)]
+    return holdings.groupby('symbol')['shares'].sum()
+
+def render_portfolio_analytics():
+    """Editable holdings with live volatility, beta, VaR/CVaR and diversification"""
+    st.markdown('<div class="metric-card"><strong>Portfolio Analytics:</strong></div>', unsafe_allow_html=True)
+
+    if 'portfolio_holdings' not in st.session_state:
+        st.session_state.portfolio_holdings = DEFAULT_HOLDINGS.copy()
+
+    edited = st.data_editor(
+        st.session_state.portfolio_holdings,
+        key="portfolio_editor",
+        num_rows="dynamic",
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            'symbol': st.column_config.TextColumn("Symbol", required=True),
+            'shares': st.column_config.NumberColumn("Shares", min_value=0, step=1)
+        }
+    )
+
+    holdings = clean_holdings(edited)
+    if holdings.empty:
+        st.info("Add holdings to see portfolio risk")
+        return
+
+    closes = get_close_matrix(sorted(set(holdings.index) | {BENCHMARK}), bars=WINDOW + 2)
+    if closes is None or BENCHMARK not in closes.columns:
+        st.warning("⚠️ Price history unavailable for portfolio analytics")
+        return
+
+    symbols = tuple(symbol for symbol in holdings.index if symbol in closes.columns)
+    missing = [symbol for symbol in holdings.index if symbol not in closes.columns]
+    if not symbols:
+        st.warning(f"⚠️ No price history for {', '.join(missing)}")
+        return
+
+    # Engines are shared per symbol set; share edits only change the weights
+    engine = get_risk_engine(symbols)
+    engine.update(closes)
+    report = engine.report(holdings.reindex(symbols).to_numpy())
+    if report is None:
+        st.warning("⚠️ Not enough price history for risk metrics")
+        return
+
+    top_symbol, top_share = max(report['risk_contributions'].items(), key=lambda item: item[1])
+    expected_color = "#00ff00" if report['expected_return'] >= 0 else "#ff4444"
+    confidence = f"{CONFIDENCE:.0%}"
+    missing_note = f"<br><small>No history: {', '.join(missing)}</small>" if missing else ""
+
+    st.markdown(f"""
+    <div class="metric-card">
+        Value: ${report['value']:,.0f} ({report['positions']} positions)<br>
+        Risk Level: <span style="color: {LEVEL_COLORS[report['risk_level']]};">{report['risk_level']}</span>
+        (vol {report['volatility']:.1%} ann.)<br>
+        Beta vs {BENCHMARK}: {report['beta']:.2f}<br>
+        1d VaR {confidence}: ${report['var_hist']:,.0f} hist / ${report['var_param']:,.0f} normal
+        (CVaR ${report['cvar_hist']:,.0f})<br>
+        {MC_HORIZON_DAYS}d Monte Carlo VaR / CVaR: ${report['var_mc']:,.0f} / ${report['cvar_mc']:,.0f}<br>
+        Diversification: <span style="color: {LEVEL_COLORS[report['diversification']]};">{report['diversification']}</span>
+        (ratio {report['diversification_ratio']:.2f}, {report['effective_positions']:.1f} effective positions)<br>
+        Top risk: {top_symbol} ({top_share:.0%} of variance)<br>
+        Expected Return: <span style="color: {expected_color};">{report['expected_return']:+.1%} (12mo trailing)</span>
+        {missing_note}
+    </div>
+    """, unsafe_allow_html=True)
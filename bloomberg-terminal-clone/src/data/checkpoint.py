@@ -0,0 +1,224 @@
+# src/data/checkpoint.py
+import os
+import tempfile
+import threading
+import time
+from typing import Dict
+
+import numpy as np
+
+from data import market_calendar, replay
+from data.data_fetcher import (QUOTE_POOL, QUOTE_TTL, TRENDING_TTL, DynamicStockFetcher,
+                               _fetch_company_info, _fetch_stock_data, fetch_quote)
+from data.ohlcv import OHLCVBlock
+from data.quote_table import QUOTE_COLUMNS
+from data.resampling import BASE_FETCHES, _fetch_base
+
+# Empty LUTHER_CHECKPOINT disables checkpointing
+CHECKPOINT_PATH = os.getenv('LUTHER_CHECKPOINT', os.path.join(tempfile.gettempdir(), 'luther_checkpoint.npz'))
+CHECKPOINT_INTERVAL = 300
+HOT_HISTORIES = 200  # most recently used base-history tiers written per checkpoint
+FORMAT_VERSION = 1
+# Restored quotes expire after this long even within their refresh epoch, so a
+# quote the background refresh could not replace is refetched, not kept stale
+RESTORED_QUOTE_TTL = QUOTE_TTL
+
+# Base tier by its (interval, period) fetch arguments
+TIERS = {(fetch['interval'], fetch['period']): tier for tier, fetch in BASE_FETCHES.items()}
+
+_state = {'saved_at': None, 'restored_at': None, 'refreshing': 0}
+_lock = threading.Lock()
+
+
+def _strings(values) -> np.ndarray:
+    return np.array(list(values), dtype=str)
+
+
+def collect() -> Dict[str, np.ndarray]:
+    """Current quotes, company info, symbol universe and hottest histories as flat arrays"""
+    from Utils.memory_cache import BUDGET
+    arrays = {'format': np.array(FORMAT_VERSION), 'saved_at': np.array(time.time())}
+
+    quotes = [(args['symbol'], quote) for args, quote in BUDGET.items(_fetch_stock_data.cache_name) if quote]
+    arrays['quote_symbols'] = _strings(symbol for symbol, _ in quotes)
+    for column in QUOTE_COLUMNS:
+        arrays[f'quote_{column}'] = np.array([quote.get(column, np.nan) for _, quote in quotes], dtype=np.float64)
+
+    companies = [(args['symbol'], info) for args, info in BUDGET.items(_fetch_company_info.cache_name)]
+    arrays['company_symbols'] = _strings(symbol for symbol, _ in companies)
+    arrays['company_names'] = _strings(info['name'] for _, info in companies)
+    arrays['company_shares'] = np.array([info['shares'] for _, info in companies], dtype=np.float64)
+    arrays['company_market_caps'] = np.array([info['market_cap'] for _, info in companies], dtype=np.float64)
+
+    fetcher = DynamicStockFetcher
+    for name, method in (('sp500', fetcher.get_sp500_components), ('nasdaq100', fetcher.get_nasdaq100_components),
+                         ('trending', fetcher.get_trending_stocks)):
+        entries = BUDGET.items(method.cache_name)
+        if entries:
+            arrays[f'universe_{name}'] = _strings(entries[0][1])
+    universe = BUDGET.items(fetcher.get_symbol_universe.cache_name)
+    if universe:
+        arrays['universe_symbols'] = _strings(universe[0][1].keys())
+        arrays['universe_names'] = _strings(universe[0][1].values())
+
+    # Whole-second blocks only, so every block shares the uint32 offset layout
+    histories = [(args, stored if isinstance(stored, OHLCVBlock) else OHLCVBlock.from_frame(stored.to_frame()))
+                 for args, stored in BUDGET.items(_fetch_base.cache_name)
+                 if stored is not None and (args['interval'], args['period']) in TIERS][:HOT_HISTORIES]
+    histories = [(args, block) for args, block in histories if block.offsets.dtype == np.uint32]
+    arrays['history_symbols'] = _strings(args['symbol'] for args, _ in histories)
+    arrays['history_tiers'] = _strings(TIERS[(args['interval'], args['period'])] for args, _ in histories)
+    arrays['history_tz'] = _strings(block.tz or '' for _, block in histories)
+    arrays['history_start'] = np.array([block.start for _, block in histories], dtype=np.int64)
+    arrays['history_lengths'] = np.array([len(block) for _, block in histories], dtype=np.int64)
+    arrays['history_offsets'] = np.concatenate([block.offsets for _, block in histories] or [np.empty(0, np.uint32)])
+    arrays['history_prices'] = np.concatenate([block.prices for _, block in histories] or [np.empty((0, 4), np.float32)])
+    arrays['history_volume'] = np.concatenate([block.volume.astype(np.int64) for _, block in histories]
+                                              or [np.empty(0, np.int64)])
+    return arrays
+
+
+def save(path: str = CHECKPOINT_PATH):
+    """Atomically write a checkpoint (uncompressed .npz: a few ms to write or read)"""
+    arrays = collect()
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, **arrays)
+    os.replace(tmp_path, path)
+    with _lock:
+        _state['saved_at'] = float(arrays['saved_at'])
+
+
+def restore(path: str = CHECKPOINT_PATH) -> bool:
+    """Seed the caches from a checkpoint for the current refresh epochs.
+
+    Restored quotes are flagged stale (with the checkpoint time) until the
+    background refresh started here replaces them, and expire after
+    RESTORED_QUOTE_TTL if it cannot. Checkpoints saved before the latest
+    session opened hold another session's data and are skipped.
+    """
+    try:
+        data = np.load(path, allow_pickle=False)
+        if int(data['format']) != FORMAT_VERSION:
+            return False
+        saved_at = float(data['saved_at'])
+    except (OSError, ValueError, KeyError):
+        return False
+    if saved_at < market_calendar.last_session_open().timestamp():
+        print(f"Skipping checkpoint {path}: saved before the latest session opened")
+        return False
+
+    quote_epoch = market_calendar.refresh_epoch(QUOTE_TTL)
+    symbols = data['quote_symbols'].tolist()
+    columns = {column: data[f'quote_{column}'] for column in QUOTE_COLUMNS}
+    for i, symbol in enumerate(symbols):
+        quote = {column: float(values[i]) for column, values in columns.items()}
+        quote.update(symbol=symbol, stale=True, updated=saved_at)
+        _fetch_stock_data.seed(quote, symbol, quote_epoch, seed_ttl=RESTORED_QUOTE_TTL)
+
+    for symbol, name, shares, market_cap in zip(data['company_symbols'].tolist(), data['company_names'].tolist(),
+                                                data['company_shares'].tolist(), data['company_market_caps'].tolist()):
+        _fetch_company_info.seed({'name': name, 'shares': shares, 'market_cap': market_cap}, symbol)
+
+    fetcher = DynamicStockFetcher
+    if 'universe_sp500' in data:
+        fetcher.get_sp500_components.seed(data['universe_sp500'].tolist(), None)
+    if 'universe_nasdaq100' in data:
+        fetcher.get_nasdaq100_components.seed(data['universe_nasdaq100'].tolist(), None)
+    if 'universe_trending' in data:
+        fetcher.get_trending_stocks.seed(data['universe_trending'].tolist(), None,
+                                         market_calendar.refresh_epoch(TRENDING_TTL))
+    if 'universe_symbols' in data:
+        fetcher.get_symbol_universe.seed(dict(zip(data['universe_symbols'].tolist(),
+                                                  data['universe_names'].tolist())), None)
+
+    bounds = np.concatenate([[0], np.cumsum(data['history_lengths'])])
+    offsets, prices, volume = data['history_offsets'], data['history_prices'], data['history_volume']
+    histories = []
+    for i, (symbol, tier, tz, start) in enumerate(zip(data['history_symbols'].tolist(), data['history_tiers'].tolist(),
+                                                      data['history_tz'].tolist(), data['history_start'].tolist())):
+        fetch = BASE_FETCHES.get(tier)
+        if fetch is None:
+            continue
+        rows = slice(bounds[i], bounds[i + 1])
+        block = OHLCVBlock(start, offsets[rows], tz or None, prices[rows], volume[rows])
+        # Kept in process memory: the shared history files only hold bars fetched this epoch
+        _fetch_base.seed(block, symbol, fetch['interval'], fetch['period'],
+                         market_calendar.refresh_epoch(fetch['ttl']))
+        histories.append((symbol, tier))
+
+    with _lock:
+        _state['restored_at'] = saved_at
+        _state['refreshing'] = 1
+    threading.Thread(target=_refresh, args=(symbols, histories), name='luther-checkpoint-refresh', daemon=True).start()
+    return True
+
+
+def _refresh(symbols, histories):
+    """Replace restored entries with live data; failures keep the restored copy"""
+    def refresh_quote(symbol):
+        try:
+            # fetch_quote returns None on failure, which must not replace the restored quote
+            quote = fetch_quote(symbol)
+            if quote:
+                _fetch_stock_data.seed(quote, symbol, market_calendar.refresh_epoch(QUOTE_TTL))
+        except Exception:
+            pass
+
+    def refresh_history(item):
+        symbol, tier = item
+        fetch = BASE_FETCHES[tier]
+        try:
+            _fetch_base.refresh(symbol, fetch['interval'], fetch['period'], market_calendar.refresh_epoch(fetch['ttl']))
+        except Exception:
+            pass
+
+    try:
+        list(QUOTE_POOL.map(refresh_quote, symbols))
+        list(QUOTE_POOL.map(refresh_history, histories))
+    finally:
+        with _lock:
+            _state['refreshing'] = 0
+
+
+def last_quotes(symbols: Dict[str, str]) -> Dict[str, Dict]:
+    """{label: quote} of the most recent cached quotes, restored or live, for any epoch"""
+    from Utils.memory_cache import BUDGET
+    latest = {}
+    for args, quote in BUDGET.items(_fetch_stock_data.cache_name):
+        if quote:
+            latest.setdefault(args['symbol'], quote)
+    return {label: latest[symbol] for label, symbol in symbols.items() if symbol in latest}
+
+
+def status() -> Dict:
+    """saved_at / restored_at timestamps and whether restored data is still being refreshed"""
+    with _lock:
+        return dict(_state)
+
+
+def _checkpoint_loop(path: str, interval: float):
+    while True:
+        time.sleep(interval)
+        try:
+            save(path)
+        except OSError as e:
+            print(f"Error writing checkpoint {path}: {e}")
+
+
+_started = False
+_start_lock = threading.Lock()
+
+
+def start():
+    """Restore the last checkpoint and start periodic checkpointing, once per process"""
+    global _started
+    with _start_lock:
+        # A replay neither shows live quotes nor saves replayed ones
+        if _started or not CHECKPOINT_PATH or replay.ENGINE is not None:
+            return
+        _started = True
+
+    restore(CHECKPOINT_PATH)
+    threading.Thread(target=_checkpoint_loop, args=(CHECKPOINT_PATH, CHECKPOINT_INTERVAL),
+                     name='luther-checkpoint', daemon=True).start()
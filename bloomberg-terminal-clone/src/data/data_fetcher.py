@@ -3,6 +3,45 @@ import yfinance as yf
 import pandas as pd
 from datetime import datetime, timedelta
 import requests
+from concurrent.futures import ThreadPoolExecutor
+
+from data import history_store, market_calendar, ohlcv, quote_snapshot, replay, resilience
+from data.quote_table import QuoteTable
+from Utils.memory_cache import bounded_cache
+from Utils.profiler import bind, cache_miss, timed
+
+# Refresh cadence during the regular session; see market_calendar.refresh_epoch
+QUOTE_TTL = 60
+HISTORY_TTL = 900
+TRENDING_TTL = 1800
+COMPANY_INFO_TTL = 86400
+
+# Daily bars requested for a quote; enough to reach the previous close across holidays
+QUOTE_BARS_PERIOD = '5d'
+
+# Default number of symbols per watchlist source
+WATCHLIST_SIZES = {'trending': 10, 'sp500': 10, 'nasdaq': 10, 'sectors': 15}
+
+# yfinance 0.2 records this when no chart response arrived at all; Yahoo's own
+# "unknown symbol" answer carries a different description
+NO_RESPONSE_ERROR = 'No data found for this date range'
+
+# Leading stocks per sector, also used for sector-level aggregation
+SECTOR_LEADERS = {
+    'Technology': ['AAPL', 'MSFT', 'GOOGL', 'NVDA', 'META'],
+    'Healthcare': ['JNJ', 'UNH', 'PFE', 'ABBV', 'MRK'],
+    'Finance': ['JPM', 'BAC', 'WFC', 'GS', 'MS'],
+    'Energy': ['XOM', 'CVX', 'COP', 'EOG', 'SLB'],
+    'Consumer': ['AMZN', 'TSLA', 'HD', 'MCD', 'NKE'],
+    'Industrial': ['BA', 'CAT', 'GE', 'LMT', 'UPS'],
+    'Utilities': ['NEE', 'DUK', 'SO', 'D', 'AEP'],
+    'Materials': ['LIN', 'APD', 'SHW', 'FCX', 'NEM'],
+    'Real Estate': ['AMT', 'PLD', 'CCI', 'EQIX', 'SPG'],
+    'Telecom': ['VZ', 'T', 'TMUS', 'CHTR', 'CMCSA']
+}
+
+# Concurrent quote fetches when filling a large watchlist
+QUOTE_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix='luther-quotes')
 
 class DynamicStockFetcher:
     def __init__(self):
@@ -17,119 +56,164 @@ class DynamicStockFetcher:
         
         self.fallback_popular = ['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'TSLA', 'META', 'NVDA', 'NFLX', 'UBER', 'BABA']
 
-    @st.cache_data(ttl=3600)  # Cache for 1 hour
+    @bounded_cache('sp500', ttl=3600)  # Cache for 1 hour
     def get_sp500_components(_self):
         """Fetch S&P 500 component stocks dynamically"""
         try:
             # Wikipedia has a regularly updated list of S&P 500 companies
             url = "https://en.wikipedia.org/wiki/List_of_S%26P_500_companies"
-            tables = pd.read_html(url)
+            tables = resilience.call('wikipedia.read_html', lambda: pd.read_html(url))
             sp500_table = tables[0]
-            symbols = sp500_table['Symbol'].tolist()
-            return symbols[:50]  # Return top 50 for performance
+            # Yahoo uses BRK-B where Wikipedia lists BRK.B
+            return sp500_table['Symbol'].str.replace('.', '-', regex=False).tolist()
         except:
             return _self.fallback_popular
 
-    @st.cache_data(ttl=3600)
+    @bounded_cache('nasdaq100', ttl=3600)
     def get_nasdaq100_components(_self):
         """Fetch NASDAQ 100 component stocks"""
         try:
             url = "https://en.wikipedia.org/wiki/Nasdaq-100"
-            tables = pd.read_html(url)
+            tables = resilience.call('wikipedia.read_html', lambda: pd.read_html(url))
             nasdaq_table = tables[4]  # Usually the 5th table
-            symbols = nasdaq_table['Ticker'].tolist()
-            return symbols[:30]  # Return top 30
+            return nasdaq_table['Ticker'].tolist()
         except:
             return _self.fallback_popular
 
-    @st.cache_data(ttl=1800)  # Cache for 30 minutes
-    def get_trending_stocks(_self):
-        """Get trending stocks from Yahoo Finance"""
+    @bounded_cache('symbol_universe', ttl=86400)  # Cache for 1 day
+    def get_symbol_universe(_self):
+        """Fetch symbol -> company name for the S&P 500 and NASDAQ 100.
+
+        Raises when neither list could be read, so an empty universe is not
+        cached for the day.
+        """
+        universe = {}
         try:
-            # Yahoo Finance trending tickers
-            import yfinance as yf
-            # Get some popular ETFs and indices to find trending stocks
-            trending_symbols = []
-            
-            # Check volume leaders from major exchanges
-            volume_leaders = ['AAPL', 'TSLA', 'NVDA', 'AMD', 'MSFT', 'GOOGL', 'AMZN', 'META', 'NFLX', 'SPY']
-            
-            # Get their info and sort by volume
-            volume_data = []
-            for symbol in volume_leaders:
-                try:
-                    ticker = yf.Ticker(symbol)
-                    info = ticker.info
-                    volume = info.get('volume', 0)
-                    if volume > 0:
-                        volume_data.append((symbol, volume))
-                except:
-                    continue
-            
-            # Sort by volume and return top performers
-            volume_data.sort(key=lambda x: x[1], reverse=True)
-            trending_symbols = [symbol for symbol, volume in volume_data[:10]]
-            
-            return trending_symbols if trending_symbols else _self.fallback_popular
-            
-        except:
-            return _self.fallback_popular
+            sp500_table = resilience.call(
+                'wikipedia.read_html', lambda: pd.read_html("https://en.wikipedia.org/wiki/List_of_S%26P_500_companies"))[0]
+            # Same Yahoo spelling as get_sp500_components (BRK-B, not BRK.B)
+            symbols = sp500_table['Symbol'].str.replace('.', '-', regex=False)
+            universe.update(zip(symbols, sp500_table['Security']))
+        except Exception as e:
+            print(f"Error fetching S&P 500 symbol names: {e}")
+        try:
+            nasdaq_table = resilience.call(
+                'wikipedia.read_html', lambda: pd.read_html("https://en.wikipedia.org/wiki/Nasdaq-100"))[4]
+            universe.update(zip(nasdaq_table['Ticker'], nasdaq_table['Company']))
+        except Exception as e:
+            print(f"Error fetching NASDAQ 100 symbol names: {e}")
+        if not universe:
+            raise ValueError("No symbol universe available")
+        return universe
+
+    @bounded_cache('trending', ttl=market_calendar.MAX_CLOSED_SECONDS, version_arg='refresh_epoch')
+    def get_trending_stocks(_self, refresh_epoch=None):
+        """Get trending stocks from Yahoo Finance.
 
-    @st.cache_data(ttl=3600)
-    def get_sector_leaders(_self):
+        Raises when no volumes could be fetched, so the fallback list is
+        not cached for the epoch (pinned for the whole weekend while the
+        market is closed); get_dynamic_watchlist falls back instead.
+        """
+        # Check volume leaders from major exchanges
+        volume_leaders = ['AAPL', 'TSLA', 'NVDA', 'AMD', 'MSFT', 'GOOGL', 'AMZN', 'META', 'NFLX', 'SPY']
+
+        # Get their info and sort by volume
+        volume_data = []
+        for symbol in volume_leaders:
+            try:
+                ticker = yf.Ticker(symbol)
+                info = resilience.call('yfinance.info', lambda: ticker.info, symbol=symbol)
+                volume = info.get('volume', 0)
+                if volume > 0:
+                    volume_data.append((symbol, volume))
+            except:
+                continue
+        if not volume_data:
+            raise ValueError("No volumes for the trending stocks")
+
+        # Sort by volume and return top performers
+        volume_data.sort(key=lambda x: x[1], reverse=True)
+        return [symbol for symbol, volume in volume_data[:10]]
+
+    def get_sector_leaders(self):
         """Get leading stocks from each major sector"""
-        sector_leaders = {
-            'Technology': ['AAPL', 'MSFT', 'GOOGL', 'NVDA', 'META'],
-            'Healthcare': ['JNJ', 'UNH', 'PFE', 'ABBV', 'MRK'],
-            'Finance': ['JPM', 'BAC', 'WFC', 'GS', 'MS'],
-            'Energy': ['XOM', 'CVX', 'COP', 'EOG', 'SLB'],
-            'Consumer': ['AMZN', 'TSLA', 'HD', 'MCD', 'NKE'],
-            'Industrial': ['BA', 'CAT', 'GE', 'LMT', 'UPS'],
-            'Utilities': ['NEE', 'DUK', 'SO', 'D', 'AEP'],
-            'Materials': ['LIN', 'APD', 'SHW', 'FCX', 'NEM'],
-            'Real Estate': ['AMT', 'PLD', 'CCI', 'EQIX', 'SPG'],
-            'Telecom': ['VZ', 'T', 'TMUS', 'CHTR', 'CMCSA']
-        }
-        
-        # Flatten and return unique symbols
-        all_leaders = []
-        for sector_stocks in sector_leaders.values():
-            all_leaders.extend(sector_stocks)
-        
-        return list(set(all_leaders))
+        # Flatten in sector order; a symbol listed twice keeps its first sector
+        return list(dict.fromkeys(symbol for leaders in SECTOR_LEADERS.values() for symbol in leaders))
 
     def get_dynamic_indices(self):
         """Get major market indices (these are fairly static)"""
         return self.fallback_indices
 
-    def get_dynamic_watchlist(self, source='trending'):
-        """Get dynamic watchlist based on different sources"""
+    def get_dynamic_watchlist(self, source='trending', limit=None):
+        """Get dynamic watchlist based on different sources.
+
+        limit overrides the source's default size (WATCHLIST_SIZES).
+        """
+        limit = limit or WATCHLIST_SIZES.get(source)
         if source == 'trending':
-            return self.get_trending_stocks()
+            try:
+                symbols = self.get_trending_stocks(market_calendar.refresh_epoch(TRENDING_TTL))
+            except:
+                symbols = self.fallback_popular
         elif source == 'sp500':
-            return self.get_sp500_components()[:10]  # Top 10
+            symbols = self.get_sp500_components()
         elif source == 'nasdaq':
-            return self.get_nasdaq100_components()[:10]
+            symbols = self.get_nasdaq100_components()
         elif source == 'sectors':
-            leaders = self.get_sector_leaders()
-            return leaders[:15]  # Top 15 sector leaders
+            symbols = self.get_sector_leaders()
         else:
-            return self.fallback_popular
+            symbols = self.fallback_popular
+        return symbols[:limit]
+
+def fetch_history(symbol, hedge=False, **params):
+    """OHLCV bars from upstream, or as of the replay clock while a past session is replayed"""
+    if replay.ENGINE is not None:
+        return replay.ENGINE.history(symbol, **params)
+    return upstream_history(symbol, hedge=hedge, **params)
+
+def upstream_history(symbol, hedge=False, **params):
+    """ticker.history() behind the yfinance circuit breaker and timeout.
+
+    yfinance returns an empty frame both for unknown symbols and for failed
+    requests. Failed requests are raised so they count against the circuit;
+    unknown symbols are negatively cached and not requested again for
+    resilience.NEGATIVE_TTL.
+    """
+    if symbol in resilience.INVALID_SYMBOLS:
+        return pd.DataFrame()
+
+    def request():
+        ticker = yf.Ticker(symbol)
+        bars = ticker.history(**params)
+        # No metadata means Yahoo sent no chart for the symbol
+        if bars.empty and not ticker._history_metadata:
+            message = yf.shared._ERRORS.get(symbol, '')
+            if message.startswith(NO_RESPONSE_ERROR):
+                raise ConnectionError(f"{symbol}: {message}")
+            resilience.INVALID_SYMBOLS.add(symbol)
+        return bars
+
+    return resilience.call('yfinance.history', request, hedge=hedge,
+                           symbol=symbol, interval=params.get('interval', '1d'))
 
 # Updated data fetcher functions
-@st.cache_data(ttl=300)
-def get_real_stock_data(symbol):
-    """Fetch real stock data from Yahoo Finance"""
+def fetch_quote(symbol):
+    """Quote-lite: last price, previous close, day range and volume.
+
+    Read from the last daily bars (one small chart request, unadjusted so
+    the previous close matches the exchange's), instead of the full info
+    payload plus a day of 1-minute bars. Before the open the last bar is
+    the previous session, so the change shown is that session's.
+    """
     try:
-        ticker = yf.Ticker(symbol)
-        info = ticker.info
-        hist = ticker.history(period="1d", interval="1m")
+        bars = fetch_history(symbol, hedge=True, period=QUOTE_BARS_PERIOD, interval='1d', auto_adjust=False)
         
-        if hist.empty:
+        if bars.empty:
             return None
             
-        current_price = hist['Close'].iloc[-1]
-        prev_close = info.get('previousClose', current_price)
+        session = bars.iloc[-1]
+        current_price = session['Close']
+        prev_close = bars['Close'].iloc[-2] if len(bars) > 1 else session['Open']
         change = current_price - prev_close
         change_pct = (change / prev_close) * 100
         
@@ -138,16 +222,102 @@ def get_real_stock_data(symbol):
             'price': current_price,
             'change': change,
             'change_pct': change_pct,
-            'volume': hist['Volume'].sum(),
-            'high': hist['High'].max(),
-            'low': hist['Low'].min()
+            'volume': session['Volume'],
+            'high': session['High'],
+            'low': session['Low']
         }
     except:
         return None
 
-@st.cache_data(ttl=300)
-def get_market_indices():
+class IncompleteQuotes(Exception):
+    """Raised from a cached quote table that is missing quotes, so the
+    partial table is served but not cached for the epoch"""
+
+    def __init__(self, table):
+        super().__init__(f"{len(table)} quotes only")
+        self.table = table
+
+@bounded_cache('quotes', ttl=market_calendar.MAX_CLOSED_SECONDS, version_arg='refresh_epoch')
+def _fetch_stock_data(symbol, refresh_epoch):
+    """Raises when there is no quote so a failure is not cached for the
+    epoch, which is pinned until the next session while the market is closed"""
+    quote = fetch_quote(symbol)
+    if quote is None:
+        raise ValueError(f"No quote for {symbol}")
+    return quote
+
+@timed('data.get_real_stock_data', cached=True)
+def get_real_stock_data(symbol):
+    """Latest quote, from the shared snapshot when a quote writer is running,
+    otherwise refetched on the market-session-aware quote TTL"""
+    quote = quote_snapshot.read_quote(symbol)
+    if quote is not None:
+        return quote
+    try:
+        return _fetch_stock_data(symbol, market_calendar.refresh_epoch(QUOTE_TTL))
+    except:
+        return None
+
+@bounded_cache('company', ttl=COMPANY_INFO_TTL)
+def _fetch_company_info(symbol):
+    """Slow-changing company details from the full info payload.
+
+    Raises on failure so an outage is not cached for the whole TTL.
+    """
+    if symbol in resilience.INVALID_SYMBOLS:
+        raise ValueError(f"Unknown symbol {symbol}")
+    info = resilience.call('yfinance.info', lambda: yf.Ticker(symbol).info, symbol=symbol)
+    if not info:
+        raise ValueError(f"No company info for {symbol}")
+    return {
+        'name': info.get('longName', symbol),
+        'shares': info.get('sharesOutstanding') or 0,
+        'market_cap': info.get('marketCap') or 0
+    }
+
+@timed('data.get_company_info', cached=True)
+def get_company_info(symbol):
+    """Company name and share count, refetched daily"""
+    try:
+        return _fetch_company_info(symbol)
+    except:
+        return None
+
+@timed('data.get_symbol_lookup')
+def get_symbol_lookup(symbol):
+    """Header lookup card data: the shared quote plus daily-cached company info"""
+    quote = get_real_stock_data(symbol)
+    if not quote:
+        return None
+    info = get_company_info(symbol) or {'name': symbol, 'shares': 0, 'market_cap': 0}
+    # Market cap moves with the price; derive it from the share count when known
+    market_cap = info['shares'] * quote['price'] if info['shares'] else info['market_cap']
+    return {**quote, 'name': info['name'], 'market_cap': market_cap}
+
+@bounded_cache('stock_history', ttl=market_calendar.MAX_CLOSED_SECONDS, version_arg='refresh_epoch',
+               unpack=ohlcv.unpack)
+def _fetch_stock_history(symbol, period, interval, refresh_epoch):
+    """Fetch OHLCV history for analysis and predictions, memory-mapped
+    and shared between workers like the chart tiers.
+
+    Upstream failures propagate so they are not cached for the epoch.
+    """
+    def fetch():
+        return fetch_history(symbol, hedge=True, period=period, interval=interval)
+    return history_store.load(f'stock_history/{symbol}.{interval}.{period}', refresh_epoch, fetch)
+
+@timed('data.get_stock_history', cached=True)
+def get_stock_history(symbol, period="6mo", interval="1d"):
+    """OHLCV history, refetched on the market-session-aware history TTL"""
+    try:
+        return _fetch_stock_history(symbol, period, interval, market_calendar.refresh_epoch(HISTORY_TTL))
+    except:
+        return None
+
+@st.cache_data(ttl=market_calendar.MAX_CLOSED_SECONDS, max_entries=100)
+def _fetch_market_indices(refresh_epoch):
     """Get major market indices dynamically"""
+    cache_miss()
     fetcher = DynamicStockFetcher()
     indices = fetcher.get_dynamic_indices()
     
@@ -156,20 +326,40 @@ def get_market_indices():
         result = get_real_stock_data(symbol)
         if result:
             data[name] = result
-    return data
+    table = QuoteTable.from_mapping(data)
+    if len(data) < len(indices):
+        raise IncompleteQuotes(table)
+    return table
+
+@timed('data.get_market_indices', cached=True)
+def get_market_indices():
+    """Major index quotes as a QuoteTable keyed by index name"""
+    try:
+        return _fetch_market_indices(market_calendar.refresh_epoch(QUOTE_TTL))
+    except IncompleteQuotes as e:
+        return e.table
 
-@st.cache_data(ttl=300)
-def get_watchlist_data(source='trending'):
+@st.cache_data(ttl=market_calendar.MAX_CLOSED_SECONDS, max_entries=100)
+def _fetch_watchlist_data(source, limit, refresh_epoch):
     """Get dynamic watchlist based on source"""
+    cache_miss()
     fetcher = DynamicStockFetcher()
-    watchlist = fetcher.get_dynamic_watchlist(source)
-    
-    data = {}
-    for symbol in watchlist:
-        result = get_real_stock_data(symbol)
-        if result:
-            data[symbol] = result
-    return data
+    watchlist = fetcher.get_dynamic_watchlist(source, limit)
+
+    quotes = QUOTE_POOL.map(bind(get_real_stock_data), watchlist)
+    data = {symbol: result for symbol, result in zip(watchlist, quotes) if result}
+    table = QuoteTable.from_mapping(data)
+    if len(data) < len(watchlist):
+        raise IncompleteQuotes(table)
+    return table
+
+@timed('data.get_watchlist_data', cached=True)
+def get_watchlist_data(source='trending', limit=None):
+    """Watchlist quotes as a QuoteTable keyed by symbol"""
+    try:
+        return _fetch_watchlist_data(source, limit, market_calendar.refresh_epoch(QUOTE_TTL))
+    except IncompleteQuotes as e:
+        return e.table
 
 # Format functions remain the same
 def format_price_change(change, change_pct):
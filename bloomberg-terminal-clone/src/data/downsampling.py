@@ -0,0 +1,78 @@
+# src/data/downsampling.py
+import numpy as np
+import pandas as pd
+
+# Width of one chart quadrant on a wide layout and the narrowest readable candle
+CHART_PIXEL_WIDTH = 720
+PIXELS_PER_CANDLE = 3
+
+
+def max_points_for_width(pixel_width: int = CHART_PIXEL_WIDTH, pixels_per_point: int = PIXELS_PER_CANDLE) -> int:
+    """Number of points worth sending to a chart of the given width"""
+    return max(2, pixel_width // pixels_per_point)
+
+
+def ohlc_downsample(df: pd.DataFrame, max_bars: int) -> pd.DataFrame:
+    """Merge consecutive bars into at most max_bars OHLCV buckets.
+
+    Each bucket keeps the first open, highest high, lowest low, last close
+    and summed volume, so wicks and ranges survive the reduction.
+    """
+    n = len(df)
+    if n <= max_bars:
+        return df
+
+    # Bucket start offsets, equal row counts per bucket
+    starts = np.linspace(0, n, max_bars + 1).astype(np.int64)[:-1]
+    starts = np.unique(starts)
+    ends = np.append(starts[1:], n) - 1
+
+    result = {
+        'Open': df['Open'].to_numpy()[starts],
+        'High': np.maximum.reduceat(df['High'].to_numpy(), starts),
+        'Low': np.minimum.reduceat(df['Low'].to_numpy(), starts),
+        'Close': df['Close'].to_numpy()[ends]
+    }
+    if 'Volume' in df.columns:
+        result['Volume'] = np.add.reduceat(df['Volume'].to_numpy(), starts)
+    return pd.DataFrame(result, index=df.index[starts])
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int):
+    """Largest-Triangle-Three-Buckets downsampling of a line series.
+
+    Returns the indices of the retained points, always including the first
+    and last point.
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+
+    prev = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Average of the next bucket is the third triangle vertex
+        nlo, nhi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[nlo:nhi].mean() if nhi > nlo else x[-1]
+        avg_y = y[nlo:nhi].mean() if nhi > nlo else y[-1]
+        areas = np.abs(
+            (x[prev] - avg_x) * (y[lo:hi] - y[prev]) - (x[prev] - x[lo:hi]) * (avg_y - y[prev])
+        )
+        prev = lo + int(np.argmax(areas))
+        selected[i + 1] = prev
+    return selected
+
+
+def lttb_series(series: pd.Series, threshold: int) -> pd.Series:
+    """LTTB over a time-indexed series, skipping leading NaNs"""
+    series = series.dropna()
+    if len(series) <= threshold:
+        return series
+    x = series.index.asi8 if isinstance(series.index, pd.DatetimeIndex) else np.arange(len(series))
+    return series.iloc[lttb(x, series.to_numpy(), threshold)]
@@ -0,0 +1,172 @@
+# src/data/history_store.py
+#
+# Price history shared by every app process through memory-mapped files.
+# The first process to download a symbol's bars for a refresh epoch writes
+# them to one file; every process (including the writer) then maps that
+# file read-only and builds DataFrames directly on the mapped pages, so the
+# bars are neither parsed nor copied and the page cache holds one copy for
+# all workers.
+#
+# Layout per file: a fixed header, then the bar times as int64 nanoseconds
+# (UTC for tz-aware bars), then Open, High, Low, Close and Volume as
+# contiguous float64 columns. Files are written under a temporary name and
+# renamed into place, so a reader maps either the old or the new file whole.
+#
+# The columns stay float64 rather than the float32 packing OHLCVBlock uses in
+# process memory: a frame can only be built on the mapped pages when they
+# already have the frame's dtype, and the page cache holds each file once for
+# all workers. Packing them would cost every reader a converted copy on every
+# to_frame() to save bytes that are not held per process.
+import os
+import re
+import tempfile
+import threading
+from collections import Counter
+from typing import Callable, Optional
+
+import numpy as np
+import pandas as pd
+
+from data import ohlcv
+
+# Empty LUTHER_HISTORY_DIR keeps history in process memory only
+HISTORY_DIR = os.getenv('LUTHER_HISTORY_DIR', os.path.join(tempfile.gettempdir(), 'luther_history'))
+
+MAGIC = 0x4C4F4831  # "LOH1"
+
+HEADER_DTYPE = np.dtype([
+    ('magic', '<u4'),
+    ('columns', '<u4'),
+    ('rows', '<u8'),
+    ('version', '<i8'),
+    ('tz', 'S48')
+])
+
+HEADER_SIZE = 128
+
+# Entry names become file paths, so the file name part (built from a symbol)
+# may only hold ticker characters: BRK-B, ^GSPC, EURUSD=X, BF.B
+NAME_PATTERN = re.compile(r'(?:[a-z_]+/)?[A-Za-z0-9^=\-][A-Za-z0-9^=.\-]*')
+
+
+class MappedHistory:
+    """OHLCV bars backed by a read-only memory map.
+
+    to_frame() wraps the mapped columns without copying; the frame is
+    read-only, so writing to its columns raises instead of changing the
+    shared file. Adding columns is fine. Volume is float64 so all five
+    columns form one block.
+    """
+
+    __slots__ = ('path', 'tz', 'timestamps', 'values')
+
+    def __init__(self, path: str, tz: Optional[str], timestamps: np.ndarray, values: np.ndarray):
+        self.path = path
+        self.tz = tz
+        self.timestamps = timestamps
+        self.values = values
+
+    @property
+    def nbytes(self) -> int:
+        # Mapped pages live in the shared page cache, but charging them keeps
+        # the cache budget bounding how many files a process holds open
+        return self.timestamps.nbytes + self.values.nbytes
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def to_frame(self) -> pd.DataFrame:
+        dtype = pd.DatetimeTZDtype(tz='UTC') if self.tz else np.dtype('M8[ns]')
+        times = pd.arrays.DatetimeArray(self.timestamps.view('M8[ns]'), dtype=dtype, copy=False)
+        index = pd.DatetimeIndex(times, copy=False)
+        if self.tz:
+            index = index.tz_convert(self.tz)
+        # A (columns, rows) array is exactly pandas' internal block layout
+        return pd.DataFrame(self.values.T, index=index, columns=list(ohlcv.OHLCV_COLUMNS), copy=False)
+
+
+class HistoryStore:
+    """Directory of memory-mapped history files, one per entry name
+    ("<cache>/<symbol>.<interval>.<period>")"""
+
+    def __init__(self, root: str):
+        self.root = root
+        self.stats = Counter()
+        self._lock = threading.Lock()
+
+    def path(self, name: str) -> str:
+        if not NAME_PATTERN.fullmatch(name):
+            raise ValueError(f"Invalid history entry name {name!r}")
+        return os.path.join(self.root, name + '.ohlcv')
+
+    def _count(self, stat: str):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def open(self, name: str, version: int) -> Optional[MappedHistory]:
+        """Map the file for `name` if it was written for `version`"""
+        path = self.path(name)
+        try:
+            with open(path, 'rb') as f:
+                header = np.frombuffer(f.read(HEADER_DTYPE.itemsize), dtype=HEADER_DTYPE)
+                if (len(header) != 1 or header['magic'][0] != MAGIC
+                        or header['version'][0] != version or header['columns'][0] != len(ohlcv.OHLCV_COLUMNS)):
+                    return None
+                rows = int(header['rows'][0])
+                if rows == 0:
+                    return None
+                # Mapping the already open file pins this version even if it is replaced meanwhile
+                data = np.memmap(f, dtype='<i8', mode='r', offset=HEADER_SIZE, shape=(1 + len(ohlcv.OHLCV_COLUMNS), rows))
+        except (OSError, ValueError):
+            return None
+
+        self._count('mapped')
+        tz = header['tz'][0].decode() or None
+        return MappedHistory(path, tz, data[0], data[1:].view('<f8'))
+
+    def write(self, name: str, frame: pd.DataFrame, version: int) -> Optional[MappedHistory]:
+        """Write bars for `version` and return them mapped; None if the store is not writable"""
+        index = pd.DatetimeIndex(frame.index)
+        header = np.zeros(1, dtype=HEADER_DTYPE)
+        header['magic'] = MAGIC
+        header['columns'] = len(ohlcv.OHLCV_COLUMNS)
+        header['rows'] = len(frame)
+        header['version'] = version
+        header['tz'] = str(index.tz).encode() if index.tz is not None else b''
+
+        path = self.path(name)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                f.write(header.tobytes().ljust(HEADER_SIZE, b'\0'))
+                f.write(index.asi8.astype('<i8').tobytes())
+                f.write(frame[list(ohlcv.OHLCV_COLUMNS)].to_numpy(dtype='<f8').T.tobytes())
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Error writing history file {path}: {e}")
+            return None
+        self._count('written')
+        return self.open(name, version)
+
+
+STORE = HistoryStore(HISTORY_DIR) if HISTORY_DIR else None
+
+
+def load(name: str, version: int, fetch: Callable[[], Optional[pd.DataFrame]]):
+    """Stored form of a history cache entry.
+
+    Maps the file another process already wrote for this version, or calls
+    `fetch` and writes it. Without a store (or if writing fails) the bars
+    are packed in process memory instead. Either result's to_frame()
+    rebuilds the DataFrame.
+    """
+    if STORE is not None:
+        mapped = STORE.open(name, version)
+        if mapped is not None:
+            return mapped
+    frame = fetch()
+    if frame is None or frame.empty:
+        return None
+    mapped = STORE.write(name, frame, version) if STORE is not None else None
+    return mapped if mapped is not None else ohlcv.pack(frame)
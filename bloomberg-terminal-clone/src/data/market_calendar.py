@@ -0,0 +1,198 @@
+# src/data/market_calendar.py
+import functools
+from datetime import date, datetime, timedelta
+from typing import Callable, NamedTuple, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+# NYSE / NASDAQ regular and extended trading hours, in exchange time
+EXCHANGE_TZ = ZoneInfo('America/New_York')
+PRE_MARKET_OPEN = (4, 0)
+REGULAR_OPEN = (9, 30)
+REGULAR_CLOSE = (16, 0)
+EARLY_CLOSE = (13, 0)
+POST_MARKET_CLOSE = (20, 0)
+EARLY_POST_MARKET_CLOSE = (17, 0)
+
+# Unscheduled full-day closures (national days of mourning etc.)
+SPECIAL_CLOSURES = {
+    date(2018, 12, 5),
+    date(2025, 1, 9)
+}
+
+# Cache TTLs stretch by this factor in pre-market and after-hours
+EXTENDED_HOURS_TTL_FACTOR = 5
+
+# Longest stretch without any session (e.g. a Friday holiday weekend),
+# used as the st.cache_data ttl for entries keyed by refresh_epoch()
+MAX_CLOSED_SECONDS = 4 * 24 * 3600
+
+PHASE_LABELS = {
+    'pre': 'PRE-MARKET',
+    'open': 'MARKET OPEN',
+    'post': 'AFTER HOURS',
+    'closed': 'MARKET CLOSED'
+}
+
+NEXT_PHASE = {'closed': 'pre', 'pre': 'open', 'open': 'post', 'post': 'closed'}
+
+# Stands in for the wall clock while a past session is replayed (see data.replay)
+_clock: Optional[Callable[[], datetime]] = None
+
+
+class MarketStatus(NamedTuple):
+    phase: str
+    label: str
+    next_change: datetime
+    next_phase: str
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """n-th weekday (Mon=0) of a month; n=-1 for the last one"""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _easter(year: int) -> date:
+    """Gregorian Easter Sunday (anonymous Gregorian algorithm)"""
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def _observed(day: date) -> date:
+    """Saturday holidays close the Friday before, Sunday holidays the Monday after"""
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+
+@functools.lru_cache(maxsize=16)
+def holidays(year: int) -> frozenset:
+    """Full-day NYSE closures for a year"""
+    days = {
+        _nth_weekday(year, 1, 0, 3),              # Martin Luther King Jr. Day
+        _nth_weekday(year, 2, 0, 3),              # Washington's Birthday
+        _easter(year) - timedelta(days=2),        # Good Friday
+        _nth_weekday(year, 5, 0, -1),             # Memorial Day
+        _observed(date(year, 7, 4)),              # Independence Day
+        _nth_weekday(year, 9, 0, 1),              # Labor Day
+        _nth_weekday(year, 11, 3, 4),             # Thanksgiving
+        _observed(date(year, 12, 25))             # Christmas
+    }
+    # New Year's Day on a Saturday is not made up on the previous Friday
+    new_year = date(year, 1, 1)
+    if new_year.weekday() != 5:
+        days.add(_observed(new_year))
+    if year >= 2022:
+        days.add(_observed(date(year, 6, 19)))    # Juneteenth
+    days.update(d for d in SPECIAL_CLOSURES if d.year == year)
+    return frozenset(days)
+
+
+@functools.lru_cache(maxsize=16)
+def early_closes(year: int) -> frozenset:
+    """Half days closing at 13:00: July 3, the day after Thanksgiving, Christmas Eve"""
+    candidates = {
+        date(year, 7, 3),
+        _nth_weekday(year, 11, 3, 4) + timedelta(days=1),
+        date(year, 12, 24)
+    }
+    return frozenset(d for d in candidates if is_trading_day(d))
+
+
+def is_trading_day(day: date) -> bool:
+    return day.weekday() < 5 and day not in holidays(day.year)
+
+
+def _at(day: date, hour_minute: Tuple[int, int]) -> datetime:
+    return datetime(day.year, day.month, day.day, *hour_minute, tzinfo=EXCHANGE_TZ)
+
+
+def session_times(day: date) -> Optional[Tuple[datetime, datetime, datetime, datetime]]:
+    """(pre-market open, regular open, regular close, after-hours close) or None"""
+    if not is_trading_day(day):
+        return None
+    early = day in early_closes(day.year)
+    return (_at(day, PRE_MARKET_OPEN),
+            _at(day, REGULAR_OPEN),
+            _at(day, EARLY_CLOSE if early else REGULAR_CLOSE),
+            _at(day, EARLY_POST_MARKET_CLOSE if early else POST_MARKET_CLOSE))
+
+
+def set_clock(clock: Optional[Callable[[], datetime]]):
+    """Drive market status and refresh epochs from `clock` instead of the wall clock"""
+    global _clock
+    _clock = clock
+
+
+def _now(now: Optional[datetime]) -> datetime:
+    if now is None:
+        now = _clock() if _clock is not None else datetime.now(EXCHANGE_TZ)
+    return now.astimezone(EXCHANGE_TZ)
+
+
+def now() -> datetime:
+    """Current exchange time; the replay clock while a session is replayed"""
+    return _now(None)
+
+
+def market_status(now: Optional[datetime] = None) -> MarketStatus:
+    """Current session phase and when (and into what) it next changes"""
+    now = _now(now)
+    day = now.date()
+    while True:
+        times = session_times(day)
+        if times is not None:
+            pre_open, regular_open, regular_close, post_close = times
+            for phase, end in (('closed', pre_open), ('pre', regular_open),
+                               ('open', regular_close), ('post', post_close)):
+                if now < end:
+                    return MarketStatus(phase, PHASE_LABELS[phase], end, NEXT_PHASE[phase])
+        day += timedelta(days=1)
+
+
+def last_session_open(now: Optional[datetime] = None) -> datetime:
+    """Regular open of the latest session that has opened by `now`"""
+    now = _now(now)
+    day = now.date()
+    while True:
+        times = session_times(day)
+        if times is not None and times[1] <= now:
+            return times[1]
+        day -= timedelta(days=1)
+
+
+def market_phase(now: Optional[datetime] = None) -> str:
+    return market_status(now).phase
+
+
+def refresh_epoch(ttl: float, now: Optional[datetime] = None) -> int:
+    """Cache key component that rolls over when cached market data goes stale.
+
+    Pass it as an argument to an st.cache_data function (with
+    ttl=MAX_CLOSED_SECONDS): during the regular session it changes every
+    ttl seconds, in pre-market and after-hours every
+    EXTENDED_HOURS_TTL_FACTOR * ttl seconds, and while the market is
+    closed it stays pinned to the next session start so nothing is
+    refetched overnight, on weekends or on holidays.
+    """
+    now = _now(now)
+    status = market_status(now)
+    if status.phase == 'closed':
+        return int(status.next_change.timestamp())
+    timestamp = now.timestamp()
+    if status.phase != 'open':
+        ttl *= EXTENDED_HOURS_TTL_FACTOR
+    return int(timestamp // ttl)
@@ -1,16 +1,21 @@
 # src/data/news_fetcher.py
 import requests
+import streamlit as st
 import pandas as pd
 from datetime import datetime, timedelta
 import os
 from typing import List, Dict
 import time
 
+from data import resilience
+from Utils.profiler import cache_miss, timed
+
 class NewsDataFetcher:
     def __init__(self):
         self.news_api_key = os.getenv('NEWS_API_KEY')
         self.base_url = "https://newsapi.org/v2"
         
+    @timed('news.get_financial_news')
     def get_financial_news(self, query: str = "finance", limit: int = 20) -> List[Dict]:
         """Get general financial news"""
         if not self.news_api_key:
@@ -26,7 +31,8 @@ class NewsDataFetcher:
                 'language': 'en'
             }
             
-            response = requests.get(url, params=params)
+            response = resilience.call('newsapi.everything', lambda: requests.get(
+                url, params=params, timeout=resilience.PROVIDER_POLICIES['newsapi'].timeout))
             response.raise_for_status()
             
             data = response.json()
@@ -36,6 +42,7 @@ class NewsDataFetcher:
             print(f"Error fetching news: {e}")
             return self._get_mock_news()
     
+    @timed('news.get_stock_news')
     def get_stock_news(self, symbol: str, limit: int = 10) -> List[Dict]:
         """Get news specific to a stock symbol"""
         if not self.news_api_key:
@@ -51,7 +58,8 @@ class NewsDataFetcher:
                 'language': 'en'
             }
             
-            response = requests.get(url, params=params)
+            response = resilience.call('newsapi.everything', lambda: requests.get(
+                url, params=params, timeout=resilience.PROVIDER_POLICIES['newsapi'].timeout))
             response.raise_for_status()
             
             data = response.json()
@@ -201,6 +209,13 @@ class NewsDataFetcher:
         
         return {'average_sentiment': 0, 'sentiment_label': 'Neutral', 'total_articles': 0}
 
+@timed('data.get_cached_stock_news', cached=True)
+@st.cache_data(ttl=900)
+def get_cached_stock_news(symbol: str, limit: int = 10) -> List[Dict]:
+    """Stock news shared across sessions for 15 minutes"""
+    cache_miss()
+    return NewsDataFetcher().get_stock_news(symbol, limit)
+
 # Example usage
 if __name__ == "__main__":
     news_fetcher = NewsDataFetcher()
@@ -0,0 +1,80 @@
+# src/data/ohlcv.py
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+PRICE_COLUMNS = ('Open', 'High', 'Low', 'Close')
+OHLCV_COLUMNS = PRICE_COLUMNS + ('Volume',)
+# How bars combine into coarser ones
+OHLCV_AGG = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
+NS_PER_SECOND = 10 ** 9
+
+
+class OHLCVBlock:
+    """OHLCV bars packed for caching: float32 prices, uint32 volume when it
+    fits, and timestamps as uint32 second offsets from the first bar.
+
+    About half the bytes of the equivalent float64 DataFrame. to_frame()
+    rebuilds a fresh float64 frame, so callers can never modify the cached
+    copy.
+    """
+
+    __slots__ = ('start', 'offsets', 'tz', 'prices', 'volume')
+
+    def __init__(self, start: int, offsets: np.ndarray, tz: Optional[str], prices: np.ndarray, volume: np.ndarray):
+        self.start = start
+        self.offsets = offsets
+        self.tz = tz
+        self.prices = prices
+        self.volume = volume
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'OHLCVBlock':
+        index = pd.DatetimeIndex(df.index)
+        timestamps = index.asi8
+        start = int(timestamps[0]) if len(timestamps) else 0
+        offsets = timestamps - start
+        # Bars fall on whole seconds; keep nanoseconds for anything finer or too long
+        if (offsets % NS_PER_SECOND).any() or offsets.max(initial=0) >= 2 ** 32 * NS_PER_SECOND:
+            offsets = offsets.copy()
+        else:
+            offsets = (offsets // NS_PER_SECOND).astype(np.uint32)
+        volume = df['Volume'].fillna(0).to_numpy()
+        fits = len(volume) == 0 or (volume.min() >= 0 and volume.max() < 2 ** 32)
+        return cls(
+            start,
+            offsets,
+            str(index.tz) if index.tz is not None else None,
+            df[list(PRICE_COLUMNS)].to_numpy(dtype=np.float32),
+            volume.astype(np.uint32 if fits else np.int64)
+        )
+
+    @property
+    def nbytes(self) -> int:
+        return self.offsets.nbytes + self.prices.nbytes + self.volume.nbytes
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        """Bar times as int64 nanoseconds (UTC for tz-aware bars)"""
+        scale = NS_PER_SECOND if self.offsets.dtype == np.uint32 else 1
+        return self.start + self.offsets.astype(np.int64) * scale
+
+    def to_frame(self) -> pd.DataFrame:
+        index = pd.DatetimeIndex(self.timestamps, tz='UTC' if self.tz else None)
+        if self.tz:
+            index = index.tz_convert(self.tz)
+        frame = pd.DataFrame(self.prices.astype(np.float64), index=index, columns=list(PRICE_COLUMNS))
+        frame['Volume'] = self.volume.astype(np.int64)
+        return frame
+
+
+def pack(df: Optional[pd.DataFrame]) -> Optional[OHLCVBlock]:
+    return None if df is None else OHLCVBlock.from_frame(df)
+
+
+def unpack(block: Optional[OHLCVBlock]) -> Optional[pd.DataFrame]:
+    return None if block is None else block.to_frame()
@@ -0,0 +1,149 @@
+# src/data/prefetch.py
+import threading
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Optional, Tuple
+
+import streamlit as st
+
+from data import market_calendar, resilience
+from data.data_fetcher import QUOTE_TTL, get_company_info, get_real_stock_data
+from data.resampling import BASE_FETCHES, PERIOD_VIEWS, get_base_history
+
+# Background warming is capped per process and per page state so it never
+# competes with the fetches a rerun is actually waiting on
+PREFETCH_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix='luther-prefetch')
+MAX_PENDING = 32   # warm tasks queued or running in this process
+PAGE_BUDGET = 16   # warm tasks submitted per page state
+PREDICTIONS = 3    # learned next clicks warmed per session
+
+# ('symbol', 'AAPL') or ('period', '5d')
+Click = Tuple[str, str]
+# ('history', symbol, tier), ('quote', symbol) or ('company', symbol)
+Task = Tuple[str, ...]
+
+
+class ClickModel:
+    """First-order Markov chain over a session's clicks.
+
+    Predicts the clicks most often seen right after the last one, topped up
+    with the session's most frequent clicks.
+    """
+
+    def __init__(self):
+        self.transitions = defaultdict(Counter)
+        self.counts = Counter()
+        self.last: Optional[Click] = None
+
+    def record(self, click: Click):
+        if self.last is not None and click != self.last:
+            self.transitions[self.last][click] += 1
+        self.counts[click] += 1
+        self.last = click
+
+    def predict(self, k: int) -> List[Click]:
+        ranked = [click for click, _ in self.transitions[self.last].most_common()] if self.last else []
+        ranked += [click for click, _ in self.counts.most_common()]
+        return [click for click in dict.fromkeys(ranked) if click != self.last][:k]
+
+
+class Prefetcher:
+    """Runs warm tasks on a small pool, skipping duplicates and dropping
+    work past MAX_PENDING or while the yfinance circuit is not closed."""
+
+    def __init__(self):
+        self._pending = set()
+        self._lock = threading.Lock()
+        self.stats = Counter()
+
+    def submit(self, tasks: Iterable[Task]) -> int:
+        if resilience.BREAKERS['yfinance'].state != 'closed':
+            return 0
+        submitted = 0
+        with self._lock:
+            for task in tasks:
+                if task in self._pending:
+                    continue
+                if len(self._pending) >= MAX_PENDING:
+                    self.stats['dropped'] += 1
+                    continue
+                self._pending.add(task)
+                PREFETCH_POOL.submit(self._run, task)
+                submitted += 1
+        self.stats['submitted'] += submitted
+        return submitted
+
+    def _run(self, task: Task):
+        try:
+            # Each getter is a cache hit when the data is already warm
+            kind, symbol, *rest = task
+            if kind == 'history':
+                get_base_history(symbol, rest[0])
+            elif kind == 'quote':
+                get_real_stock_data(symbol)
+            elif kind == 'company':
+                get_company_info(symbol)
+        except Exception:
+            self.stats['errors'] += 1
+        finally:
+            with self._lock:
+                self._pending.discard(task)
+
+
+PREFETCHER = Prefetcher()
+
+
+def period_tier(period: str) -> str:
+    """Base tier a chart period is derived from"""
+    return PERIOD_VIEWS.get(period, PERIOD_VIEWS['3mo'])[0]
+
+
+def lookup_tasks(symbol: str) -> List[Task]:
+    return [('quote', symbol), ('company', symbol)]
+
+
+def page_tasks(chart_symbol: str, chart_period: str, quick_symbols: Iterable[str],
+               model: ClickModel) -> List[Task]:
+    """Warm tasks for the current page state, most valuable first"""
+    predicted = model.predict(PREDICTIONS)
+    next_periods = [value for kind, value in predicted if kind == 'period']
+    tiers = list(dict.fromkeys(period_tier(period) for period in [chart_period] + next_periods))
+
+    # Every period of the charted symbol derives from its three base tiers
+    tasks = [('history', chart_symbol, tier) for tier in tiers]
+    tasks += [('history', chart_symbol, tier) for tier in BASE_FETCHES if tier not in tiers]
+
+    # Likely next symbols: lookup card plus the chart at the periods in play
+    for kind, symbol in predicted:
+        if kind == 'symbol' and symbol != chart_symbol:
+            tasks += lookup_tasks(symbol) + [('history', symbol, tier) for tier in tiers]
+
+    for symbol in quick_symbols:
+        tasks += lookup_tasks(symbol)
+    return list(dict.fromkeys(tasks))
+
+
+def _click_model() -> ClickModel:
+    return st.session_state.setdefault('prefetch_clicks', ClickModel())
+
+
+def record_click(kind: str, value: str):
+    """Feed a symbol or chart period click into this session's model"""
+    _click_model().record((kind, value))
+
+
+def warm_likely_next(quick_symbols: Iterable[str] = ()):
+    """Queue background warming for what this session will probably open next.
+
+    Only resubmits when the page state or the model's prediction changed,
+    or the quotes have rolled over to a new refresh epoch.
+    """
+    model = _click_model()
+    quick_symbols = tuple(quick_symbols)
+    chart_symbol = st.session_state.get('chart_symbol', 'AAPL')
+    chart_period = st.session_state.get('chart_period', '5d')
+    state = (chart_symbol, chart_period, model.last, quick_symbols, market_calendar.refresh_epoch(QUOTE_TTL))
+    if st.session_state.get('prefetch_state') == state:
+        return
+    st.session_state.prefetch_state = state
+    PREFETCHER.submit(page_tasks(chart_symbol, chart_period, quick_symbols, model)[:PAGE_BUDGET])
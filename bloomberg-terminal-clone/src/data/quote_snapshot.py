@@ -0,0 +1,231 @@
+# src/data/quote_snapshot.py
+#
+# Latest-quote snapshot shared by every app process through a memory-mapped
+# file. One writer process (quote_writer.py) owns the file and refreshes the
+# quotes; each Streamlit server process maps it read-only and reads records
+# in place, so upstream load does not grow with the number of app processes.
+#
+# Layout: a fixed header followed by CAPACITY fixed-size quote records. Slots
+# are append-only, so a symbol keeps its slot for the life of the file. Each
+# record carries its own sequence number (a seqlock): the writer makes it odd
+# while updating the record and even when done, and readers retry if they
+# saw an odd or changed sequence.
+import fcntl
+import os
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+# Set in every app process (and for the writer) to enable the snapshot
+SNAPSHOT_PATH = os.getenv('LUTHER_QUOTE_SNAPSHOT')
+
+MAGIC = 0x4C515431  # "LQT1"
+CAPACITY = 4096
+
+HEADER_DTYPE = np.dtype([
+    ('magic', '<u4'),
+    ('capacity', '<u4'),
+    ('count', '<u4'),
+    ('writer_pid', '<u4'),
+    ('heartbeat', '<f8')
+])
+
+QUOTE_DTYPE = np.dtype([
+    ('seq', '<u8'),
+    ('symbol', 'S16'),
+    ('price', '<f8'),
+    ('change', '<f8'),
+    ('change_pct', '<f8'),
+    ('volume', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('updated', '<f8')
+])
+
+QUOTE_FIELDS = ('price', 'change', 'change_pct', 'volume', 'high', 'low')
+
+HEADER_SIZE = 64
+
+# Readers fall back to fetching themselves if the writer stops heartbeating
+WRITER_TIMEOUT = 30
+READ_RETRIES = 100
+
+
+def file_size(capacity: int = CAPACITY) -> int:
+    return HEADER_SIZE + capacity * QUOTE_DTYPE.itemsize
+
+
+def _views(buffer, capacity: int):
+    header = np.ndarray((), dtype=HEADER_DTYPE, buffer=buffer, offset=0)
+    records = np.ndarray((capacity,), dtype=QUOTE_DTYPE, buffer=buffer, offset=HEADER_SIZE)
+    return header, records
+
+
+class QuoteSnapshotWriter:
+    """Single writer; holds an exclusive lock on the snapshot file"""
+
+    def __init__(self, path: str, capacity: int = CAPACITY):
+        self.path = path
+        self._lock_file = open(f'{path}.lock', 'w')
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise RuntimeError(f"Another quote writer already owns {path}")
+
+        # Build the file aside and rename it in, so readers never map a partial one
+        tmp_path = f'{path}.tmp'
+        np.memmap(tmp_path, dtype=np.uint8, mode='w+', shape=(file_size(capacity),)).flush()
+        os.replace(tmp_path, path)
+        self._map = np.memmap(path, dtype=np.uint8, mode='r+', shape=(file_size(capacity),))
+        self.header, self.records = _views(self._map, capacity)
+        self.header['capacity'] = capacity
+        self.header['writer_pid'] = os.getpid()
+        self.header['magic'] = MAGIC
+        self.slots: Dict[str, int] = {}
+        self.heartbeat()
+
+    def heartbeat(self):
+        self.header['heartbeat'] = time.time()
+
+    def upsert(self, quote: Dict) -> bool:
+        """Write one quote dict into its symbol's slot"""
+        symbol = quote['symbol']
+        slot = self.slots.get(symbol)
+        new = slot is None
+        if new:
+            slot = int(self.header['count'])
+            if slot >= len(self.records):
+                return False
+
+        record = self.records[slot:slot + 1]
+        record['seq'] += 1
+        record['symbol'] = symbol.encode()
+        for field in QUOTE_FIELDS:
+            record[field] = float(quote[field])
+        record['updated'] = time.time()
+        record['seq'] += 1
+
+        if new:
+            # Publish the slot only once the record is complete
+            self.slots[symbol] = slot
+            self.header['count'] = slot + 1
+        return True
+
+    def close(self):
+        self._map.flush()
+        fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+        self._lock_file.close()
+
+
+class QuoteSnapshotReader:
+    """Read-only, zero-copy view of the snapshot for one app process"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._map = None
+        self._inode = None
+        self._slots: Dict[str, int] = {}
+        self._indexed = 0
+        self._lock = threading.Lock()
+
+    def _attach(self) -> bool:
+        """(Re)map the file; a restarted writer replaces it with a new inode"""
+        try:
+            inode = os.stat(self.path).st_ino
+        except FileNotFoundError:
+            self._map = None
+            return False
+        if self._map is None or inode != self._inode:
+            buffer = np.memmap(self.path, dtype=np.uint8, mode='r')
+            header, records = _views(buffer, (len(buffer) - HEADER_SIZE) // QUOTE_DTYPE.itemsize)
+            if header['magic'] != MAGIC:
+                return False
+            self._map, self._inode = buffer, inode
+            self.header, self.records = header, records
+            self._slots, self._indexed = {}, 0
+        return True
+
+    def _fresh(self) -> bool:
+        return time.time() - float(self.header['heartbeat']) < WRITER_TIMEOUT
+
+    def available(self) -> bool:
+        """True while a writer is heartbeating into the mapped file"""
+        with self._lock:
+            if self._map is not None and self._fresh():
+                return True
+            return self._attach() and self._fresh()
+
+    def _slot(self, symbol: str) -> Optional[int]:
+        count = int(self.header['count'])
+        if count > self._indexed:
+            names = self.records['symbol'][self._indexed:count]
+            self._slots.update((name.decode(), self._indexed + i) for i, name in enumerate(names))
+            self._indexed = count
+        return self._slots.get(symbol)
+
+    def read(self, symbol: str) -> Optional[Dict]:
+        """Consistent copy of one quote, or None if the symbol is not in the snapshot"""
+        with self._lock:
+            slot = self._slot(symbol)
+            records = self.records
+        if slot is None:
+            return None
+        seqs = records['seq']
+        for _ in range(READ_RETRIES):
+            before = int(seqs[slot])
+            if before % 2 == 0:
+                record = records[slot].copy()
+                if int(seqs[slot]) == before:
+                    quote = {field: float(record[field]) for field in QUOTE_FIELDS}
+                    quote['symbol'] = symbol
+                    quote['updated'] = float(record['updated'])
+                    return quote
+            time.sleep(0)
+        return None
+
+    def request(self, symbols: Iterable[str]):
+        """Ask the writer to start tracking symbols it does not have yet"""
+        lines = ''.join(f'{symbol}\n' for symbol in symbols)
+        if lines:
+            # Short O_APPEND writes are atomic, so app processes never interleave
+            fd = os.open(wanted_path(self.path), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, lines.encode())
+            finally:
+                os.close(fd)
+
+
+def wanted_path(path: str) -> str:
+    return f'{path}.wanted'
+
+
+_reader = None
+_requested = set()
+
+
+def get_reader() -> Optional[QuoteSnapshotReader]:
+    global _reader
+    if SNAPSHOT_PATH and _reader is None:
+        _reader = QuoteSnapshotReader(SNAPSHOT_PATH)
+    return _reader
+
+
+def read_quote(symbol: str) -> Optional[Dict]:
+    """Quote from the shared snapshot, or None to fetch it in-process.
+
+    Symbols missing from a live snapshot are requested from the writer once
+    per process; until it has them the caller's own fetch path is used.
+    """
+    reader = get_reader()
+    if reader is None or not reader.available():
+        return None
+    quote = reader.read(symbol)
+    if quote is None and symbol not in _requested:
+        _requested.add(symbol)
+        try:
+            reader.request([symbol])
+        except OSError:
+            pass
+    return quote
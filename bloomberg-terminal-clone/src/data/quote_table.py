@@ -0,0 +1,104 @@
+# src/data/quote_table.py
+from collections.abc import Mapping
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+QUOTE_COLUMNS = ('price', 'change', 'change_pct', 'volume', 'high', 'low')
+
+
+class QuoteTable(Mapping):
+    """Quotes for many symbols stored as one float64 array per column.
+
+    Behaves like the {label: quote_dict} mappings it replaces (items(),
+    [label], len, truthiness), but per-row dicts are only built on access;
+    bulk consumers should use the columns and format(). Labels are the
+    display keys (index names or ticker symbols).
+    """
+
+    __slots__ = ('labels', 'symbols', 'columns', '_rows')
+
+    def __init__(self, labels: Iterable[str], symbols: Iterable[str], columns: Dict[str, np.ndarray]):
+        self.labels = np.array(list(labels), dtype=object)
+        self.symbols = np.array(list(symbols), dtype=object)
+        self.columns = {name: np.asarray(columns[name], dtype=np.float64) if name in columns
+                        else np.full(len(self.labels), np.nan)
+                        for name in QUOTE_COLUMNS}
+        self._rows = None
+
+    @classmethod
+    def from_mapping(cls, quotes: Optional[Mapping]) -> 'QuoteTable':
+        """Build from {label: quote_dict}; missing columns become NaN"""
+        if isinstance(quotes, QuoteTable):
+            return quotes
+        quotes = quotes or {}
+        rows = list(quotes.values())
+        columns = {name: np.array([row.get(name, np.nan) for row in rows], dtype=np.float64)
+                   for name in QUOTE_COLUMNS}
+        return cls(quotes.keys(), [row.get('symbol', label) for label, row in quotes.items()], columns)
+
+    def __getstate__(self):
+        return self.labels, self.symbols, self.columns
+
+    def __setstate__(self, state):
+        self.labels, self.symbols, self.columns = state
+        self._rows = None
+
+    # Mapping interface
+    def _row_index(self) -> Dict[str, int]:
+        if self._rows is None:
+            self._rows = {label: i for i, label in enumerate(self.labels.tolist())}
+        return self._rows
+
+    def __getitem__(self, label: str) -> Dict:
+        i = self._row_index()[label]
+        quote = {name: float(values[i]) for name, values in self.columns.items()}
+        quote['symbol'] = self.symbols[i]
+        return quote
+
+    def __iter__(self):
+        return iter(self.labels.tolist())
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def __contains__(self, label) -> bool:
+        return label in self._row_index()
+
+    def take(self, rows) -> 'QuoteTable':
+        """Rows by slice, index array or boolean mask"""
+        return QuoteTable(self.labels[rows], self.symbols[rows],
+                          {name: values[rows] for name, values in self.columns.items()})
+
+    def head(self, n: int) -> 'QuoteTable':
+        return self.take(slice(0, n))
+
+    def without(self, substring: str) -> 'QuoteTable':
+        """Drop rows whose label contains a substring"""
+        return self.take(np.array([substring not in label for label in self.labels.tolist()], dtype=bool))
+
+    def to_frame(self) -> pd.DataFrame:
+        """One row per quote with label, symbol and the quote columns"""
+        frame = pd.DataFrame(self.columns)
+        frame.insert(0, 'symbol', self.symbols)
+        frame.insert(0, 'label', self.labels)
+        return frame
+
+    # Bulk formatting
+    def format(self, template: str, *fields: str) -> List[str]:
+        """Format every row with one %-template, e.g.
+        format('%s: $%.2f (%+.2f%%)', 'label', 'price', 'change_pct').
+
+        Fields are 'label', 'symbol' or column names. Columns are converted
+        to Python floats once per column rather than once per row and dict.
+        """
+        values = []
+        for field in fields:
+            if field == 'label':
+                values.append(self.labels.tolist())
+            elif field == 'symbol':
+                values.append(self.symbols.tolist())
+            else:
+                values.append(self.columns[field].tolist())
+        return [template % row for row in zip(*values)]
@@ -0,0 +1,282 @@
+# src/data/replay.py
+#
+# Replays a past trading day through the live data pipeline. Stored
+# 1-minute bars for the day stand in for upstream: while a replay runs,
+# data_fetcher.fetch_history answers every history request (and so every
+# quote, chart tier and prediction input) with the bars upstream would have
+# returned at the replay clock, and market_calendar reads its time from the
+# same clock. Caches, refresh epochs, fragment refresh intervals and alert
+# cooldowns therefore all run on replay time, at 1x to 1000x wall speed.
+#
+# Bars are recorded once per symbol and day into memory-mapped files (see
+# history_store), so a day stays replayable after upstream stops serving
+# its 1-minute bars. News, sentiment and company details remain live.
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Iterable, Optional
+
+import pandas as pd
+
+from data import history_store, market_calendar, ohlcv, quote_snapshot
+
+# Setting LUTHER_REPLAY_DATE (YYYY-MM-DD) puts the app process into replay mode
+REPLAY_DATE = os.getenv('LUTHER_REPLAY_DATE')
+REPLAY_SYMBOLS = os.getenv('LUTHER_REPLAY_SYMBOLS', '')
+REPLAY_SPEED = float(os.getenv('LUTHER_REPLAY_SPEED', '60'))
+REPLAY_START = os.getenv('LUTHER_REPLAY_START', '09:30')
+REPLAY_DIR = os.getenv('LUTHER_REPLAY_DIR', os.path.join(tempfile.gettempdir(), 'luther_replay'))
+
+MIN_SPEED = 1
+MAX_SPEED = 1000
+SPEEDS = (1, 2, 5, 10, 30, 60, 120, 300, 600, 1000)
+
+# Live fragment refresh intervals shrink with the speed, down to this many wall seconds
+MIN_REFRESH_SECONDS = 1.0
+
+BAR = pd.Timedelta(minutes=1)
+
+# Upstream interval -> resample rule for the replayed day's bars ('D' is one bar for the day)
+INTERVAL_RULES = {
+    '1m': None, '2m': '2min', '5m': '5min', '15m': '15min', '30m': '30min',
+    '60m': '1h', '90m': '90min', '1h': '1h', '1d': 'D'
+}
+
+# Calendar lookback of an upstream period string, by suffix
+PERIOD_UNITS = {'d': 'days', 'wk': 'weeks', 'mo': 'months', 'y': 'years'}
+
+PRELOAD_WORKERS = 8
+
+
+class ReplayClock:
+    """Replay time: runs `speed` times faster than the wall clock from an
+    anchor and stops at the end of the session"""
+
+    def __init__(self, start: datetime, end: datetime, speed: float):
+        self.end = end
+        self.speed = _clamp_speed(speed)
+        self.paused = False
+        self._anchor = start
+        self._wall = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _current(self) -> datetime:
+        elapsed = 0.0 if self.paused else (time.monotonic() - self._wall) * self.speed
+        return min(self._anchor + timedelta(seconds=elapsed), self.end)
+
+    def now(self) -> datetime:
+        with self._lock:
+            return self._current()
+
+    def _rebase(self, anchor: Optional[datetime] = None):
+        self._anchor = min(anchor or self._current(), self.end)
+        self._wall = time.monotonic()
+
+    def set_speed(self, speed: float):
+        with self._lock:
+            self._rebase()
+            self.speed = _clamp_speed(speed)
+
+    def pause(self):
+        with self._lock:
+            self._rebase()
+            self.paused = True
+
+    def resume(self):
+        with self._lock:
+            self._rebase()
+            self.paused = False
+
+    def seek(self, when: datetime):
+        with self._lock:
+            self._rebase(when)
+
+    @property
+    def finished(self) -> bool:
+        return self.now() >= self.end
+
+
+def _clamp_speed(speed: float) -> float:
+    return min(max(float(speed), MIN_SPEED), MAX_SPEED)
+
+
+def _period_start(day: date, period: Optional[str]) -> Optional[date]:
+    """First day an upstream `period` covers when it ends at `day`; None for 'max'"""
+    if not period or period == 'max':
+        return None
+    for suffix, unit in PERIOD_UNITS.items():
+        if period.endswith(suffix) and period[:-len(suffix)].isdigit():
+            return (pd.Timestamp(day) - pd.DateOffset(**{unit: int(period[:-len(suffix)])})).date()
+    raise ValueError(f"Unsupported period {period!r}")
+
+
+class ReplayEngine:
+    """Serves history as of the replay clock for one trading day.
+
+    `fetch` is the upstream history call; it records the day's 1-minute
+    bars and the history before the day, which does not change during a
+    replay and is kept per request.
+    """
+
+    def __init__(self, day: date, clock: ReplayClock, fetch: Callable[..., pd.DataFrame]):
+        times = market_calendar.session_times(day)
+        if times is None:
+            raise ValueError(f"{day} is not a trading day")
+        self.day = day
+        self.open, self.close = times[1], times[2]
+        self.clock = clock
+        self.fetch = fetch
+        self.store = history_store.HistoryStore(REPLAY_DIR) if REPLAY_DIR else None
+        self._bars: Dict[str, Optional[pd.DataFrame]] = {}
+        self._before: Dict[tuple, pd.DataFrame] = {}
+        self._lock = threading.Lock()
+        # Set once start() has preloaded the chosen symbols
+        self.ready = threading.Event()
+
+    @property
+    def loaded(self) -> int:
+        """Symbols whose bars for the day are in memory"""
+        with self._lock:
+            return sum(bars is not None for bars in self._bars.values())
+
+    def session_bars(self, symbol: str) -> Optional[pd.DataFrame]:
+        """The day's regular-session 1-minute bars, recorded on first use"""
+        with self._lock:
+            if symbol in self._bars:
+                return self._bars[symbol]
+        bars = self._load(symbol)
+        with self._lock:
+            self._bars[symbol] = bars
+        return bars
+
+    def _load(self, symbol: str) -> Optional[pd.DataFrame]:
+        name, version = f'{symbol}.1m.{self.day.isoformat()}', self.day.toordinal()
+        mapped = self.store.open(name, version) if self.store else None
+        if mapped is not None:
+            return mapped.to_frame()
+        bars = self.fetch(symbol, start=self.day.isoformat(), end=(self.day + timedelta(days=1)).isoformat(),
+                          interval='1m')
+        if bars is None or bars.empty:
+            return None
+        bars = bars.loc[(bars.index >= self.open) & (bars.index < self.close), list(ohlcv.OHLCV_COLUMNS)]
+        if bars.empty:
+            return None
+        mapped = self.store.write(name, bars, version) if self.store else None
+        return mapped.to_frame() if mapped is not None else bars
+
+    def _preload(self, symbol: str):
+        try:
+            self.session_bars(symbol)
+        except Exception as e:
+            print(f"Error loading replay bars for {symbol} on {self.day}: {e}")
+
+    def preload(self, symbols: Iterable[str]):
+        with ThreadPoolExecutor(max_workers=PRELOAD_WORKERS, thread_name_prefix='luther-replay') as pool:
+            list(pool.map(self._preload, symbols))
+
+    def _history_before(self, symbol: str, interval: str, period: Optional[str], params: dict) -> pd.DataFrame:
+        key = (symbol, interval, period, tuple(sorted(params.items())))
+        with self._lock:
+            if key in self._before:
+                return self._before[key]
+        start = _period_start(self.day, period)
+        bars = self.fetch(symbol, start=start.isoformat() if start else None, end=self.day.isoformat(),
+                          interval=interval, **params)
+        bars = bars[list(ohlcv.OHLCV_COLUMNS)] if bars is not None and not bars.empty else pd.DataFrame()
+        with self._lock:
+            self._before[key] = bars
+        return bars
+
+    def bars_until(self, symbol: str, now: datetime) -> Optional[pd.DataFrame]:
+        """The day's 1-minute bars that have closed by `now`"""
+        bars = self.session_bars(symbol)
+        if bars is None:
+            return None
+        return bars.iloc[:bars.index.searchsorted(pd.Timestamp(now) - BAR, side='right')]
+
+    def history(self, symbol: str, period: Optional[str] = None, interval: str = '1d', **params) -> pd.DataFrame:
+        """Bars as upstream would have returned them at the replay clock:
+        the history before the replayed day, then the day so far"""
+        if interval not in INTERVAL_RULES:
+            raise ValueError(f"Replay does not serve {interval} bars")
+        before = self._history_before(symbol, interval, period, params)
+        today = self.bars_until(symbol, self.clock.now())
+        if today is None or today.empty:
+            return before
+        rule = INTERVAL_RULES[interval]
+        if rule == 'D':
+            # Today's (partial) daily bar, stamped like upstream's at the exchange midnight
+            midnight = pd.Timestamp(self.day, tz=market_calendar.EXCHANGE_TZ)
+            today = pd.DataFrame({
+                'Open': [today['Open'].iat[0]],
+                'High': [today['High'].max()],
+                'Low': [today['Low'].min()],
+                'Close': [today['Close'].iat[-1]],
+                'Volume': [today['Volume'].sum()]
+            }, index=pd.DatetimeIndex([midnight]))
+        elif rule:
+            # Bins are anchored on the open, as upstream's intraday bars are
+            today = today.resample(rule, label='left', closed='left', origin=self.open).agg(ohlcv.OHLCV_AGG)
+            today = today.dropna(subset=['Close'])
+        if before.empty:
+            return today
+        if before.index.tz is not None:
+            today.index = today.index.tz_convert(before.index.tz)
+        return pd.concat([before, today])
+
+
+ENGINE: Optional[ReplayEngine] = None
+
+_start_lock = threading.Lock()
+
+
+def start(day: Optional[date] = None, symbols: Iterable[str] = (), speed: Optional[float] = None,
+          start_time: Optional[str] = None) -> Optional[ReplayEngine]:
+    """Put this process into replay mode, once; configured from the
+    LUTHER_REPLAY_* settings unless given. Returns None when not replaying.
+
+    The clock holds at the start time until the chosen symbols' bars are
+    loaded, so the replay does not begin with most of them missing.
+    """
+    global ENGINE
+    with _start_lock:
+        if ENGINE is not None or (day is None and not REPLAY_DATE):
+            return ENGINE
+
+        # data_fetcher routes its own requests through this module
+        from data.data_fetcher import upstream_history
+
+        day = day or date.fromisoformat(REPLAY_DATE)
+        symbols = list(symbols) or [s.strip().upper() for s in REPLAY_SYMBOLS.split(',') if s.strip()]
+        hour, minute = map(int, (start_time or REPLAY_START).split(':'))
+        begin = datetime(day.year, day.month, day.day, hour, minute, tzinfo=market_calendar.EXCHANGE_TZ)
+        times = market_calendar.session_times(day)
+        if times is None:
+            raise ValueError(f"{day} is not a trading day")
+
+        clock = ReplayClock(begin, times[3], speed or REPLAY_SPEED)
+        clock.pause()
+        engine = ReplayEngine(day, clock, upstream_history)
+        market_calendar.set_clock(clock.now)
+        # Replayed bars and quotes must never reach the files live processes share
+        history_store.STORE = None
+        quote_snapshot.SNAPSHOT_PATH = None
+        ENGINE = engine
+
+    def preload():
+        engine.preload(symbols)
+        engine.ready.set()
+        clock.resume()
+    threading.Thread(target=preload, name='luther-replay-preload', daemon=True).start()
+    return engine
+
+
+def scale_interval(interval: Optional[str]) -> Optional[str]:
+    """A live refresh interval ('30s') in wall time at the replay speed"""
+    if ENGINE is None or interval is None:
+        return interval
+    seconds = float(interval.rstrip('s')) / ENGINE.clock.speed
+    return f'{max(seconds, MIN_REFRESH_SECONDS):g}s'
@@ -0,0 +1,118 @@
+# src/data/resampling.py
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import streamlit as st
+
+from data import history_store, market_calendar, ohlcv
+from data.data_fetcher import fetch_history
+from Utils.memory_cache import bounded_cache
+from Utils.profiler import bind, timed
+
+# One upstream download per symbol per tier; every chart period is derived from these.
+# TTLs apply during the regular session (see market_calendar.refresh_epoch).
+BASE_FETCHES = {
+    'intraday': {'interval': '5m', 'period': '60d', 'ttl': 120},
+    'hourly': {'interval': '1h', 'period': '730d', 'ttl': 900},
+    'daily': {'interval': '1d', 'period': 'max', 'ttl': 3600}
+}
+
+# Chart period -> (base tier, lookback, resample rule or None to keep native bars)
+# Lookbacks are either a number of trading sessions or a calendar offset
+PERIOD_VIEWS = {
+    '1d': ('intraday', 1, None),
+    '5d': ('intraday', 5, '15min'),
+    '1mo': ('intraday', pd.DateOffset(months=1), '1h'),
+    '3mo': ('hourly', pd.DateOffset(months=3), '1D'),
+    '1y': ('hourly', pd.DateOffset(years=1), None),
+    '5y': ('daily', pd.DateOffset(years=5), None),
+    'max': ('daily', None, None)
+}
+
+# US regular-session hourly bars start on the half hour (9:30, 10:30, ...)
+RULE_OFFSETS = {'1h': '30min'}
+
+# Concurrent base-tier downloads when building a multi-symbol close matrix
+HISTORY_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix='luther-history')
+
+
+@bounded_cache('base_history', ttl=market_calendar.MAX_CLOSED_SECONDS, version_arg='refresh_epoch',
+               unpack=ohlcv.unpack)
+def _fetch_base(symbol: str, interval: str, period: str, refresh_epoch: int):
+    """Download one base tier; refresh_epoch rolls over to force a refetch.
+
+    Stored memory-mapped (see history_store), so a tier another worker
+    already downloaded this epoch is mapped instead of fetched. Upstream
+    failures propagate so they are not cached for the tier's TTL.
+    """
+    def fetch():
+        return fetch_history(symbol, hedge=True, period=period, interval=interval)
+    return history_store.load(f'base_history/{symbol}.{interval}.{period}', refresh_epoch, fetch)
+
+
+@timed('data.get_base_history', cached=True)
+def get_base_history(symbol: str, tier: str):
+    """Finest-grained history for a tier, refreshed on the tier's TTL"""
+    fetch = BASE_FETCHES[tier]
+    try:
+        return _fetch_base(symbol, fetch['interval'], fetch['period'], market_calendar.refresh_epoch(fetch['ttl']))
+    except:
+        return None
+
+
+def resample_ohlcv(df: pd.DataFrame, rule: str) -> pd.DataFrame:
+    """Aggregate bars to a coarser interval with vectorized OHLCV rules"""
+    bars = df.resample(rule, label='left', closed='left', offset=RULE_OFFSETS.get(rule)).agg(ohlcv.OHLCV_AGG)
+    # Overnight and weekend bins have no trades
+    return bars.dropna(subset=['Close'])
+
+
+def slice_lookback(df: pd.DataFrame, lookback) -> pd.DataFrame:
+    """Keep the last N sessions or the last calendar offset of bars"""
+    if lookback is None or df.empty:
+        return df
+    if isinstance(lookback, int):
+        sessions = df.index.normalize()
+        first_session = sessions.unique()[-lookback:][0]
+        return df[sessions >= first_session]
+    return df[df.index >= df.index[-1] - lookback]
+
+
+def get_period_history(symbol: str, period: str):
+    """Bars for a chart period, derived in memory from the shared base tier"""
+    tier, lookback, rule = PERIOD_VIEWS.get(period, PERIOD_VIEWS['3mo'])
+    base = get_base_history(symbol, tier)
+    if base is None:
+        return None
+    bars = slice_lookback(base, lookback)
+    if rule:
+        bars = resample_ohlcv(bars, rule)
+    return bars if not bars.empty else None
+
+
+def period_interval(period: str) -> str:
+    """Bar interval the chart shows for a period"""
+    tier, _, rule = PERIOD_VIEWS.get(period, PERIOD_VIEWS['3mo'])
+    return rule or BASE_FETCHES[tier]['interval']
+
+
+@bounded_cache('close_matrix', ttl=market_calendar.MAX_CLOSED_SECONDS, version_arg='refresh_epoch')
+def _close_matrix(symbols: tuple, bars: int, refresh_epoch: int):
+    histories = HISTORY_POOL.map(bind(lambda symbol: get_base_history(symbol, 'daily')), symbols)
+    closes = {symbol: hist['Close'].tail(bars) for symbol, hist in zip(symbols, histories) if hist is not None}
+    if not closes:
+        return None
+    # Index and ETF sessions line up by date; carry a missing print forward
+    frame = pd.DataFrame({symbol: close.set_axis(close.index.date) for symbol, close in closes.items()})
+    return frame.sort_index().ffill().tail(bars)
+
+
+@timed('data.get_close_matrix', cached=True)
+def get_close_matrix(symbols, bars: int = 260):
+    """Aligned daily closes (dates x symbols) from the shared daily tier.
+
+    Symbols without history are left out; leading gaps (recent listings)
+    are kept as NaN.
+    """
+    fetch = BASE_FETCHES['daily']
+    return _close_matrix(tuple(symbols), bars, market_calendar.refresh_epoch(fetch['ttl']))
@@ -0,0 +1,189 @@
+# src/data/resilience.py
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, NamedTuple
+
+from Utils import metrics
+from Utils.profiler import span
+
+
+class Policy(NamedTuple):
+    timeout: float          # seconds a caller waits before giving up
+    failure_threshold: int  # consecutive failures that open the circuit
+    reset_after: float      # seconds an open circuit rejects calls before a probe
+
+
+PROVIDER_POLICIES = {
+    'yfinance': Policy(timeout=6, failure_threshold=5, reset_after=30),
+    'wikipedia': Policy(timeout=15, failure_threshold=3, reset_after=300),
+    'newsapi': Policy(timeout=8, failure_threshold=3, reset_after=120)
+}
+
+# Symbols the provider answered with "no such symbol" are skipped for this long
+NEGATIVE_TTL = 300
+
+# Hedged requests are opt-in: if the first attempt has not answered after
+# this many seconds a duplicate is sent and the first answer wins
+HEDGE_AFTER = float(os.getenv('LUTHER_HEDGE_AFTER', '0')) or None
+
+# Calls run here so a caller can stop waiting; an abandoned call finishes
+# (or hits the client's own timeout) in the background
+UPSTREAM_POOL = ThreadPoolExecutor(max_workers=32, thread_name_prefix='luther-upstream')
+
+STATE_VALUES = {'closed': 0, 'half_open': 1, 'open': 2}
+CIRCUIT_STATE = metrics.REGISTRY.gauge(
+    'luther_circuit_state', 'Upstream circuit breaker state (0 closed, 1 half-open, 2 open)')
+UPSTREAM_REJECTED = metrics.REGISTRY.counter(
+    'luther_upstream_rejected_total', 'Upstream calls failed fast by an open circuit')
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider whose circuit is open"""
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker for one provider.
+
+    Opens after `failure_threshold` failures in a row and rejects calls for
+    `reset_after` seconds; then lets a single probe through (half-open),
+    which closes the circuit on success or reopens it on failure.
+    """
+
+    def __init__(self, provider: str, policy: Policy):
+        self.provider = provider
+        self.policy = policy
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = None
+        self.last_error = None
+        self.stats = {'calls': 0, 'failures': 0, 'timeouts': 0, 'rejected': 0, 'hedged': 0, 'hedge_wins': 0}
+        self._probing = False
+        self._lock = threading.Lock()
+        CIRCUIT_STATE.set(0, provider=provider)
+
+    def _set_state(self, state: str):
+        self.state = state
+        CIRCUIT_STATE.set(STATE_VALUES[state], provider=self.provider)
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == 'open' and time.time() - self.opened_at >= self.policy.reset_after:
+                self._set_state('half_open')
+            if self.state == 'closed' or (self.state == 'half_open' and not self._probing):
+                self._probing = self.state == 'half_open'
+                self.stats['calls'] += 1
+                return True
+            self.stats['rejected'] += 1
+        UPSTREAM_REJECTED.inc(provider=self.provider)
+        return False
+
+    def success(self):
+        with self._lock:
+            self.failures = 0
+            self._probing = False
+            if self.state != 'closed':
+                self._set_state('closed')
+
+    def failure(self, error: BaseException):
+        with self._lock:
+            self.failures += 1
+            self.stats['failures'] += 1
+            if isinstance(error, TimeoutError):
+                self.stats['timeouts'] += 1
+            self.last_error = f"{type(error).__name__}: {error}"[:200]
+            if self.state == 'half_open' or self.failures >= self.policy.failure_threshold:
+                self.opened_at = time.time()
+                self._probing = False
+                self._set_state('open')
+
+    def count(self, stat: str):
+        with self._lock:
+            self.stats[stat] += 1
+
+
+class NegativeCache:
+    """Keys known to have no data, each forgotten after `ttl` seconds"""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._expires: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, key: str):
+        with self._lock:
+            self._expires[key] = time.time() + self.ttl
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            expires = self._expires.get(key)
+            if expires is not None and expires <= time.time():
+                del self._expires[key]
+                expires = None
+        return expires is not None
+
+    def __len__(self) -> int:
+        now = time.time()
+        with self._lock:
+            self._expires = {key: expires for key, expires in self._expires.items() if expires > now}
+            return len(self._expires)
+
+
+BREAKERS = {provider: CircuitBreaker(provider, policy) for provider, policy in PROVIDER_POLICIES.items()}
+INVALID_SYMBOLS = NegativeCache(NEGATIVE_TTL)
+
+
+def call(name: str, func: Callable, hedge: bool = False, **tags):
+    """Run one upstream call under its provider's breaker and timeout.
+
+    `name` is the span name, "<provider>.<call>" (e.g. yfinance.history).
+    Raises CircuitOpenError without calling while the circuit is open and
+    TimeoutError once the provider's timeout passes. With hedge=True and
+    LUTHER_HEDGE_AFTER set, a slow call is duplicated once; only use it for
+    idempotent reads.
+    """
+    breaker = BREAKERS[name.partition('.')[0]]
+    if not breaker.allow():
+        raise CircuitOpenError(f"{breaker.provider} circuit open")
+
+    with span(name, upstream=True, **tags):
+        deadline = time.monotonic() + breaker.policy.timeout
+        pending = [UPSTREAM_POOL.submit(func)]
+        first = pending[0]
+        if hedge and HEDGE_AFTER and HEDGE_AFTER < breaker.policy.timeout:
+            done, _ = wait(pending, timeout=HEDGE_AFTER)
+            if not done:
+                breaker.count('hedged')
+                pending.append(UPSTREAM_POOL.submit(func))
+
+        error = None
+        while pending:
+            done, _ = wait(pending, timeout=max(deadline - time.monotonic(), 0), return_when=FIRST_COMPLETED)
+            if not done:
+                error = TimeoutError(f"{name} timed out after {breaker.policy.timeout:g}s")
+                break
+            for future in done:
+                pending.remove(future)
+                if future.exception() is None:
+                    breaker.success()
+                    if future is not first:
+                        breaker.count('hedge_wins')
+                    return future.result()
+                error = future.exception()
+
+        breaker.failure(error)
+        raise error
+
+
+def status() -> List[Dict]:
+    """Breaker state and counters per provider, for diagnostics"""
+    now = time.time()
+    return [{
+        'provider': breaker.provider,
+        'state': breaker.state,
+        'reopens_in_s': max(breaker.policy.reset_after - (now - breaker.opened_at), 0)
+                        if breaker.state == 'open' else None,
+        **breaker.stats,
+        'last_error': breaker.last_error
+    } for breaker in BREAKERS.values()]
@@ -0,0 +1,40 @@
+import time
+from datetime import timedelta
+
+import pytest
+
+from data import checkpoint, data_fetcher, market_calendar
+from Utils import memory_cache
+
+QUOTE = {'symbol': 'AAPL', 'price': 102.0, 'change': 1.0, 'change_pct': 0.99, 'volume': 2e6,
+         'high': 103.0, 'low': 100.0}
+
+
+@pytest.fixture
+def saved(tmp_path, monkeypatch):
+    """A checkpoint holding one quote, with the background refresh failing"""
+    memory_cache.clear_all()
+    data_fetcher._fetch_stock_data.seed(QUOTE, 'AAPL', market_calendar.refresh_epoch(data_fetcher.QUOTE_TTL))
+    path = str(tmp_path / 'checkpoint.npz')
+    checkpoint.save(path)
+    memory_cache.clear_all()
+    monkeypatch.setattr(checkpoint, 'fetch_quote', lambda symbol: None)
+    monkeypatch.setattr(data_fetcher, 'fetch_quote', lambda symbol: None)
+    yield path
+    market_calendar.set_clock(None)
+    memory_cache.clear_all()
+
+
+def test_restored_quote_expires_when_refresh_fails(saved, monkeypatch):
+    monkeypatch.setattr(checkpoint, 'RESTORED_QUOTE_TTL', 0.2)
+    assert checkpoint.restore(saved)
+    assert data_fetcher.get_real_stock_data('AAPL')['stale']
+    time.sleep(0.3)
+    assert data_fetcher.get_real_stock_data('AAPL') is None
+
+
+def test_checkpoint_from_an_earlier_session_is_skipped(saved):
+    week_later = market_calendar.now() + timedelta(days=7)
+    market_calendar.set_clock(lambda: week_later)
+    assert not checkpoint.restore(saved)
+    assert data_fetcher.get_real_stock_data('AAPL') is None
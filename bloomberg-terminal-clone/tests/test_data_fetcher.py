@@ -0,0 +1,54 @@
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from data import data_fetcher, market_calendar
+from Utils import memory_cache
+
+# Saturday noon: refresh epochs are pinned until Monday's open
+SATURDAY_NOON = datetime(2026, 10, 17, 12, 0, tzinfo=market_calendar.EXCHANGE_TZ)
+
+BARS = pd.DataFrame({
+    'Open': [100.0, 101.0], 'High': [102.0, 103.0], 'Low': [99.0, 100.0],
+    'Close': [101.0, 102.0], 'Volume': [1e6, 2e6]
+}, index=pd.DatetimeIndex(['2026-10-15', '2026-10-16']))
+
+
+@pytest.fixture
+def closed_market():
+    market_calendar.set_clock(lambda: SATURDAY_NOON)
+    memory_cache.clear_all()
+    data_fetcher._fetch_market_indices.clear()
+    yield
+    market_calendar.set_clock(None)
+    memory_cache.clear_all()
+    data_fetcher._fetch_market_indices.clear()
+
+
+@pytest.fixture
+def flaky_history(monkeypatch):
+    """fetch_history that fails the first request for each symbol in `failing`"""
+    failing = set()
+
+    def fetch_history(symbol, hedge=False, **params):
+        if symbol in failing:
+            failing.discard(symbol)
+            raise ConnectionError(f"{symbol}: upstream unavailable")
+        return BARS
+    monkeypatch.setattr(data_fetcher, 'fetch_history', fetch_history)
+    return failing
+
+
+def test_failed_quote_is_not_cached_while_closed(closed_market, flaky_history):
+    flaky_history.add('AAPL')
+    epoch = market_calendar.refresh_epoch(data_fetcher.QUOTE_TTL)
+    assert data_fetcher.get_real_stock_data('AAPL') is None
+    assert market_calendar.refresh_epoch(data_fetcher.QUOTE_TTL) == epoch
+    assert data_fetcher.get_real_stock_data('AAPL')['price'] == 102.0
+
+
+def test_partial_indices_are_not_cached_while_closed(closed_market, flaky_history):
+    flaky_history.add('^VIX')
+    assert 'VIX' not in data_fetcher.get_market_indices()
+    assert 'VIX' in data_fetcher.get_market_indices()
@@ -0,0 +1,24 @@
+import pandas as pd
+import pytest
+
+from data.history_store import HistoryStore
+
+BARS = pd.DataFrame({
+    'Open': [100.0, 101.0], 'High': [102.0, 103.0], 'Low': [99.0, 100.0],
+    'Close': [101.0, 102.0], 'Volume': [1e6, 2e6]
+}, index=pd.DatetimeIndex(['2026-10-15', '2026-10-16']).tz_localize('America/New_York'))
+
+
+def test_write_and_map(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    store.write('stock_history/BRK-B.1d.6mo', BARS, version=7)
+    pd.testing.assert_frame_equal(store.open('stock_history/BRK-B.1d.6mo', 7).to_frame(), BARS, check_freq=False)
+    assert store.open('stock_history/BRK-B.1d.6mo', 8) is None
+
+
+@pytest.mark.parametrize('symbol', ['../../x', '..', 'a/b', '.hidden', ''])
+def test_rejects_names_outside_the_store(tmp_path, symbol):
+    store = HistoryStore(str(tmp_path / 'store'))
+    with pytest.raises(ValueError):
+        store.write(f'stock_history/{symbol}.1d.6mo', BARS, version=1)
+    assert not (tmp_path / 'x.1d.6mo.ohlcv').exists()
@@ -0,0 +1,24 @@
+import numpy as np
+import pandas as pd
+
+from ai import indicators
+
+
+def daily_bars(closes):
+    index = pd.date_range('2026-09-01', periods=len(closes), freq='B')
+    closes = np.asarray(closes, dtype=float)
+    return pd.DataFrame({'Open': closes, 'High': closes + 1, 'Low': closes - 1, 'Close': closes,
+                         'Volume': 1e6}, index=index)
+
+
+def test_cached_indicator_follows_the_forming_bar():
+    bars = daily_bars(np.arange(1, 21))
+    assert indicators.compute('sma', bars, 'X', '1d', window=20).iloc[-1] == 10.5
+    bars.loc[bars.index[-1], 'Close'] = 1000.0
+    assert indicators.compute('sma', bars, 'X', '1d', window=20).iloc[-1] == 59.5
+
+
+def test_unchanged_bars_hit_the_cache():
+    bars = daily_bars(np.arange(1, 31))
+    first = indicators.compute('rsi', bars, 'Y', '1d', window=14)
+    assert indicators.compute('rsi', bars.copy(), 'Y', '1d', window=14) is first
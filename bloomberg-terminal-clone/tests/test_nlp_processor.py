@@ -0,0 +1,42 @@
+import pytest
+
+from ai.nlp_processor import EXTRA_ALIASES, NLPProcessor
+
+UNIVERSE = {
+    'AAPL': 'Apple Inc.', 'MSFT': 'Microsoft Corporation', 'NWSA': 'News Corp Class A',
+    'NWS': 'News Corp Class B', 'TGT': 'Target Corporation', 'GE': 'General Electric'
+}
+
+
+@pytest.fixture
+def nlp():
+    return NLPProcessor(UNIVERSE)
+
+
+@pytest.mark.parametrize('query, symbols', [
+    ('news for AAPL', ['AAPL']),
+    ('what is the price target of MSFT', ['MSFT']),
+    ('latest on apple and microsoft', ['AAPL', 'MSFT']),
+    ('news about News Corp', ['NWSA']),
+    ('how is Target Corporation doing', ['TGT']),
+])
+def test_symbols(nlp, query, symbols):
+    assert nlp.parse_query(query)['symbols'] == symbols
+
+
+@pytest.mark.parametrize('query, intent, entities', [
+    ('news about the price of aapl', 'price', ['aapl']),
+    ('price of msft', 'price', ['msft']),
+    ('news for AAPL', 'news', ['aapl']),
+    ('forecast msft', 'prediction', ['msft']),
+    ('compare aapl and msft', 'compare', ['aapl', 'msft']),
+])
+def test_intent(nlp, query, intent, entities):
+    result = nlp.parse_query(query)
+    assert (result['intent'], result['entities']) == (intent, entities)
+
+
+def test_extra_aliases_name_known_symbols():
+    nlp = NLPProcessor()
+    assert set(EXTRA_ALIASES.values()) <= set(nlp.stock_symbols)
+    assert nlp.parse_query('walmart earnings')['symbols'] == ['WMT']
@@ -0,0 +1,28 @@
+import time
+
+import pytest
+
+from ai.query_planner import FetchRequest, QueryPlanner
+
+
+@pytest.fixture
+def planner():
+    return QueryPlanner(timeout=0.5)
+
+
+@pytest.mark.parametrize('query, symbols', [
+    ('what is the price of the stock', []),
+    ('news for the market', []),
+    ('price of hd', ['HD']),
+])
+def test_plan_falls_back_to_known_symbols_only(planner, query, symbols):
+    assert planner.plan(planner.nlp.parse_query(query)).symbols == symbols
+
+
+def test_execute_answers_slow_fetches_as_missing(planner):
+    planner.fetchers['quote'] = lambda symbol: time.sleep(2) if symbol == 'MSFT' else {'price': 1.0}
+    plan = planner.plan(planner.nlp.parse_query('price of AAPL and MSFT'))
+    started = time.monotonic()
+    results = planner.execute(plan)
+    assert time.monotonic() - started < 1.5
+    assert results == {FetchRequest('quote', 'AAPL'): {'price': 1.0}, FetchRequest('quote', 'MSFT'): None}